@@ -0,0 +1,112 @@
+"""
+Génère un dossier de données synthétique (journal + catalogue) pour les benchmarks.
+
+    python -m benchmarks.generate /tmp/ac-100k --rows 100000 --styles 2000 --templates 2000
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import random
+import shutil
+from datetime import date, timedelta
+from pathlib import Path
+
+from src.journal import ETATS, JOURNAL_COLS
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_GENRES = ["rap FR", "hyperpop", "lofi", "trap", "drill", "house", "techno", "afro", "rnb", "ambient", "jersey", "phonk"]
+_ADJ = ["sombre", "mélancolique", "chill", "nocturne", "solaire", "brut", "lunaire", "euphorique", "doux", "tendu"]
+_MOODS = ["tendu", "nocturne", "euphorique", "triste", "doux", "nostalgique", "agressif", "rêveur", "froid", "chaud"]
+_WORDS = [
+    "808", "kick", "snare", "hats", "mix", "voix", "hook", "couplet", "refrain", "drop", "basse", "pad",
+    "mélodie", "accords", "structure", "arrangement", "reverb", "compression", "sidechain", "écriture",
+    "topline", "bounce", "sample", "automation", "break", "intro", "outro", "tonalité", "groove", "swing",
+]
+_PROJECT_WORDS = ["NOCTURNE", "BETON", "AURORE", "VERTIGE", "NEON", "SILEX", "ECHO", "MIRAGE", "ORAGE", "LUNE"]
+
+
+def _phrase(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n))
+
+
+def style_names(n: int) -> list[str]:
+    names = [f"{g} {a}" for g in _GENRES for a in _ADJ]
+    return [names[i] if i < len(names) else f"{names[i % len(names)]} #{i // len(names)}" for i in range(n)]
+
+
+def make_styles(n: int, rng: random.Random) -> list[dict]:
+    out = []
+    for name in style_names(n):
+        lo = rng.randrange(70, 170)
+        out.append({
+            "style": name,
+            "bpm": [lo, lo + rng.randrange(5, 30)],
+            "mood": rng.sample(_MOODS, 2),
+            "refs": [f"Artiste {rng.randrange(1000)} - (ref)" for _ in range(3)],
+            "contraintes": [_phrase(rng, 3) for _ in range(3)],
+        })
+    return out
+
+
+def make_templates(n: int, styles: list[dict], rng: random.Random) -> list[dict]:
+    return [
+        {
+            "name": f"{rng.choice(styles)['style']} — Starter {i}",
+            "bpm": rng.randrange(70, 180),
+            "checklist": [_phrase(rng, 4) for _ in range(rng.randrange(4, 9))],
+        }
+        for i in range(n)
+    ]
+
+
+def write_journal(path: Path, rows: int, styles: list[str], rng: random.Random, delimiter: str = ";") -> None:
+    """Projets suivis sur ~3 ans : plusieurs lignes par titre, l'état progresse idée → sorti."""
+    start = date.today() - timedelta(days=3 * 365)
+    projects: list[dict] = []
+    with path.open("w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f, delimiter=delimiter, lineterminator="\n")
+        w.writerow(JOURNAL_COLS)
+        for i in range(rows):
+            if not projects or rng.random() < 0.25:
+                projects.append({
+                    "titre": f"{rng.choice(_PROJECT_WORDS)}_{rng.randrange(70, 180)}BPM_v{len(projects)}",
+                    "style": rng.choice(styles),
+                    "etat": 0,
+                })
+            p = rng.choice(projects[-20:])
+            if rng.random() < 0.3 and p["etat"] < len(ETATS) - 1:
+                p["etat"] += 1
+            day = start + timedelta(days=int(i * 3 * 365 / max(rows, 1)))
+            w.writerow([
+                day.isoformat(), p["titre"], p["style"], ETATS[p["etat"]], rng.randrange(5, 180, 5),
+                _phrase(rng, 3), _phrase(rng, 4) if rng.random() < 0.5 else "", _phrase(rng, 6),
+                _phrase(rng, 3), "", rng.randrange(0, 6),
+            ])
+
+
+def generate(out: Path, rows: int, n_styles: int = 500, n_templates: int = 500, seed: int = 42) -> Path:
+    rng = random.Random(seed)
+    out.mkdir(parents=True, exist_ok=True)
+    shutil.copy(ROOT / "data" / "profile.yaml", out / "profile.yaml")
+    styles = make_styles(n_styles, rng)
+    with (out / "styles.json").open("w", encoding="utf-8") as f:
+        json.dump(styles, f, ensure_ascii=False, indent=2)
+    with (out / "templates.json").open("w", encoding="utf-8") as f:
+        json.dump(make_templates(n_templates, styles, rng), f, ensure_ascii=False, indent=2)
+    write_journal(out / "journal.csv", rows, [s["style"] for s in styles], rng)
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out", type=Path)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--styles", type=int, default=500)
+    parser.add_argument("--templates", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    generate(args.out, args.rows, args.styles, args.templates, args.seed)
+    print(f"Données générées dans {args.out}")
@@ -0,0 +1,100 @@
+"""
+Temps d'import à froid de chaque page (un process Python neuf par mesure) et présence de
+pandas après import. La ligne "pandas (référence)" donne le coût que les pages YAML/JSON
+n'ont plus à payer.
+
+    python -m benchmarks.import_time --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+ROOT = Path(__file__).resolve().parents[1]
+
+PAGES = ["pages/1_boussole.py", "pages/3_templates.py", "pages/7_journal_suivi.py", "app.py"]
+REFERENCE = {"pandas (référence)": ["pandas"]}
+
+
+def page_imports(page: str) -> List[str]:
+    """
+    Modules importés au chargement de la page (instructions de niveau module, streamlit à part),
+    relus dans la source à chaque mesure : la liste suit les pages. Les imports paresseux
+    (dans une fonction) ne comptent pas, c'est voulu.
+    """
+    tree = ast.parse((ROOT / page).read_text(encoding="utf-8"), filename=page)
+    modules: Dict[str, None] = {}
+    for node in _executed_on_import(tree.body):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            # `from src import io` importe le sous-module src.io
+            names = [f"{node.module}.{a.name}" if node.module == "src" else node.module for a in node.names]
+        else:
+            continue
+        modules.update(dict.fromkeys(m for m in names if m.split(".")[0] != "streamlit"))
+    return list(modules)
+
+
+def _executed_on_import(nodes: Iterable[ast.AST]) -> Iterator[ast.AST]:
+    for node in nodes:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        yield node
+        yield from _executed_on_import(ast.iter_child_nodes(node))
+
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import streamlit
+t1 = time.perf_counter()
+for m in {modules!r}:
+    __import__(m)
+t2 = time.perf_counter()
+print(json.dumps({{"streamlit_s": t1 - t0, "modules_s": t2 - t1, "pandas": "pandas" in sys.modules}}))
+"""
+
+
+def probe(modules: List[str]) -> Dict[str, object]:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(modules=modules)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def report(repeat: int) -> List[Dict[str, object]]:
+    rows = []
+    targets = {**{page: page_imports(page) for page in PAGES}, **REFERENCE}
+    for page, modules in targets.items():
+        runs = [probe(modules) for _ in range(repeat)]
+        modules_s = statistics.median(r["modules_s"] for r in runs)
+        total_s = statistics.median(r["streamlit_s"] + r["modules_s"] for r in runs)
+        rows.append({
+            "page": page,
+            "imports_ms": round(modules_s * 1000, 1),
+            "total_ms": round(total_s * 1000, 1),
+            "pandas": runs[0]["pandas"],
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="sortie JSON brute")
+    args = parser.parse_args()
+    rows = report(args.repeat)
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        print(f"{'page':<28}{'imports (ms)':>18}{'total (ms)':>12}  pandas")
+        for r in rows:
+            print(f"{r['page']:<28}{r['imports_ms']:>18}{r['total_ms']:>12}  {'oui' if r['pandas'] else 'non'}")
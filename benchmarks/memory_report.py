@@ -0,0 +1,71 @@
+"""
+Mémoire du journal en octets par ligne : lecture brute d'origine (read_csv sans schéma +
+copie `date_parsed`, une par session) contre le schéma compact de src.journal (un seul
+DataFrame partagé par toutes les sessions via le cache src.io).
+
+    python -m benchmarks.memory_report --rows 100000 --sessions 8
+    python -m benchmarks.memory_report --data /chemin/vers/data
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pandas as pd  # noqa: E402
+
+from benchmarks.generate import generate  # noqa: E402
+from src import io, journal  # noqa: E402
+
+
+def load_raw() -> pd.DataFrame:
+    """Chargement d'avant : types devinés par pandas, date reparsée dans une 2e colonne."""
+    delimiter, columns = io.csv_layout(journal.JOURNAL_FILE)
+    df = pd.read_csv(io.DATA_DIR / journal.JOURNAL_FILE, sep=delimiter, names=columns, skiprows=1)
+    df["date_parsed"] = pd.to_datetime(df["date"], errors="coerce")
+    return df
+
+
+def bytes_per_row(df: pd.DataFrame) -> Dict[str, float]:
+    n = max(len(df), 1)
+    usage = df.memory_usage(deep=True, index=False)
+    out = {col: round(usage[col] / n, 1) for col in df.columns}
+    out["total"] = round(usage.sum() / n, 1)
+    return out
+
+
+def report(sessions: int) -> None:
+    raw = load_raw()
+    compact = journal.load_journal_csv()
+    shared = all(journal.load_journal_csv() is compact for _ in range(sessions))
+    before, after = bytes_per_row(raw), bytes_per_row(compact)
+
+    print(f"{len(compact)} lignes\n")
+    print(f"{'colonne':<20}{'avant (o/ligne)':>16}{'après (o/ligne)':>16}  type après")
+    for col in list(raw.columns):
+        dtype = str(compact[col].dtype) if col in compact.columns else "—"
+        print(f"{col:<20}{before[col]:>16}{after.get(col, 0.0):>16}  {dtype}")
+    print(f"{'total':<20}{before['total']:>16}{after['total']:>16}")
+
+    mb = 1024 * 1024
+    per_session_before = before["total"] * len(raw) / mb
+    total_after = after["total"] * len(compact) / mb
+    print(f"\n{sessions} sessions : avant {per_session_before * sessions:.1f} Mo "
+          f"({per_session_before:.1f} Mo chacune), après {total_after:.1f} Mo "
+          f"({'un seul objet partagé' if shared else 'copies par session'})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", type=Path, help="dossier de données existant (sinon journal synthétique)")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--sessions", type=int, default=8)
+    args = parser.parse_args()
+    io.DATA_DIR = args.data or generate(Path(tempfile.mkdtemp(prefix="ac-mem-")), args.rows)
+    report(args.sessions)
@@ -0,0 +1,193 @@
+"""
+Benchmarks : src.io, requêtes du dashboard, index dérivés, exports et reruns complets
+des pages (AppTest) sur des journaux synthétiques de différentes tailles.
+
+    python -m benchmarks.run --sizes 10k,100k            # résultats JSON dans benchmarks/results/
+    python -m benchmarks.run --sizes 10k --save-baseline # fige la référence
+    python -m benchmarks.run --sizes 10k --baseline benchmarks/baseline.json --threshold 0.25
+
+Code de sortie 1 si une mesure régresse de plus de `threshold` par rapport à la référence.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))  # les pages importent `src` (AppTest ne l'ajoute pas)
+
+from benchmarks.generate import generate  # noqa: E402
+from src import catalog, io, journal  # noqa: E402
+from src.aggregates import journal_stats  # noqa: E402
+from src.export import journal_export_bytes  # noqa: E402
+from src.journal_index import loaded_indexes  # noqa: E402
+from src.search import journal_search  # noqa: E402
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+BASELINE = ROOT / "benchmarks" / "baseline.json"
+PAGES = ["app.py", "pages/1_boussole.py", "pages/3_templates.py", "pages/7_journal_suivi.py"]
+# écart absolu minimal pour signaler une régression (bruit des mesures très courtes)
+MIN_DELTA_S = 0.002
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * mult)
+
+
+def reset_memory() -> None:
+    """Démarrage à froid côté process : caches src.io, catalogue et index en mémoire vidés."""
+    io.clear_cache()
+    catalog._catalog = None
+    for index in loaded_indexes():
+        index.unload()
+
+
+def measure(fn: Callable[[], Any], repeat: int, setup: Callable[[], Any] = lambda: None) -> Dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return {"median_s": statistics.median(times), "min_s": min(times), "repeat": repeat}
+
+
+def run_size(rows: int, repeat: int, n_catalog: int, pages: bool) -> Dict[str, Dict[str, float]]:
+    tmp = Path(tempfile.mkdtemp(prefix=f"ac-bench-{rows}-"))
+    try:
+        generate(tmp, rows, n_catalog, n_catalog)
+        io.DATA_DIR = tmp
+        reset_memory()
+        week_ago = datetime.now() - timedelta(days=7)
+        r: Dict[str, Dict[str, float]] = {}
+
+        # ---------- src.io ----------
+        r["io.load_yaml.cold"] = measure(lambda: io.load_yaml("profile.yaml"), repeat, io.clear_cache)
+        r["io.load_yaml.warm"] = measure(lambda: io.load_yaml("profile.yaml"), repeat)
+        r["io.load_json.styles.cold"] = measure(lambda: io.load_json("styles.json"), repeat, io.clear_cache)
+        r["io.load_json.styles.warm"] = measure(lambda: io.load_json("styles.json"), repeat)
+        r["journal.load_csv.cold"] = measure(journal.load_journal_csv, repeat, io.clear_cache)
+        r["journal.load_csv.warm"] = measure(journal.load_journal_csv, repeat)
+        df = journal.load_journal_csv()
+        r["io.save_csv"] = measure(lambda: io.save_csv("bench_save.csv", df), repeat)
+        row = {"date": "2030-01-01", "titre": "BENCH", "style": "x", "etat": "idée", "temps_min": 30}
+        r["io.append_row_csv"] = measure(lambda: io.append_row_csv("bench_save.csv", row), repeat)
+
+        # ---------- catalogue ----------
+        r["catalog.build.cold"] = measure(catalog.load_catalog, repeat, reset_memory)
+        cat = catalog.load_catalog()
+        r["catalog.prioritized_styles"] = measure(lambda: cat.prioritized_style_names(cat.style_names[:2]), repeat)
+
+        # ---------- dashboard (stats rapides + dernières entrées) ----------
+        def dashboard() -> None:
+            journal.count_entries()
+            journal.minutes_since(week_ago)
+            journal.count_by_etat()
+            journal.latest_entries(8)
+
+        r["stats.rebuild"] = measure(journal_stats.rebuild, repeat)
+        r["stats.cold"] = measure(dashboard, repeat, reset_memory)
+        r["stats.warm"] = measure(dashboard, repeat)
+        r["journal.append_entry"] = measure(lambda: journal.append_entry(row), repeat)
+        r["journal.query_page"] = measure(lambda: journal.query_page(etats=["démo"], offset=50, limit=50), repeat)
+
+        # ---------- recherche / export ----------
+        r["search.rebuild"] = measure(journal_search.rebuild, max(1, repeat // 2))
+        r["search.query"] = measure(lambda: journal.search_entries("mix voi"), repeat)
+        r["export.csv.cold"] = measure(journal_export_bytes, repeat, io.clear_cache)
+
+        # ---------- reruns complets ----------
+        if pages:
+            try:
+                from streamlit.testing.v1 import AppTest
+            except ImportError:
+                AppTest = None
+            for page in PAGES if AppTest else []:
+                run = lambda: AppTest.from_file(str(ROOT / page), default_timeout=600).run()  # noqa: E731
+                r[f"page.{page}.cold"] = measure(run, repeat, reset_memory)
+                r[f"page.{page}.warm"] = measure(run, repeat)
+        return r
+    finally:
+        reset_memory()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> list[str]:
+    regressions = []
+    for size, metrics in results["results"].items():
+        base_metrics = baseline.get("results", {}).get(size, {})
+        for name, m in metrics.items():
+            base = base_metrics.get(name)
+            if not base:
+                continue
+            new, old = m["median_s"], base["median_s"]
+            if new > old * (1 + threshold) and new - old > MIN_DELTA_S:
+                regressions.append(f"{size} {name}: {old * 1000:.1f} ms → {new * 1000:.1f} ms (+{(new / old - 1) * 100:.0f} %)")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10k,100k", help="tailles de journal, ex: 10k,100k,1m")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--catalog", type=int, default=2000, help="nombre de styles et de templates")
+    parser.add_argument("--no-pages", action="store_true", help="sans les reruns AppTest")
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+            "catalog": args.catalog,
+        },
+        "results": {},
+    }
+    for size in args.sizes.split(","):
+        rows = parse_size(size)
+        print(f"… {rows} lignes", flush=True)
+        results["results"][f"rows={rows}"] = run_size(rows, args.repeat, args.catalog, not args.no_pages)
+
+    out = args.out or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    for size, metrics in results["results"].items():
+        print(f"\n{size}")
+        for name, m in metrics.items():
+            print(f"  {name:<40} {m['median_s'] * 1000:10.2f} ms")
+    print(f"\nRésultats : {out}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Référence enregistrée : {args.baseline}")
+        return 0
+    if args.baseline.exists():
+        regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+        if regressions:
+            print("\n⚠️ Régressions :")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("Aucune régression par rapport à la référence.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
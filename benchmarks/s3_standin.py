@@ -0,0 +1,180 @@
+"""
+Stockage objet local compatible S3 (PUT / GET / HEAD / DELETE, signature V4 vérifiée) pour
+essayer ARTIST_COMPASS_STORAGE=s3 sans compte cloud, et mesure des octets envoyés par
+src.storage_s3 : envoi initial, ajouts au journal (deltas), sauvegarde d'un document, puis
+restauration complète dans un data/ vide.
+
+    python -m benchmarks.s3_standin --rows 20000 --appends 50
+    python -m benchmarks.s3_standin --serve --port 9000      # serveur seul, Ctrl+C pour arrêter
+"""
+from __future__ import annotations
+
+import argparse
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Tuple
+from urllib.parse import unquote, urlsplit
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.generate import generate  # noqa: E402
+from src import io, journal  # noqa: E402
+from src.storage_s3 import ObjectStoreStorage, S3Client, sign_v4  # noqa: E402
+
+ACCESS_KEY = "standin"
+SECRET_KEY = "standin-secret"
+REGION = "us-east-1"
+BUCKET = "artist-compass"
+
+
+class StandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0) -> None:
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.objects: Dict[Tuple[str, str], bytes] = {}
+        self.lock = threading.Lock()
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StandIn
+
+    def log_message(self, *args) -> None:  # silencieux
+        pass
+
+    def _reply(self, status: int, body: bytes = b"", content_type: str = "application/xml") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _route(self) -> Tuple[str, str, bytes]:
+        """(bucket, clé, corps) après vérification de la signature ; lève PermissionError sinon."""
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        auth = self.headers.get("Authorization", "")
+        try:
+            signed_names = auth.split("SignedHeaders=")[1].split(",")[0].split(";")
+        except IndexError:
+            raise PermissionError("Authorization absent")
+        headers = {name: self.headers.get(name, "") for name in signed_names}
+        url = f"http://{self.headers['host']}{self.path}"
+        expected = sign_v4(
+            self.command, url, headers, self.headers.get("x-amz-content-sha256", ""),
+            ACCESS_KEY, SECRET_KEY, REGION, self.headers.get("x-amz-date", ""),
+        )
+        if expected != auth:
+            raise PermissionError("signature invalide")
+        path = unquote(urlsplit(self.path).path).lstrip("/")
+        bucket, _, key = path.partition("/")
+        return bucket, key, body
+
+    def _handle(self) -> None:
+        try:
+            bucket, key, body = self._route()
+        except PermissionError as e:
+            self._reply(403, f"<Error><Code>SignatureDoesNotMatch</Code><Message>{e}</Message></Error>".encode())
+            return
+        objects, lock = self.server.objects, self.server.lock
+        if self.command == "PUT":
+            with lock:
+                objects[(bucket, key)] = body
+            self._reply(200)
+        elif self.command == "DELETE":
+            with lock:
+                objects.pop((bucket, key), None)
+            self._reply(204)
+        else:
+            with lock:
+                data = objects.get((bucket, key))
+            if data is None:
+                self._reply(404, b"<Error><Code>NoSuchKey</Code></Error>")
+            else:
+                self._reply(200, data, "application/octet-stream")
+
+    do_PUT = do_GET = do_HEAD = do_DELETE = _handle
+
+
+def serve(port: int = 0) -> StandIn:
+    server = StandIn(port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _files(store: ObjectStoreStorage, root: Path) -> Dict[str, bytes]:
+    """Fichiers synchronisés (hors verrous, index et temporaires) et leur contenu."""
+    return {p.name: p.read_bytes() for p in root.iterdir() if p.is_file() and store._synced(p.name)}
+
+
+def main(rows: int, appends: int) -> None:
+    server = serve()
+    client = S3Client(server.endpoint, BUCKET, ACCESS_KEY, SECRET_KEY, REGION)
+    work = Path(tempfile.mkdtemp(prefix="ac-s3-"))
+    io.DATA_DIR = generate(work / "a", rows)
+    store = ObjectStoreStorage(client, background=False)
+    previous = io.use_storage(store)
+    try:
+        def step(label: str) -> None:
+            before = (store.uploads, store.bytes_raw, store.bytes_sent)
+            t0 = time.perf_counter()
+            changed = store.sync()
+            ms = (time.perf_counter() - t0) * 1000
+            up, raw, sent = (a - b for a, b in zip((store.uploads, store.bytes_raw, store.bytes_sent), before))
+            print(f"{label:<34}{changed:>4} fichier(s){up:>5} envoi(s){raw / 1024:>10.1f} Ko bruts"
+                  f"{sent / 1024:>10.1f} Ko envoyés{ms:>9.1f} ms")
+
+        step("envoi initial")
+        step("sans changement")
+        for i in range(appends):
+            journal.append_entry({"date": "2026-01-01", "titre": f"bench {i}", "style": "bench", "etat": "idée", "temps_min": 30})
+        step(f"{appends} séances ajoutées (delta)")
+        profile = io.load_yaml("profile.yaml", default={})
+        io.save_yaml("profile.yaml", {**profile, "bench": True})
+        step("profile.yaml sauvegardé")
+        io.compact_csv(journal.JOURNAL_FILE)
+        step("journal compacté")
+
+        # restauration : data/ vide, tout revient du manifeste
+        io.DATA_DIR = work / "b"
+        io.DATA_DIR.mkdir()
+        t0 = time.perf_counter()
+        restored = ObjectStoreStorage(client, background=False)
+        ms = (time.perf_counter() - t0) * 1000
+        same = _files(store, work / "a") == _files(store, work / "b")
+        print(f"\nrestauration : {restored.info()['files']} fichier(s) en {ms:.1f} ms, "
+              f"{'identiques' if same else 'DIFFÉRENTS'} à l'original")
+        print(f"objets distants : {len(server.objects)}")
+    finally:
+        io.use_storage(previous)
+        server.shutdown()
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--appends", type=int, default=50)
+    parser.add_argument("--serve", action="store_true", help="lance seulement le serveur")
+    parser.add_argument("--port", type=int, default=9000)
+    args = parser.parse_args()
+    if args.serve:
+        srv = StandIn(args.port)
+        print(f"{srv.endpoint}/{BUCKET}  (clé {ACCESS_KEY} / {SECRET_KEY}, région {REGION})")
+        try:
+            srv.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    else:
+        main(args.rows, args.appends)
@@ -3,7 +3,7 @@ from src.io import load_yaml, save_yaml
 
 st.title("🧭 Profil & Boussole")
 
-profile = load_yaml("profile.yaml", default={"pseudo": "", "niveau": "débutante"})
+profile = dict(load_yaml("profile.yaml", default={"pseudo": "", "niveau": "débutante"}))
 
 pseudo = st.text_input("Pseudo", value=profile.get("pseudo", ""))
 niveau = st.selectbox("Niveau", ["débutante", "intermédiaire", "avancée"],
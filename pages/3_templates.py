@@ -1,20 +1,27 @@
 import streamlit as st
-from src.io import load_json
+from src.catalog import load_catalog
+from src.progress import checklist, progress_store
 
 st.title("🥁 Production & Templates")
 
-templates = load_json("templates.json", default=[])
+catalog = load_catalog()
 
-if not templates:
+if not catalog.templates:
     st.error("Aucun template trouvé. Vérifie que `data/templates.json` existe et est bien push sur GitHub.")
     st.stop()
 
-names = [t.get("name", "Sans nom") for t in templates]
-choice = st.selectbox("Choisir un template", names)
+# progression de tous les templates en une lecture de data/progress.json
+progress = progress_store.completion(
+    "template", {name: catalog.get_template(name).get("checklist", []) for name in catalog.template_names}
+)
+choice = st.selectbox(
+    "Choisir un template", catalog.template_names,
+    format_func=lambda name: f"{name} ({progress[name][0]}/{progress[name][1]})" if progress[name][1] else name,
+    key="tpl_choice",
+)
 
-t = next(x for x in templates if x.get("name") == choice)
+t = catalog.get_template(choice)
 
 st.write(f"**BPM conseillé :** {t.get('bpm', '—')}")
 st.markdown("### Checklist")
-for item in t.get("checklist", []):
-    st.checkbox(item, key=f"{choice}-{item}")
+checklist("template", choice, t.get("checklist", []), numbered=False)
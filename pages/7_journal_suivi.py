@@ -1,25 +1,90 @@
+import math
+
+import pandas as pd
 import streamlit as st
 from datetime import date
-from src.io import load_csv, append_row_csv
+from src.journal import (
+    ETATS, append_entry, count_by_style, count_filtered, list_projects, project_timeline, query_page,
+    search_entries,
+)
 
 st.title("📝 Journal")
 
-cols = ["date", "titre", "style", "etat", "blocage", "apprentissage", "next_step", "lien_audio"]
-df = load_csv("journal.csv", default_columns=cols)
-
 with st.form("add"):
     titre = st.text_input("Titre")
     style = st.text_input("Style")
-    etat = st.selectbox("État", ["idée", "démo", "presque fini", "sorti"])
+    etat = st.selectbox("État", ETATS)
     submitted = st.form_submit_button("Ajouter")
 
 if submitted and titre:
-    df = append_row_csv("journal.csv", {
+    append_entry({
         "date": str(date.today()),
         "titre": titre,
         "style": style,
         "etat": etat,
-    }, default_columns=cols)
+    })
     st.success("Ajouté.")
 
-st.dataframe(df, use_container_width=True)
+query = st.text_input("🔎 Rechercher", placeholder="ex: 808, mix voix, hook…")
+if query.strip():
+    results = search_entries(query)
+    st.caption(f"{len(results)} résultat(s) — les plus récents d'abord")
+    st.dataframe(results, use_container_width=True, hide_index=True)
+
+# -------------------- ENTRÉES (filtrées + paginées côté serveur) --------------------
+# Seule la page affichée est matérialisée et envoyée au navigateur.
+SORT_COLS = ["date", "titre", "style", "etat", "temps_min", "score_monstrable"]
+
+f1, f2, f3 = st.columns([1.2, 1, 1])
+with f1:
+    period = st.date_input("Période", value=(), format="YYYY-MM-DD")
+with f2:
+    etats_sel = st.multiselect("État", ETATS)
+with f3:
+    styles_sel = st.multiselect("Style", sorted(s for s in count_by_style() if s))
+
+date_from = period[0] if len(period) >= 1 else None
+date_to = period[1] if len(period) == 2 else None
+
+s1, s2, s3 = st.columns([1.2, 1, 1])
+with s1:
+    sort_by = st.selectbox("Trier par", SORT_COLS)
+with s2:
+    ascending = st.toggle("Ordre croissant", value=False)
+with s3:
+    page_size = st.selectbox("Lignes par page", [25, 50, 100, 200], index=1)
+
+total = count_filtered(date_from, date_to, etats_sel, styles_sel)
+pages = max(1, math.ceil(total / page_size))
+page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1)
+
+st.caption(f"{total} entrée(s) pour ce filtre — page {page}/{pages}")
+page_df = query_page(
+    date_from, date_to, etats_sel, styles_sel,
+    sort_by=sort_by, ascending=ascending, offset=(page - 1) * page_size, limit=page_size,
+)
+st.dataframe(page_df, use_container_width=True, hide_index=True)
+
+# -------------------- PROJETS (index par titre, sans relire le journal) --------------------
+st.subheader("🎯 Projets")
+projects = list_projects()
+if not len(projects):
+    st.info("Pas encore de projet : ajoute une entrée avec un titre.")
+else:
+    st.dataframe(projects, use_container_width=True, hide_index=True)
+    pick = st.selectbox("Timeline du projet", projects["titre"].tolist())
+    summary = projects.loc[projects["titre"] == pick].iloc[0]
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("État", summary["etat"] or "—")
+    m2.metric("Séances", int(summary["entrees"]))
+    m3.metric("Minutes", int(summary["minutes"]))
+    m4.metric(
+        "Score montrable",
+        "—" if pd.isna(summary["score_fin"]) else int(summary["score_fin"]),
+        delta=None if pd.isna(summary["score_tendance"]) else int(summary["score_tendance"]),
+    )
+    timeline = project_timeline(pick)
+    scored = timeline.dropna(subset=["date", "score_monstrable"])
+    if len(scored) > 1:
+        st.line_chart(scored.set_index("date")["score_monstrable"])
+    st.dataframe(timeline, use_container_width=True, hide_index=True)
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from src import io
+from src.analytics import first_day
+from src.journal import ETATS, JOURNAL_DTYPES, JOURNAL_FILE
+from src.journal_index import TailIndex
+
+# Stats du dashboard maintenues à chaque ajout (data/.index/journal.stats.json) :
+# compteurs par état / style, minutes et scores par jour, et les RECENT_K entrées les plus récentes.
+RECENT_K = 32
+RECENT_COLS = ["date", "titre", "style", "etat", "temps_min", "score_monstrable"]
+
+
+def to_int(value: Optional[str]) -> int:
+    """Cellule brute du journal → entier (0 si vide ou illisible)."""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def to_score(value: Optional[str]) -> Optional[int]:
+    """Comme to_int, mais None si vide ou illisible (score absent ≠ score 0)."""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def to_day(value: Optional[str]) -> Optional[str]:
+    """Cellule date → jour ISO (AAAA-MM-JJ), None si illisible."""
+    try:
+        return datetime.fromisoformat((value or "").strip()).date().isoformat()
+    except ValueError:
+        return None
+
+
+# clé du cube de comptage (jour, état, style) → nombre d'entrées, pour compter un filtre sans lire le CSV
+_SEP = "\x1f"
+
+
+class JournalStats(TailIndex):
+    name = "stats.json"
+    version = 3
+    overlay_pending = True
+    # le cube pèse plusieurs Mo sur un gros journal : point de reprise toutes les 200 lignes
+    # (et à l'arrêt), pas à chaque ajout
+    checkpoint_rows = 200
+
+    def empty(self) -> Dict[str, Any]:
+        return {"count": 0, "by_etat": {}, "by_style": {}, "minutes_by_day": {}, "score_by_day": {}, "cube": {}, "recent": []}
+
+    def apply(self, state: Dict[str, Any], start: int, row: Dict[str, str]) -> None:
+        day = to_day(row.get("date"))
+        minutes = to_int(row.get("temps_min"))
+        etat = row.get("etat") or ""
+        style = row.get("style") or ""
+
+        state["count"] += 1
+        state["by_etat"][etat] = state["by_etat"].get(etat, 0) + 1
+        state["by_style"][style] = state["by_style"].get(style, 0) + 1
+        if day and minutes:
+            state["minutes_by_day"][day] = state["minutes_by_day"].get(day, 0) + minutes
+        score = to_score(row.get("score_monstrable"))
+        if day and score is not None:
+            acc = state["score_by_day"].setdefault(day, [0, 0])
+            acc[0] += score
+            acc[1] += 1
+        key = _SEP.join((day or "", etat, style))
+        state["cube"][key] = state["cube"].get(key, 0) + 1
+
+        # top-K trié : dates connues d'abord (plus récentes en tête), puis ordre d'ajout
+        entry = {c: row.get(c) or None for c in RECENT_COLS}
+        entry["date"] = day
+        entry["_offset"] = start
+        recent = state["recent"]
+        recent.append(entry)
+        recent.sort(key=lambda e: (e["date"] is not None, e["date"] or "", e["_offset"]), reverse=True)
+        del recent[RECENT_K:]
+
+    def fork(self, state: Dict[str, Any], rows: List[Dict[str, str]]) -> Dict[str, Any]:
+        # compteurs copiés à plat ; seuls les [somme, nombre] des jours touchés sont dupliqués
+        out = dict(state)
+        for key in ("by_etat", "by_style", "minutes_by_day", "cube"):
+            out[key] = dict(state[key])
+        scores = out["score_by_day"] = dict(state["score_by_day"])
+        for day in {to_day(r.get("date")) for r in rows}:
+            if day in scores:
+                scores[day] = list(scores[day])
+        out["recent"] = list(state["recent"])
+        return out
+
+    # ---------- lectures O(1) pour le dashboard ----------
+    def count(self) -> int:
+        return self.state()["count"]
+
+    def count_by_etat(self) -> Dict[str, int]:
+        counts = {k: 0 for k in ETATS}
+        counts.update(self.state()["by_etat"])
+        return counts
+
+    def count_by_style(self) -> Dict[str, int]:
+        return dict(self.state()["by_style"])
+
+    def minutes_since(self, since: datetime) -> int:
+        cutoff = first_day(since)
+        return sum(m for d, m in self.state()["minutes_by_day"].items() if d >= cutoff)
+
+    def count_filtered(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        etats: Optional[Iterable[str]] = None,
+        styles: Optional[Iterable[str]] = None,
+    ) -> int:
+        """Nombre d'entrées d'un filtre (bornes de dates incluses), lu dans le cube."""
+        lo = date_from.isoformat() if date_from else None
+        hi = date_to.isoformat() if date_to else None
+        etats = set(etats) if etats else None
+        styles = set(styles) if styles else None
+        total = 0
+        for key, n in self.state()["cube"].items():
+            day, etat, style = key.split(_SEP)
+            if (lo or hi) and not day:
+                continue
+            if (lo and day < lo) or (hi and day > hi):
+                continue
+            if (etats is not None and etat not in etats) or (styles is not None and style not in styles):
+                continue
+            total += n
+        return total
+
+    def minutes_by_day(self) -> Dict[date, int]:
+        return {date.fromisoformat(d): m for d, m in self.state()["minutes_by_day"].items()}
+
+    def daily_totals(self) -> Tuple[Dict[str, int], Dict[str, List[int]]]:
+        """(minutes par jour, [somme, nombre] des scores par jour), pour src.analytics.period_series."""
+        state = self.state()
+        return dict(state["minutes_by_day"]), {d: list(v) for d, v in state["score_by_day"].items()}
+
+    def latest(self, n: int = 8) -> pd.DataFrame:
+        rows = self.state()["recent"][:n]
+        df = pd.DataFrame([{c: r.get(c) for c in RECENT_COLS} for r in rows], columns=RECENT_COLS)
+        return io.apply_dtypes(df, {c: t for c, t in JOURNAL_DTYPES.items() if c in RECENT_COLS})
+
+
+journal_stats = JournalStats(JOURNAL_FILE)
+
+
+if __name__ == "__main__":
+    s = journal_stats.rebuild()
+    print(f"Stats reconstruites : {s['count']} entrées ({journal_stats.path})")
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from src import io
+from src.journal import ETATS, JOURNAL_COLS, JOURNAL_DTYPES, JOURNAL_FILE, sqlite_journal, use_sqlite
+
+# Analytique hors mémoire : le journal est lu par morceaux typés, chaque morceau est
+# réduit en totaux par jour puis oublié. La mémoire dépend du nombre de jours, pas du
+# nombre de lignes. Les séries semaine / mois partent de ces mêmes totaux par jour,
+# qu'ils viennent d'un balayage (JournalScan), des agrégats CSV ou de SQLite.
+CHUNK_ROWS = 50_000
+LATEST_COLS = ["date", "titre", "style", "etat", "temps_min", "score_monstrable"]
+FREQS = {"W": "semaine", "M": "mois"}
+
+# totaux par jour ISO : minutes, et (somme, nombre) des score_monstrable renseignés
+MinutesByDay = Dict[str, int]
+ScoreByDay = Dict[str, List[int]]
+
+
+def first_day(since: datetime) -> str:
+    """Premier jour compté par `date >= since` (dates stockées au jour, à minuit)."""
+    day = since.date() if since.time() == datetime.min.time() else since.date() + timedelta(days=1)
+    return day.isoformat()
+
+
+def period_series(minutes_by_day: MinutesByDay, score_by_day: ScoreByDay, freq: str = "W") -> pd.DataFrame:
+    """Minutes, score total et score moyen par période ("W" : semaine, "M" : mois), index = début de période."""
+    if freq not in FREQS:
+        raise ValueError(f"freq inconnue : {freq!r} (attendu : {', '.join(FREQS)})")
+    days = sorted(set(minutes_by_day) | set(score_by_day))
+    cols = ["minutes", "score_total", "score_moyen"]
+    if not days:
+        return pd.DataFrame(columns=cols, index=pd.DatetimeIndex([], name="periode"))
+    daily = pd.DataFrame({
+        "minutes": [minutes_by_day.get(d, 0) for d in days],
+        "score_total": [score_by_day.get(d, (0, 0))[0] for d in days],
+        "score_n": [score_by_day.get(d, (0, 0))[1] for d in days],
+    }, index=pd.PeriodIndex(pd.to_datetime(days), freq=freq))
+    out = daily.groupby(level=0).sum()
+    out["score_moyen"] = (out["score_total"] / out["score_n"].where(out["score_n"] > 0)).round(2)
+    out.index = out.index.start_time.rename("periode")
+    return out[cols]
+
+
+class JournalScan:
+    """
+    Métriques du dashboard accumulées morceau par morceau (update) : mêmes lectures que
+    src.aggregates.JournalStats, sans index persistant ni journal complet en mémoire.
+    """
+
+    def __init__(self, latest_n: int = 8) -> None:
+        self.latest_n = latest_n
+        self.rows = 0
+        self.by_etat: Dict[str, int] = {}
+        self.minutes_by_day: MinutesByDay = {}
+        self.score_by_day: ScoreByDay = {}
+        self._recent = pd.DataFrame(columns=LATEST_COLS + ["_order"])
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        start = self.rows
+        self.rows += len(chunk)
+        if not len(chunk):
+            return
+        for etat, n in chunk["etat"].astype("string").fillna("").value_counts().items():
+            self.by_etat[etat] = self.by_etat.get(etat, 0) + int(n)
+
+        dated = chunk[chunk["date"].notna()]
+        days = dated["date"].dt.strftime("%Y-%m-%d")
+        grouped = pd.DataFrame({
+            "minutes": dated["temps_min"].fillna(0).astype("int64"),
+            "score": dated["score_monstrable"].astype("Float64"),
+        }).groupby(days.to_numpy())
+        totals = grouped.agg(minutes=("minutes", "sum"), score=("score", "sum"), score_n=("score", "count"))
+        for day, minutes, score, score_n in totals.itertuples():
+            if minutes:
+                self.minutes_by_day[day] = self.minutes_by_day.get(day, 0) + int(minutes)
+            if score_n:
+                acc = self.score_by_day.setdefault(day, [0, 0])
+                acc[0] += int(score)
+                acc[1] += int(score_n)
+
+        # top-N : dates connues d'abord (plus récentes en tête), puis ordre du fichier ;
+        # catégories en valeurs simples, sinon la fusion garde les modalités de chaque morceau
+        part = chunk[LATEST_COLS].astype({"titre": object, "etat": object, "style": object}).assign(_order=range(start, self.rows))
+        merged = pd.concat([self._recent, part], ignore_index=True) if len(self._recent) else part
+        merged = merged.assign(_known=merged["date"].notna())
+        merged = merged.sort_values(["_known", "date", "_order"], ascending=False, na_position="last")
+        self._recent = merged.drop(columns="_known").head(self.latest_n)
+
+    # ---------- lectures (même API que JournalStats) ----------
+    def count(self) -> int:
+        return self.rows
+
+    def count_by_etat(self) -> Dict[str, int]:
+        counts = {k: 0 for k in ETATS}
+        counts.update(self.by_etat)
+        return counts
+
+    def minutes_since(self, since: datetime) -> int:
+        cutoff = first_day(since)
+        return sum(m for d, m in self.minutes_by_day.items() if d >= cutoff)
+
+    def latest(self, n: Optional[int] = None) -> pd.DataFrame:
+        df = self._recent.head(self.latest_n if n is None else n).drop(columns="_order").reset_index(drop=True)
+        return io.apply_dtypes(df, {c: t for c, t in JOURNAL_DTYPES.items() if c in LATEST_COLS})
+
+    def series(self, freq: str = "W") -> pd.DataFrame:
+        return period_series(self.minutes_by_day, self.score_by_day, freq)
+
+
+def iter_journal_chunks(chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Journal typé par morceaux de `chunk_rows` lignes, quel que soit le moteur."""
+    if use_sqlite():
+        for columns, rows in sqlite_journal().iter_rows(chunk_rows):
+            yield io.apply_dtypes(pd.DataFrame.from_records(rows, columns=columns), JOURNAL_DTYPES)
+    else:
+        yield from io.iter_csv_chunks(JOURNAL_FILE, chunk_rows, default_columns=JOURNAL_COLS, dtypes=JOURNAL_DTYPES)
+
+
+def scan_journal(chunk_rows: int = CHUNK_ROWS, latest_n: int = 8) -> JournalScan:
+    """Un seul passage sur le journal, mémoire bornée par `chunk_rows`."""
+    scan = JournalScan(latest_n)
+    for chunk in iter_journal_chunks(chunk_rows):
+        scan.update(chunk)
+    return scan
+
+
+def daily_totals() -> Tuple[MinutesByDay, ScoreByDay]:
+    """Totaux par jour sans balayage : agrégats maintenus (CSV) ou GROUP BY indexé (SQLite)."""
+    if use_sqlite():
+        return sqlite_journal().daily_totals()
+    from src.aggregates import journal_stats
+
+    return journal_stats.daily_totals()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Balayage du journal par morceaux (mémoire bornée).")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--freq", choices=list(FREQS), default="M")
+    args = parser.parse_args()
+    scan = scan_journal(args.chunk_rows)
+    print(f"{scan.count()} entrées · {scan.minutes_since(datetime.now() - timedelta(days=7))} min sur 7 jours")
+    print(scan.count_by_etat())
+    print(scan.series(args.freq).to_string())
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import ChainMap
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.io import load_json
+
+# Bibliothèque de styles / templates indexée une fois par version des fichiers :
+# nom → objet, priorité des styles focus, mood → styles, BPM → styles/templates.
+
+
+def bpm_range(bpm: Any) -> Optional[Tuple[float, float]]:
+    """Champ bpm (nombre ou [lo, hi]) → plage (lo, hi) ordonnée, None si illisible."""
+    try:
+        if isinstance(bpm, (list, tuple)) and len(bpm) == 2:
+            lo, hi = float(bpm[0]), float(bpm[1])
+            return (lo, hi) if lo <= hi else (hi, lo)
+        if bpm is not None and not isinstance(bpm, (list, tuple, dict)):
+            return float(bpm), float(bpm)
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+class _BpmIndex:
+    """Intervalles [lo, hi] triés par lo : recherche par chevauchement en O(log n + k)."""
+
+    def __init__(self, items: Iterable[Tuple[Tuple[float, float], Dict[str, Any]]]) -> None:
+        entries = sorted(items, key=lambda e: e[0][0])
+        self._los = [r[0] for r, _ in entries]
+        self._entries = entries
+        self._max_width = max((r[1] - r[0] for r, _ in entries), default=0.0)
+
+    def overlapping(self, lo: float, hi: float) -> List[Dict[str, Any]]:
+        # un intervalle qui chevauche [lo, hi] commence au plus tard à hi et au plus tôt à lo - largeur max
+        end = bisect_right(self._los, hi)
+        start = bisect_right(self._los, lo - self._max_width - 1e-9)
+        return [obj for (a, b), obj in self._entries[start:end] if b >= lo]
+
+
+class Catalog:
+    def __init__(self, styles: List[Any], templates: List[Any]) -> None:
+        self.styles = [s for s in styles if isinstance(s, dict)]
+        self.templates = [t for t in templates if isinstance(t, dict)]
+        self.style_names = [s.get("style", "Sans nom") for s in self.styles]
+        self.template_names = [t.get("name", "Sans nom") for t in self.templates]
+        # catalogue indexé et templates ajoutés par-dessus (voir with_templates)
+        self.base: Catalog = self
+        self.extra_templates: List[Dict[str, Any]] = []
+
+        # setdefault : en cas de doublon, le premier gagne (comme l'ancien scan linéaire)
+        self._styles_by_name: Dict[str, Dict[str, Any]] = {}
+        for name, s in zip(self.style_names, self.styles):
+            self._styles_by_name.setdefault(name, s)
+        self._templates_by_name: Dict[str, Dict[str, Any]] = {}
+        for name, t in zip(self.template_names, self.templates):
+            self._templates_by_name.setdefault(name, t)
+
+        self._styles_by_mood: Dict[str, List[Dict[str, Any]]] = {}
+        for s in self.styles:
+            for mood in s.get("mood", []) or []:
+                self._styles_by_mood.setdefault(str(mood).casefold(), []).append(s)
+
+        self._style_bpm = _BpmIndex((r, s) for s in self.styles if (r := bpm_range(s.get("bpm"))))
+        self._template_bpm = _BpmIndex((r, t) for t in self.templates if (r := bpm_range(t.get("bpm"))))
+        self._template_bpm_extra: Optional[_BpmIndex] = None
+        self._priority: Dict[Tuple[str, ...], List[str]] = {}
+
+    # ---------- lookups ----------
+    def get_style(self, name: str) -> Optional[Dict[str, Any]]:
+        return self._styles_by_name.get(name)
+
+    def get_template(self, name: str) -> Optional[Dict[str, Any]]:
+        return self._templates_by_name.get(name)
+
+    def prioritized_style_names(self, focus: Iterable[str]) -> List[str]:
+        """Styles focus (styles_cibles) en tête, puis le reste dans l'ordre du fichier."""
+        key = tuple(focus)
+        if key not in self._priority:
+            wanted = set(key)
+            seen: set[str] = set()
+            ordered = []
+            for name in [n for n in self.style_names if n in wanted] + self.style_names:
+                if name not in seen:
+                    seen.add(name)
+                    ordered.append(name)
+            self._priority[key] = ordered
+        return self._priority[key]
+
+    def styles_by_mood(self, mood: str) -> List[Dict[str, Any]]:
+        return list(self._styles_by_mood.get(mood.casefold(), []))
+
+    def moods(self) -> List[str]:
+        return sorted(self._styles_by_mood)
+
+    def styles_for_bpm(self, lo: float, hi: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Styles dont la plage BPM chevauche [lo, hi] (hi = lo si omis)."""
+        return self._style_bpm.overlapping(lo, lo if hi is None else hi)
+
+    def templates_for_bpm(self, lo: float, hi: Optional[float] = None) -> List[Dict[str, Any]]:
+        hi = lo if hi is None else hi
+        found = self._template_bpm.overlapping(lo, hi)
+        if self._template_bpm_extra is not None:
+            found += self._template_bpm_extra.overlapping(lo, hi)
+        return found
+
+    def with_templates(self, extra: List[Dict[str, Any]]) -> "Catalog":
+        """Vue du catalogue + templates ajoutés en session (sans ré-indexer la base)."""
+        if not extra:
+            return self
+        view = object.__new__(Catalog)
+        view.__dict__.update(self.__dict__)
+        extra = [t for t in extra if isinstance(t, dict)]
+        extra_names = [t.get("name", "Sans nom") for t in extra]
+        view.templates = self.templates + extra
+        view.extra_templates = self.extra_templates + extra
+        view.template_names = self.template_names + extra_names
+        added: Dict[str, Dict[str, Any]] = {}
+        for name, t in zip(extra_names, extra):
+            added.setdefault(name, t)
+        view._templates_by_name = ChainMap(self._templates_by_name, added)
+        view._template_bpm_extra = _BpmIndex((r, t) for t in extra if (r := bpm_range(t.get("bpm"))))
+        return view
+
+
+_catalog: Optional[Catalog] = None
+# objets sources du catalogue courant, gardés en référence (comparés par `is` : un id()
+# peut être réattribué à une nouvelle liste une fois l'ancienne libérée)
+_catalog_sources: Tuple[Any, Any] = (None, None)
+# défaut partagé pour un fichier absent : même objet à chaque appel (jamais modifié)
+_NO_ENTRIES: List[Any] = []
+
+
+def load_catalog() -> Catalog:
+    """
+    Catalogue de data/styles.json + data/templates.json. Reconstruit seulement quand
+    load_json renvoie de nouveaux objets (fichier modifié), sinon partagé entre reruns.
+    """
+    global _catalog, _catalog_sources
+    styles = load_json("styles.json", default=_NO_ENTRIES)
+    templates = load_json("templates.json", default=_NO_ENTRIES)
+    if _catalog is None or styles is not _catalog_sources[0] or templates is not _catalog_sources[1]:
+        _catalog = Catalog(styles, templates)
+        _catalog_sources = (styles, templates)
+    return _catalog
@@ -0,0 +1,275 @@
+"""
+Journal sans interface : import en masse, stats du dashboard, validation / compaction
+de journal.csv et exports filtrés. Entrées et sorties en flux (fichier ou `-`).
+
+    python -m src append entrees.csv            # ou: cat nuit.jsonl | python -m src append - --format jsonl
+    python -m src stats --json
+    python -m src validate && python -m src compact
+    python -m src export --from 2025-01-01 --etat sorti --format jsonl -o sortis.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from io import TextIOWrapper
+from itertools import islice
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from src import io
+from src.journal import ETATS, JOURNAL_COLS, JOURNAL_FILE
+
+# lignes par écriture lors d'un import : mémoire bornée, une écriture par lot
+APPEND_BATCH_ROWS = 10_000
+_INT_COLS = ("temps_min", "score_monstrable")
+
+
+# ---------- flux ----------
+@contextmanager
+def _open_in(path: str) -> Iterator[IO[str]]:
+    if path == "-":
+        yield sys.stdin
+    else:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            yield f
+
+
+@contextmanager
+def _open_out(path: str) -> Iterator[IO[bytes]]:
+    if path == "-":
+        yield sys.stdout.buffer
+        sys.stdout.buffer.flush()
+    else:
+        with open(path, "wb") as f:
+            yield f
+
+
+def _input_format(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def read_rows(f: IO[str], fmt: str) -> Iterator[Dict[str, Any]]:
+    """Entrées à importer : CSV avec en-tête (délimiteur détecté) ou un objet JSON par ligne."""
+    if fmt == "jsonl":
+        for n, line in enumerate(f, 1):
+            if line.strip():
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError(f"ligne {n} : objet JSON attendu")
+                yield row
+        return
+    header = f.readline()
+    delimiter = io._sniff_delimiter(header)
+    columns = next(csv.reader([header], delimiter=delimiter), [])
+    for record in csv.reader(f, delimiter=delimiter):
+        if any(record):
+            yield {c: v for c, v in zip(columns, record) if v != ""}
+
+
+def _batches(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    it = iter(rows)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+# ---------- commandes ----------
+def cmd_append(args: argparse.Namespace) -> int:
+    from src.journal import append_entries
+
+    total = 0
+    with _open_in(args.input) as f:
+        for batch in _batches(read_rows(f, _input_format(args.input, args.format)), args.batch):
+            total += append_entries(batch)
+    print(f"{total} entrées ajoutées", file=sys.stderr)
+    return 0
+
+
+def cmd_stats(args: argparse.Namespace) -> int:
+    since = datetime.now() - timedelta(days=args.days)
+    if args.scan:
+        from src.analytics import scan_journal
+
+        scan = scan_journal(latest_n=args.latest)
+        count, minutes, by_etat, latest = scan.count(), scan.minutes_since(since), scan.count_by_etat(), scan.latest()
+        trend = scan.series(args.trend) if args.trend else None
+    else:
+        from src import journal
+
+        count, minutes = journal.count_entries(), journal.minutes_since(since)
+        by_etat, latest = journal.count_by_etat(), journal.latest_entries(args.latest)
+        trend = journal.time_series(args.trend) if args.trend else None
+
+    if not args.json:
+        print(f"Entrées : {count}")
+        print(f"Minutes sur {args.days} jours : {minutes}")
+        for etat, n in by_etat.items():
+            print(f"  {etat or '(vide)'} : {n}")
+        if len(latest):
+            print(latest.to_string(index=False))
+        if trend is not None:
+            print(trend.to_string())
+        return 0
+    latest = latest.assign(date=latest["date"].dt.strftime("%Y-%m-%d"))
+    stats = {
+        "entrees": count,
+        "minutes": minutes,
+        "jours": args.days,
+        "par_etat": by_etat,
+        "dernieres": json.loads(latest.to_json(orient="records", force_ascii=False)),
+    }
+    if trend is not None:
+        stats["tendance"] = json.loads(trend.rename(index=lambda ts: ts.date().isoformat()).to_json(orient="index"))
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+    return 0
+
+
+def missing_columns(filename: str = JOURNAL_FILE) -> List[str]:
+    """Colonnes déclarées absentes de l'en-tête : pas une erreur, load_csv les ajoute vides."""
+    if not io.storage().exists(filename):
+        return []
+    columns = io.csv_layout(filename)[1]
+    return [c for c in JOURNAL_COLS if c not in columns]
+
+
+def validate_csv(filename: str = JOURNAL_FILE) -> Iterator[Tuple[int, str]]:
+    """(ligne, problème) pour chaque enregistrement invalide de journal.csv, en une passe."""
+    io.flush_pending(io.DATA_DIR / filename)
+    if not io.storage().exists(filename):
+        return
+    delimiter, columns = io.csv_layout(filename)
+    pos = {c: columns.index(c) for c in columns}
+    with io.storage().open_read(filename) as raw:
+        reader = csv.reader(TextIOWrapper(raw, encoding="utf-8", newline=""), delimiter=delimiter)
+        next(reader, None)
+        for record in reader:
+            line = reader.line_num
+            if not any(record):
+                continue
+            if len(record) > len(columns):
+                yield line, f"{len(record)} champs pour {len(columns)} colonnes"
+                continue
+
+            def cell(col: str) -> str:
+                i = pos.get(col)
+                return record[i].strip() if i is not None and i < len(record) else ""
+
+            day = cell("date")
+            try:
+                date.fromisoformat(day[:10]) if day else None
+            except ValueError:
+                yield line, f"date illisible : {day!r}"
+            for col in _INT_COLS:
+                value = cell(col)
+                try:
+                    float(value) if value else None
+                except ValueError:
+                    yield line, f"{col} non numérique : {value!r}"
+            etat = cell("etat")
+            if etat and etat not in ETATS:
+                yield line, f"état inconnu : {etat!r}"
+
+
+def cmd_validate(args: argparse.Namespace) -> int:
+    missing = missing_columns(args.file)
+    if missing:
+        print(f"{args.file} : colonnes absentes (lues vides) : {', '.join(missing)}", file=sys.stderr)
+    errors = 0
+    for line, problem in validate_csv(args.file):
+        errors += 1
+        if errors <= args.max_errors:
+            print(f"{args.file}:{line} : {problem}")
+    if errors > args.max_errors:
+        print(f"… {errors - args.max_errors} autres problèmes")
+    print(f"{errors} problème(s)" if errors else f"{args.file} : OK", file=sys.stderr)
+    return 1 if errors else 0
+
+
+def cmd_compact(args: argparse.Namespace) -> int:
+    n = io.compact_csv(args.file)
+    print(f"{args.file} : {n} lignes réécrites", file=sys.stderr)
+    return 0
+
+
+def iter_export(fmt: str, date_from=None, date_to=None, etats=None, styles=None) -> Iterator[bytes]:
+    """Sous-ensemble filtré du journal, morceau par morceau (mémoire bornée)."""
+    from src.analytics import iter_journal_chunks
+    from src.journal import filter_mask
+
+    first = True
+    for chunk in iter_journal_chunks():
+        part = chunk[filter_mask(chunk, date_from, date_to, etats, styles)]
+        if not len(part):
+            continue
+        if fmt == "jsonl":
+            part = part.assign(date=part["date"].dt.strftime("%Y-%m-%d"))
+            yield part.to_json(orient="records", lines=True, force_ascii=False).encode("utf-8")
+        else:
+            yield part.to_csv(index=False, header=first, date_format="%Y-%m-%d").encode("utf-8")
+        first = False
+    if first and fmt == "csv":
+        yield (",".join(JOURNAL_COLS) + "\n").encode("utf-8")
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    from src.export import gzip_chunks
+
+    chunks = iter_export(args.format, args.date_from, args.date_to, args.etat, args.style)
+    with _open_out(args.output) as out:
+        for chunk in gzip_chunks(chunks) if args.gzip else chunks:
+            out.write(chunk)
+    return 0
+
+
+# ---------- arguments ----------
+def _day(text: str) -> date:
+    return date.fromisoformat(text)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("append", help="ajouter des entrées depuis un fichier CSV / JSONL (ou - pour stdin)")
+    p.add_argument("input", nargs="?", default="-")
+    p.add_argument("--format", choices=["csv", "jsonl"], help="défaut : d'après l'extension, sinon csv")
+    p.add_argument("--batch", type=int, default=APPEND_BATCH_ROWS, help="lignes par écriture")
+    p.set_defaults(func=cmd_append)
+
+    p = sub.add_parser("stats", help="stats du dashboard")
+    p.add_argument("--days", type=int, default=7, help="fenêtre des minutes (jours)")
+    p.add_argument("--latest", type=int, default=8)
+    p.add_argument("--trend", choices=["W", "M"], help="série par semaine (W) ou par mois (M)")
+    p.add_argument("--scan", action="store_true", help="balayage par morceaux au lieu des agrégats")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser("validate", help="vérifier journal.csv (code de sortie 1 si problème)")
+    p.add_argument("--file", default=JOURNAL_FILE)
+    p.add_argument("--max-errors", type=int, default=50)
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("compact", help="réécrire journal.csv (colonnes ajoutées intégrées à l'en-tête)")
+    p.add_argument("--file", default=JOURNAL_FILE)
+    p.set_defaults(func=cmd_compact)
+
+    p = sub.add_parser("export", help="exporter un sous-ensemble filtré")
+    p.add_argument("--from", dest="date_from", type=_day)
+    p.add_argument("--to", dest="date_to", type=_day)
+    p.add_argument("--etat", action="append", help="répétable")
+    p.add_argument("--style", action="append", help="répétable")
+    p.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    p.add_argument("--gzip", action="store_true")
+    p.add_argument("-o", "--output", default="-")
+    p.set_defaults(func=cmd_export)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import csv
+import json
+import zlib
+from io import BytesIO, StringIO
+from typing import Any, Iterable, Iterator, List
+
+from src import io
+from src.journal import JOURNAL_FILE
+
+# Exports des boutons de téléchargement : générés seulement au clic (callable passé à
+# st.download_button), produits par morceaux (pas de copie complète du DataFrame ni
+# de grosse chaîne intermédiaire), éventuellement gzippés, et mis en cache par version
+# du journal (empreinte du fichier) : deux clics sans ajout renvoient les mêmes octets.
+# L'export du journal sert de sauvegarde (disque non persistant) : il doit être sans perte.
+EXPORT_CHUNK_ROWS = 5000
+EXPORT_CHUNK_BYTES = 1 << 20
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    z = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 : conteneur gzip
+    for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
+
+
+def _join(chunks: Iterable[bytes]) -> bytes:
+    buf = BytesIO()
+    for chunk in chunks:
+        buf.write(chunk)
+    return buf.getvalue()
+
+
+# ---------- Journal (CSV) ----------
+def _rows_to_csv(columns: List[str], rows: Iterable[Iterable[Any]], header: bool, delimiter: str = ",") -> bytes:
+    buf = StringIO()
+    writer = csv.writer(buf, delimiter=delimiter, lineterminator="\n")
+    if header:
+        writer.writerow(columns)
+    writer.writerows(["" if v is None else v for v in row] for row in rows)
+    return buf.getvalue().encode("utf-8")
+
+
+def iter_journal_csv(chunk_rows: int = EXPORT_CHUNK_ROWS, chunk_bytes: int = EXPORT_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Journal complet en CSV, par morceaux. CSV : les octets du fichier tels quels (rien n'est
+    retypé, une date ou un nombre illisible reste dans l'export), en-tête complété des
+    colonnes ajoutées depuis (sidecar). SQLite : séparateur virgule, `chunk_rows` lignes.
+    """
+    from src import journal
+
+    if journal.use_sqlite():
+        first = True
+        for columns, rows in journal.sqlite_journal().iter_rows(chunk_rows):
+            yield _rows_to_csv(columns, rows, header=first)
+            first = False
+        if first:
+            yield _rows_to_csv(journal.JOURNAL_COLS, [], header=True)
+        return
+
+    storage = io.storage()
+    io.flush_pending(io.DATA_DIR / JOURNAL_FILE)
+    if not storage.exists(JOURNAL_FILE):
+        yield _rows_to_csv(journal.JOURNAL_COLS, [], header=True)
+        return
+    delimiter, columns = io.csv_layout(JOURNAL_FILE)
+    # taille figée sous le verrou : un ajout concurrent n'entre pas à moitié dans l'export
+    with storage.lock(JOURNAL_FILE):
+        f = storage.open_read(JOURNAL_FILE)
+        remaining = storage.size(JOURNAL_FILE)
+    with f:
+        header = f.readline()
+        remaining -= len(header)
+        if len(next(csv.reader([header.decode("utf-8")], delimiter=delimiter), [])) < len(columns):
+            header = _rows_to_csv(columns, [], header=True, delimiter=delimiter)
+        yield header
+        while remaining > 0:
+            chunk = f.read(min(chunk_bytes, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _journal_source():
+    from src import journal
+
+    if journal.use_sqlite():
+        return journal.sqlite_journal().path
+    path = io.DATA_DIR / JOURNAL_FILE
+    io.flush_pending(path)  # l'empreinte doit inclure les ajouts en attente
+    return path
+
+
+def journal_export_bytes(compress: bool = False) -> bytes:
+    kind = "export-csv.gz" if compress else "export-csv"
+
+    def build() -> bytes:
+        chunks = iter_journal_csv()
+        return _join(gzip_chunks(chunks) if compress else chunks)
+
+    return io.memoize_file(kind, _journal_source(), build)
+
+
+# ---------- Templates (JSON) ----------
+def iter_templates_json(templates: List[Any]) -> Iterator[bytes]:
+    encoder = json.JSONEncoder(ensure_ascii=False, indent=2)
+    for piece in encoder.iterencode(templates):
+        yield piece.encode("utf-8")
+
+
+def templates_export_bytes(templates: List[Any], compress: bool = False) -> bytes:
+    chunks = iter_templates_json(templates)
+    return _join(gzip_chunks(chunks) if compress else chunks)
@@ -1,80 +1,719 @@
 from __future__ import annotations
 
+import atexit
+import copy
+import csv
+import hashlib
 import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from io import StringIO, TextIOWrapper
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import IO, Any, Callable, Dict, Hashable, Iterable, Iterator, Optional, Tuple
 
-import pandas as pd
 import yaml
 
+from src import profiler
+
+# Les fonctions DataFrame (load_csv, iter_csv_chunks, save_csv, apply_dtypes) vivent dans
+# src.io_csv et ne sont importées qu'au premier accès : les pages YAML/JSON (profil,
+# templates) n'importent jamais pandas. `from src.io import load_csv` reste valable.
+_CSV_EXPORTS = {"load_csv", "iter_csv_chunks", "save_csv", "apply_dtypes"}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _CSV_EXPORTS:
+        from src import io_csv
+
+        return getattr(io_csv, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # Racine du projet (…/artist-compass/)
 ROOT = Path(__file__).resolve().parents[1]
-DATA_DIR = ROOT / "data"
+# ARTIST_COMPASS_DATA_DIR : autre dossier de données (benchmarks, scripts, tests manuels)
+DATA_DIR = Path(os.environ.get("ARTIST_COMPASS_DATA_DIR") or ROOT / "data")
+
+
+# ---------- Backend de stockage ----------
+# Toutes les lectures / écritures des fichiers de données passent par un backend
+# (src.storage) : dossier data/ par défaut, mémoire pour les tests, stockage objet S3.
+from src.storage import STORAGE_ENV, FileStorage, Storage  # noqa: E402
+
+_storage: Storage = FileStorage()
+
+
+def storage() -> Storage:
+    return _storage
+
+
+def use_storage(backend: Storage) -> Storage:
+    """Change de backend (vide le cache des fichiers parsés) ; renvoie l'ancien."""
+    global _storage
+    flush_pending()
+    previous, _storage = _storage, backend
+    _cache.clear()
+    return previous
+
+
+def _name(path: Path) -> str:
+    """Nom relatif à data/ d'un chemin de données (clé du backend)."""
+    try:
+        return path.relative_to(DATA_DIR).as_posix()
+    except ValueError:
+        return path.name
+
+
+# ---------- Cache des fichiers parsés ----------
+# Chaque rerun Streamlit relit profile/styles/templates/journal : on garde les objets
+# déjà parsés, indexés par chemin et validés par (mtime, taille). Pas de dépendance à
+# Streamlit → utilisable depuis la CLI et les scripts.
+# ⚠️ Les objets renvoyés sont partagés entre reruns (et sessions) : copier avant de muter.
+CACHE_MAX_ENTRIES = 32
+
+Stamp = Tuple[Tuple[int, int], ...]
+
+
+class ParsedCache:
+    """LRU borné : clé → (empreinte des fichiers sources, objet parsé)."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Stamp, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._seen: set[Hashable] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(
+        self, key: Hashable, stamp: Stamp, loader: Callable[[], Any], source: Optional[Path] = None
+    ) -> Any:
+        """`source` : fichier texte d'origine → passe par l'instantané binaire sur disque en cas d'absence."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            warm = key in self._seen
+            self._seen.add(key)
+        # instantané seulement au premier chargement du process : ensuite (fichier modifié
+        # depuis, ajout au journal…) on reparse sans relire ni réécrire l'instantané
+        value = loader() if source is None or warm else _snapshots.get_or_load(key, source, stamp, loader)
+        with self._lock:
+            self._entries[key] = (stamp, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, path: Path) -> None:
+        target = str(path)
+        with self._lock:
+            for key in [k for k in self._entries if isinstance(k, tuple) and target in k]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._seen.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+
+# ---------- Instantanés binaires ----------
+# Au redémarrage du conteneur, le cache mémoire est vide : chaque objet parsé est aussi
+# gardé en pickle dans data/.snapshot/ (relu en une lecture, sans parseur YAML / CSV).
+# En-tête = version du format + empreinte (mtime, taille) et SHA-1 de la source : si la
+# source a changé, on reparse le texte et on réécrit l'instantané. mtime différent mais
+# même contenu (copie, checkout) → SHA-1 identique, l'instantané reste bon.
+# Fichiers produits par l'app elle-même (pickle : ne jamais y déposer de fichier externe).
+# ARTIST_COMPASS_SNAPSHOTS=0 désactive.
+SNAPSHOT_DIRNAME = ".snapshot"
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_MAGIC = b"ACSNAP1\n"
+_HASH_CHUNK_BYTES = 1 << 20
+
+
+def _file_sha1(path: Path) -> str:
+    # lecture par blocs plutôt que hashlib.file_digest (Python 3.11+)
+    digest = hashlib.sha1()
+    with path.open("rb") as f:
+        while chunk := f.read(_HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SnapshotStore:
+    def __init__(self) -> None:
+        self.enabled = os.environ.get("ARTIST_COMPASS_SNAPSHOTS", "1") != "0"
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, key: Hashable, source: Path) -> Path:
+        # clé sans le chemin absolu : l'instantané survit à un déplacement du dossier data/
+        parts = key if isinstance(key, tuple) else (key,)
+        portable = repr(tuple(source.name if k == str(source) else k for k in parts))
+        digest = hashlib.sha1(portable.encode("utf-8")).hexdigest()[:16]
+        return DATA_DIR / SNAPSHOT_DIRNAME / f"{source.name}.{digest}.snap"
+
+    def _meta(self, key: Hashable, source: Path, stamp: Stamp) -> Dict[str, Any]:
+        meta: Dict[str, Any] = {"version": SNAPSHOT_VERSION, "stamp": stamp, "sha1": _file_sha1(source)}
+        if isinstance(key, tuple) and key and key[0] == "csv":
+            import pandas as pd
+
+            meta["pandas"] = pd.__version__
+        return meta
+
+    def _valid(self, meta: Dict[str, Any], source: Path, stamp: Stamp) -> bool:
+        if meta.get("version") != SNAPSHOT_VERSION:
+            return False
+        if "pandas" in meta:
+            import pandas as pd
+
+            if meta["pandas"] != pd.__version__:  # pickles de DataFrame liés à la version de pandas
+                return False
+        if tuple(map(tuple, meta.get("stamp", ()))) == stamp:
+            return True
+        return meta.get("sha1") == _file_sha1(source)
+
+    def get_or_load(self, key: Hashable, source: Path, stamp: Stamp, loader: Callable[[], Any]) -> Any:
+        if not self.enabled or not source.exists():
+            return loader()
+        snap = self.path_for(key, source)
+        try:
+            with snap.open("rb") as f:
+                meta = json.loads(f.readline()) if f.readline() == _SNAPSHOT_MAGIC else {}
+                payload = f.read() if self._valid(meta, source, stamp) else None
+        except (OSError, ValueError):
+            payload = None
+        if payload is not None:
+            try:
+                value = pickle.loads(payload)
+            except Exception:  # instantané illisible (tronqué, classe disparue…) → texte
+                pass
+            else:
+                if tuple(map(tuple, meta["stamp"])) != stamp:
+                    self._write(snap, {**meta, "stamp": stamp}, payload)  # même contenu, autre mtime
+                self.hits += 1
+                if profiler.active():
+                    profiler.add_bytes(read=len(payload))
+                return value
+        self.misses += 1
+        value = loader()
+        try:
+            self._write(snap, self._meta(key, source, stamp), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except (OSError, pickle.PicklingError, TypeError):
+            pass
+        return value
+
+    def _write(self, snap: Path, meta: Dict[str, Any], payload: bytes) -> None:
+        snap.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(snap, "wb", durable=False) as f:
+            f.write(_SNAPSHOT_MAGIC)
+            f.write(json.dumps(meta).encode("utf-8") + b"\n")
+            f.write(payload)
+
+    def clear(self) -> None:
+        for snap in (DATA_DIR / SNAPSHOT_DIRNAME).glob("*.snap"):
+            snap.unlink(missing_ok=True)
+
+    def info(self) -> Dict[str, int]:
+        return {"snapshot_hits": self.hits, "snapshot_misses": self.misses}
+
+
+_snapshots = SnapshotStore()
+_cache = ParsedCache()
+
+
+def file_stamp(*paths: Path) -> Stamp:
+    """(mtime_ns, taille) de chaque fichier — (version, taille) via le backend sous data/ ; (0, -1) si absent."""
+    stamp = []
+    for p in paths:
+        if p.is_relative_to(DATA_DIR) and not isinstance(_storage, FileStorage):
+            stamp.append(_storage.stamp(_name(p)))
+            continue
+        try:
+            st = p.stat()
+            stamp.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            stamp.append((0, -1))
+    return tuple(stamp)
+
+
+def memoize_file(kind: str, path: Path, loader: Callable[[], Any]) -> Any:
+    """Mémoïse `loader()` tant que `path` garde la même empreinte (pour les modules dérivés)."""
+    return _cache.get_or_load((kind, str(path)), file_stamp(path), loader)
+
+
+def invalidate_file(path: Path) -> None:
+    _cache.invalidate(path)
+
+
+def cache_info() -> Dict[str, int]:
+    return {**_cache.info(), **_snapshots.info()}
+
+
+def clear_cache() -> None:
+    _cache.clear()
+
+
+def clear_snapshots() -> None:
+    """Supprime les instantanés binaires (le prochain démarrage reparse les fichiers texte)."""
+    _snapshots.clear()
+
+
+# ---------- Écritures concurrentes ----------
+# Streamlit sert toutes les sessions depuis un seul process (threads), et la CLI peut
+# écrire en même temps. Trois garde-fous :
+# - file_lock : verrou exclusif par fichier, entre threads ET entre process (<fichier>.lock)
+# - atomic_write : fichier temporaire + fsync + os.replace, jamais de fichier tronqué
+# - group commit : les ajouts simultanés au même CSV partent en une seule écriture
+LOCK_SUFFIX = ".lock"
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+_locks_guard = threading.Lock()
+_locks: Dict[str, threading.RLock] = {}
+_held = threading.local()
+
+
+def _os_lock(f, exclusive: bool) -> None:
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if exclusive else msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Verrou exclusif sur `path` (réentrant dans un même thread)."""
+    key = str(path)
+    with _locks_guard:
+        rlock = _locks.setdefault(key, threading.RLock())
+    with rlock:
+        held = _held.__dict__.setdefault("paths", {})
+        if held.get(key):
+            held[key] += 1
+            try:
+                yield
+            finally:
+                held[key] -= 1
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.with_name(path.name + LOCK_SUFFIX).open("a+b") as f:
+            _os_lock(f, True)
+            held[key] = 1
+            try:
+                yield
+            finally:
+                held[key] = 0
+                _os_lock(f, False)
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "w", durable: bool = True, **kwargs: Any) -> Iterator[IO[Any]]:
+    """
+    Écrit dans un temporaire du même dossier puis remplace `path` d'un coup (ou rien si
+    erreur). `durable=False` saute le fsync (fichiers dérivés, reconstructibles).
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    if "b" not in mode:
+        kwargs.setdefault("encoding", "utf-8")
+    try:
+        with tmp.open(mode, **kwargs) as f:
+            yield f
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+class _GroupCommit:
+    """
+    Ajouts concurrents à un même fichier : le premier thread arrivé devient « leader », écrit
+    tout ce qui est en attente en une fois (sous file_lock) puis réveille les autres. Ceux
+    arrivés pendant l'écriture forment le lot suivant. Chaque appelant ne revient qu'une fois
+    ses lignes écrites (ou avec l'erreur de son lot).
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._pending: Dict[str, list[Dict[str, Any]]] = {}
+        self._busy: set[str] = set()
+        self.batches = 0
+        self.rows = 0
 
+    def submit(self, filename: str, rows: list[Dict[str, Any]], default_columns: Optional[list[str]]) -> None:
+        item: Dict[str, Any] = {"rows": rows, "done": False, "error": None}
+        with self._cond:
+            self._pending.setdefault(filename, []).append(item)
+            while not item["done"] and filename in self._busy:
+                self._cond.wait()
+            if not item["done"]:
+                self._busy.add(filename)
+                batch = self._pending.pop(filename)
+        if item["done"]:
+            if item["error"] is not None:
+                raise item["error"]
+            return
 
-def _ensure_data_dir() -> None:
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
+        error: Optional[BaseException] = None
+        try:
+            _append_rows(filename, [r for it in batch for r in it["rows"]], default_columns)
+        except BaseException as e:
+            error = e
+        with self._cond:
+            self._busy.discard(filename)
+            self.batches += 1
+            self.rows += sum(len(it["rows"]) for it in batch)
+            for it in batch:
+                it["done"], it["error"] = True, error
+            self._cond.notify_all()
+        if error is not None:
+            raise error
+
+    def info(self) -> Dict[str, int]:
+        with self._cond:
+            return {"batches": self.batches, "rows": self.rows}
+
+
+_group_commit = _GroupCommit()
+
+
+def group_commit_info() -> Dict[str, int]:
+    """Nombre d'écritures groupées et de lignes écrites depuis le démarrage du process."""
+    return _group_commit.info()
+
+
+# ---------- Écriture différée (optionnelle) ----------
+# ARTIST_COMPASS_WRITE_BEHIND=1 (ou enable_write_behind()) : les sauvegardes et ajouts
+# rendent la main tout de suite, un thread les écrit (voir src.write_behind). Les lectures
+# voient les écritures en attente ; la file est vidée à l'arrêt du process.
+WRITE_BEHIND_ENV = "ARTIST_COMPASS_WRITE_BEHIND"
+_write_behind = None
+
+
+def enable_write_behind(max_pending: Optional[int] = None) -> None:
+    global _write_behind
+    if _write_behind is None:
+        from src.write_behind import MAX_PENDING, WriteBehind
+
+        _write_behind = WriteBehind(max_pending or MAX_PENDING)
+        atexit.register(disable_write_behind)
+
+
+def disable_write_behind(timeout: Optional[float] = None) -> None:
+    """Écrit tout ce qui est en attente puis repasse en écritures synchrones."""
+    global _write_behind
+    wb, _write_behind = _write_behind, None
+    if wb is not None:
+        wb.stop(timeout)
+
+
+def write_behind_enabled() -> bool:
+    return _write_behind is not None
+
+
+def flush_pending(path: Optional[Path] = None, timeout: Optional[float] = None) -> bool:
+    """Attend l'écriture des opérations en attente (de `path`, ou toutes). False si timeout."""
+    return True if _write_behind is None else _write_behind.wait(path, timeout)
+
+
+def queued_rows(path: Path) -> Tuple[int, Optional[int], list[Dict[str, Any]]]:
+    """Lignes d'un CSV pas encore écrites par l'écriture différée (voir WriteBehind.queued_rows)."""
+    return (0, None, []) if _write_behind is None else _write_behind.queued_rows(path)
+
+
+def write_behind_info() -> Optional[Dict[str, Any]]:
+    """Profondeur de file, latence d'écriture (dépôt → disque), erreurs ; None si désactivé."""
+    return None if _write_behind is None else _write_behind.info()
 
 
 # ---------- YAML ----------
+@profiler.profiled_io("load_yaml")
 def load_yaml(filename: str, default: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    _ensure_data_dir()
     path = DATA_DIR / filename
-    if not path.exists():
+    if _write_behind is not None and (pending := _write_behind.pending_doc(path)) is not None:
+        return pending
+    stamp = _storage.stamp(filename)
+    if stamp[1] < 0:
         return default or {}
-    with path.open("r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+    return _cache.get_or_load(
+        ("yaml", str(path)), (stamp,), lambda: _parse_yaml(filename), source=_storage.local_path(filename)
+    )
+
 
+def _parse_yaml(filename: str) -> Dict[str, Any]:
+    data = _storage.read_bytes(filename)
+    if profiler.active():
+        profiler.add_bytes(read=len(data))
+    return yaml.safe_load(data.decode("utf-8")) or {}
 
+
+@profiler.profiled_io("save_yaml")
 def save_yaml(filename: str, data: Dict[str, Any]) -> None:
-    _ensure_data_dir()
     path = DATA_DIR / filename
-    with path.open("w", encoding="utf-8") as f:
-        yaml.safe_dump(data, f, allow_unicode=True, sort_keys=False)
+    if _write_behind is not None:
+        _write_behind.submit("yaml", path, copy.deepcopy(data))
+        return
+    _write_doc("yaml", path, data)
 
 
 # ---------- JSON ----------
+@profiler.profiled_io("load_json")
 def load_json(filename: str, default: Optional[Any] = None) -> Any:
-    _ensure_data_dir()
     path = DATA_DIR / filename
-    if not path.exists():
+    if _write_behind is not None and (pending := _write_behind.pending_doc(path)) is not None:
+        return pending
+    stamp = _storage.stamp(filename)
+    if stamp[1] < 0:
         return default if default is not None else []
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return _cache.get_or_load(
+        ("json", str(path)), (stamp,), lambda: _parse_json(filename), source=_storage.local_path(filename)
+    )
+
 
+def _parse_json(filename: str) -> Any:
+    data = _storage.read_bytes(filename)
+    if profiler.active():
+        profiler.add_bytes(read=len(data))
+    return json.loads(data.decode("utf-8"))
 
+
+@profiler.profiled_io("save_json")
 def save_json(filename: str, data: Any) -> None:
-    _ensure_data_dir()
     path = DATA_DIR / filename
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    if _write_behind is not None:
+        _write_behind.submit("json", path, copy.deepcopy(data))
+        return
+    _write_doc("json", path, data)
+
+
+def _write_doc(kind: str, path: Path, data: Any) -> None:
+    if kind == "yaml":
+        text = yaml.safe_dump(data, allow_unicode=True, sort_keys=False)
+    else:
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+    payload = text.encode("utf-8")
+    name = _name(path)
+    with _storage.lock(name):
+        _storage.write_bytes(name, payload)
+    if profiler.active():
+        profiler.add_bytes(written=len(payload))
+    _cache.invalidate(path)
 
 
 # ---------- CSV (journal) ----------
-def load_csv(filename: str, default_columns: Optional[list[str]] = None) -> pd.DataFrame:
-    _ensure_data_dir()
-    path = DATA_DIR / filename
-    if not path.exists():
-        return pd.DataFrame(columns=default_columns or [])
-    return pd.read_csv(path)
+# Le journal est en append-only : une soumission écrit UNE ligne en fin de fichier.
+# Une colonne nouvelle entre dans l'en-tête (réécriture complète, rare) : le fichier se relit
+# seul, sans dépendre d'un fichier dérivé. Le sidecar `<fichier>.schema.json` mémorise le
+# délimiteur détecté pour l'en-tête courant (et, pour les anciens fichiers, des colonnes
+# hors en-tête, absorbées au prochain ajout ou compact_csv).
+CSV_DELIMITERS = (",", ";", "\t", "|")
 
 
-def save_csv(filename: str, df: pd.DataFrame) -> None:
-    _ensure_data_dir()
-    path = DATA_DIR / filename
-    df.to_csv(path, index=False)
+def _schema_name(filename: str) -> str:
+    return filename + ".schema.json"
+
+
+def _sniff_delimiter(header_line: str) -> str:
+    counts = {d: header_line.count(d) for d in CSV_DELIMITERS}
+    best = max(counts, key=counts.get)
+    return best if counts[best] else ","
+
+
+def _read_header_line(filename: str) -> str:
+    with _storage.open_read(filename) as f:
+        return f.readline().decode("utf-8").rstrip("\r\n")
+
+
+def _read_schema(filename: str) -> Dict[str, Any]:
+    try:
+        return json.loads(_storage.read_bytes(_schema_name(filename)).decode("utf-8")) or {}
+    except (OSError, ValueError):
+        return {}
+
 
+def _write_schema(filename: str, schema: Dict[str, Any]) -> None:
+    _storage.write_bytes(_schema_name(filename), json.dumps(schema, ensure_ascii=False, indent=2).encode("utf-8"))
 
-def append_row_csv(filename: str, row: Dict[str, Any], default_columns: Optional[list[str]] = None) -> pd.DataFrame:
+
+def _csv_schema(filename: str) -> Dict[str, Any]:
+    """Sidecar à jour pour l'en-tête courant (détection du délimiteur une seule fois)."""
+    header_line = _read_header_line(filename)
+    schema = _read_schema(filename)
+    if schema.get("header") != header_line:
+        # premier passage, ou fichier remplacé à la main : on re-détecte et on oublie les extras
+        schema = {"header": header_line, "delimiter": _sniff_delimiter(header_line), "extra_columns": []}
+        if header_line:
+            _write_schema(filename, schema)
+    return schema
+
+
+def csv_layout(filename: str) -> tuple[str, list[str]]:
+    """
+    Renvoie (délimiteur, colonnes) d'un CSV : en-tête du fichier + colonnes ajoutées
+    depuis (sidecar). Ne lit que la première ligne.
+    """
+    if not _storage.exists(filename):
+        return ",", []
+    return _layout(_csv_schema(filename))
+
+
+def _layout(schema: Dict[str, Any]) -> tuple[str, list[str]]:
+    delimiter = schema["delimiter"]
+    header_line = schema["header"]
+    header = next(csv.reader([header_line], delimiter=delimiter), []) if header_line else []
+    extras = [c for c in schema.get("extra_columns", []) if c not in header]
+    return delimiter, header + extras
+
+
+def _csv_cell(value: Any) -> Any:
+    return "" if value is None else value
+
+
+@profiler.profiled_io("append_row_csv")
+def append_row_csv(filename: str, row: Dict[str, Any], default_columns: Optional[list[str]] = None) -> None:
     """
-    Ajoute une ligne dans un CSV et renvoie le DataFrame à jour.
+    Ajoute une ligne en fin de CSV sans relire ni réécrire le reste du fichier.
+    Les clés inconnues deviennent des colonnes (l'en-tête est alors réécrit, une fois).
     ⚠️ Sur Streamlit Cloud, l'écriture disque peut ne pas être persistante sur le long terme.
     """
-    df = load_csv(filename, default_columns=default_columns)
-    # Assure que toutes les colonnes existent
-    for k in row.keys():
-        if k not in df.columns:
-            df[k] = None
-    df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-    save_csv(filename, df)
-    return df
+    append_rows_csv(filename, [row], default_columns)
+
+
+@profiler.profiled_io("append_rows_csv")
+def append_rows_csv(
+    filename: str, rows: Iterable[Dict[str, Any]], default_columns: Optional[list[str]] = None
+) -> int:
+    """Comme append_row_csv pour un lot : une seule ouverture, une seule écriture. Renvoie le nombre de lignes."""
+    rows = list(rows)
+    if not rows:
+        return 0
+    if _write_behind is not None:
+        _write_behind.submit("csv", DATA_DIR / filename, rows, default_columns)
+    else:
+        _group_commit.submit(filename, rows, default_columns)
+    return len(rows)
+
+
+def _append_rows(filename: str, rows: list[Dict[str, Any]], default_columns: Optional[list[str]]) -> None:
+    with _storage.lock(filename):
+        _write_rows(filename, rows, default_columns)
+    _cache.invalidate(DATA_DIR / filename)
+
+
+def _csv_bytes(records: Iterable[list[Any]], delimiter: str = ",") -> bytes:
+    buf = StringIO()
+    csv.writer(buf, delimiter=delimiter, lineterminator="\n").writerows(records)
+    return buf.getvalue().encode("utf-8")
+
+
+def _write_rows(filename: str, rows: list[Dict[str, Any]], default_columns: Optional[list[str]]) -> None:
+    keys: list[str] = []
+    seen: set[str] = set()
+    for row in rows:
+        for k in row.keys():
+            if k not in seen:
+                seen.add(k)
+                keys.append(k)
+
+    if _storage.size(filename) == 0:
+        columns = list(default_columns or [])
+        columns += [k for k in keys if k not in columns]
+        payload = _csv_bytes([columns] + [[_csv_cell(row.get(c)) for c in columns] for row in rows])
+        _storage.write_bytes(filename, payload)
+        if profiler.active():
+            profiler.add_bytes(written=len(payload))
+        return
+
+    schema = _csv_schema(filename)
+    delimiter, columns = _layout(schema)
+    new_cols = [k for k in keys if k not in columns]
+    if new_cols or schema.get("extra_columns"):
+        columns += new_cols
+        _rewrite_csv(filename, delimiter, columns)
+
+    with _storage.open_read(filename) as f:
+        f.seek(-1, 2)
+        needs_newline = f.read(1) not in (b"\n", b"\r")
+    payload = (b"\n" if needs_newline else b"") + _csv_bytes(
+        ([_csv_cell(row.get(c)) for c in columns] for row in rows), delimiter
+    )
+    _storage.append_bytes(filename, payload)
+    if profiler.active():
+        profiler.add_bytes(written=len(payload))
+
+
+@profiler.profiled_io("compact_csv")
+def compact_csv(filename: str) -> int:
+    """
+    Réécrit le CSV en flux (ligne à ligne) : l'en-tête absorbe les colonnes hors en-tête des
+    anciens sidecars, les lignes courtes sont complétées, les lignes vides retirées. Fichier
+    temporaire puis remplacement, le journal n'est jamais à moitié écrit. Renvoie le nombre de lignes.
+    """
+    path = DATA_DIR / filename
+    flush_pending(path)
+    if not _storage.exists(filename):
+        return 0
+    with _storage.lock(filename):
+        n = _rewrite_csv(filename, *csv_layout(filename))
+    _cache.invalidate(path)
+    return n
+
+
+def _rewrite_csv(filename: str, delimiter: str, columns: list[str]) -> int:
+    """Réécrit le CSV sous l'en-tête `columns` (verrou tenu par l'appelant) ; renvoie le nombre de lignes."""
+    n = 0
+    size = _storage.size(filename)
+    with _storage.open_read(filename) as raw_src, _storage.writer(filename) as raw_dst:
+        src = TextIOWrapper(raw_src, encoding="utf-8", newline="")
+        dst = TextIOWrapper(raw_dst, encoding="utf-8", newline="")
+        reader = csv.reader(src, delimiter=delimiter)
+        writer = csv.writer(dst, delimiter=delimiter, lineterminator="\n")
+        next(reader, None)
+        writer.writerow(columns)
+        for record in reader:
+            if not any(record):
+                continue
+            writer.writerow(record + [""] * (len(columns) - len(record)))
+            n += 1
+        dst.flush()
+        if profiler.active():
+            profiler.add_bytes(read=size, written=raw_dst.tell())
+        dst.detach()  # le backend ferme (et remplace) lui-même le fichier écrit
+    _write_schema(filename, {"header": _read_header_line(filename), "delimiter": delimiter, "extra_columns": []})
+    return n
+
+
+def wider_than_header(filename: str, n_columns: int) -> ValueError:
+    """Erreur d'un CSV dont des lignes ont plus de champs que l'en-tête (lues décalées sinon)."""
+    return ValueError(
+        f"{filename} : lignes plus larges que l'en-tête ({n_columns} colonnes) ; "
+        "ajoute les colonnes manquantes à l'en-tête (python -m src validate)"
+    )
+
+
+if os.environ.get(STORAGE_ENV):
+    from src.storage import from_env
+
+    use_storage(from_env(os.environ[STORAGE_ENV]))
+
+if os.environ.get(WRITE_BEHIND_ENV) == "1":
+    enable_write_behind()
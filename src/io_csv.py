@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from io import BytesIO, TextIOWrapper
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src import io, profiler
+
+# Partie DataFrame de src.io (pandas), importée paresseusement par src.io.__getattr__.
+
+
+def _csv_engine() -> str:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "c"
+    return "pyarrow"
+
+
+@profiler.profiled_io("load_csv")
+def load_csv(
+    filename: str,
+    default_columns: Optional[list[str]] = None,
+    dtypes: Optional[Dict[str, str]] = None,
+) -> pd.DataFrame:
+    """
+    Charge un CSV (délimiteur détecté). `dtypes` applique un schéma déclaré en une passe
+    vectorisée : "datetime64[ns]", entiers nullables ("Int32"…), "category", etc.
+    Les colonnes déclarées absentes du fichier sont ajoutées vides.
+    """
+    path = io.DATA_DIR / filename
+    io.flush_pending(path)
+    storage = io.storage()
+    stamp = storage.stamp(filename)
+    if stamp[1] >= 0:
+        key = ("csv", str(path), tuple(sorted((dtypes or {}).items())))
+        df = io._cache.get_or_load(
+            key, (stamp,), lambda: _parse_csv(filename, default_columns, dtypes), source=storage.local_path(filename)
+        )
+        if len(df.columns):
+            return df
+    df = pd.DataFrame(columns=default_columns or [])
+    return apply_dtypes(df, dtypes) if dtypes else df
+
+
+def _source(filename: str) -> Union[Path, BytesIO]:
+    """Chemin disque si le backend en a un (lecture directe par pandas), sinon le contenu en mémoire."""
+    storage = io.storage()
+    return storage.local_path(filename) or BytesIO(storage.read_bytes(filename))
+
+
+def _parse_csv(filename: str, default_columns: Optional[list[str]], dtypes: Optional[Dict[str, str]]) -> pd.DataFrame:
+    schema = io._csv_schema(filename)
+    delimiter, columns = io._layout(schema)
+    if not columns:
+        return pd.DataFrame()
+    # names= explicite : les lignes d'avant une colonne "extra" d'un ancien sidecar sont plus
+    # courtes (→ NaN). pyarrow refuse ces lignes courtes : moteur C dans ce cas.
+    if profiler.active():
+        profiler.add_bytes(read=io.storage().size(filename))
+    engine = "c" if schema.get("extra_columns") else _csv_engine()
+    kwargs = dict(sep=delimiter, names=columns, skiprows=1)
+    source = _source(filename)
+    with _wide_rows(filename, columns):
+        try:
+            df = pd.read_csv(source, engine=engine, **kwargs)
+        except Exception:
+            if engine == "c":
+                raise
+            if isinstance(source, BytesIO):
+                source.seek(0)
+            df = pd.read_csv(source, engine="c", **kwargs)
+    _check_width(df, filename, columns)
+    return _typed(df, default_columns, dtypes)
+
+
+_OVERFLOW = "\0débordement"
+
+
+@contextmanager
+def _wide_rows(filename: str, columns: list[str]) -> Iterator[None]:
+    """Erreur explicite (plutôt que celle du tokenizer) pour une ligne plus large que l'en-tête."""
+    try:
+        yield
+    except pd.errors.ParserError as err:
+        if "fields" not in str(err):
+            raise
+        raise io.wider_than_header(filename, len(columns)) from err
+
+
+def _check_width(df: pd.DataFrame, filename: str, columns: list[str]) -> None:
+    # toutes les lignes plus larges : le moteur C prend les champs en trop comme index,
+    # pyarrow comme colonnes sans nom ; dans les deux cas tout est décalé
+    if len(df.columns) != len(columns) or not (isinstance(df.index, pd.RangeIndex) and df.index.step == 1):
+        raise io.wider_than_header(filename, len(columns))
+
+
+def _typed(df: pd.DataFrame, default_columns: Optional[list[str]], dtypes: Optional[Dict[str, str]]) -> pd.DataFrame:
+    if dtypes:
+        for col in list(default_columns or []) + list(dtypes):
+            if col not in df.columns:
+                df[col] = pd.NA
+        df = apply_dtypes(df, dtypes)
+    return df
+
+
+def iter_csv_chunks(
+    filename: str,
+    chunk_rows: int = 50_000,
+    default_columns: Optional[list[str]] = None,
+    dtypes: Optional[Dict[str, str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Même lecture que load_csv, par morceaux de `chunk_rows` lignes typés : mémoire bornée
+    par la taille d'un morceau, rien n'est mis en cache.
+    """
+    io.flush_pending(io.DATA_DIR / filename)
+    if not io.storage().exists(filename):
+        return
+    delimiter, columns = io._layout(io._csv_schema(filename))
+    if not columns:
+        return
+    if profiler.active():
+        profiler.add_bytes(read=io.storage().size(filename))
+    # pyarrow ne sait pas lire par morceaux : moteur C. Par morceaux, il tronque sans rien dire
+    # les lignes trop larges : une colonne témoin en plus recueille le premier champ en trop.
+    names = [*columns, _OVERFLOW]
+    with pd.read_csv(_source(filename), sep=delimiter, names=names, skiprows=1, chunksize=chunk_rows, engine="c") as reader:
+        while True:
+            with _wide_rows(filename, columns):
+                chunk = next(reader, None)
+            if chunk is None:
+                return
+            _check_width(chunk, filename, names)
+            if chunk[_OVERFLOW].notna().any():
+                raise io.wider_than_header(filename, len(columns))
+            yield _typed(chunk.drop(columns=_OVERFLOW), default_columns, dtypes)
+
+
+def apply_dtypes(df: pd.DataFrame, dtypes: Dict[str, str]) -> pd.DataFrame:
+    """Applique un schéma déclaré (voir load_csv) ; renvoie une copie."""
+    df = df.copy()
+    for col, dtype in dtypes.items():
+        if col not in df.columns:
+            df[col] = pd.NA
+        s = df[col]
+        if dtype.startswith("datetime64"):
+            df[col] = pd.to_datetime(s, errors="coerce", format="ISO8601").astype(dtype)
+        elif dtype.lower().startswith(("int", "uint")):
+            # équivalent vectorisé de int(float(x)) : valeurs illisibles ou hors plage du type → <NA>
+            num = np.trunc(pd.to_numeric(s, errors="coerce").astype("float64"))
+            info = np.iinfo(pd.api.types.pandas_dtype(dtype).numpy_dtype)
+            df[col] = num.where(num.between(info.min, info.max)).astype(dtype)
+        else:
+            df[col] = s.astype(dtype)
+    return df
+
+
+@profiler.profiled_io("save_csv")
+def save_csv(filename: str, df: pd.DataFrame) -> None:
+    """Réécrit tout le fichier (compaction) sous les colonnes de `df`."""
+    path = io.DATA_DIR / filename
+    io.flush_pending(path)  # ajouts en attente d'abord, sinon ils suivraient la réécriture
+    storage = io.storage()
+    with storage.lock(filename):
+        delimiter = io.csv_layout(filename)[0] if storage.exists(filename) else ","
+        with storage.writer(filename) as raw:
+            f = TextIOWrapper(raw, encoding="utf-8", newline="")
+            df.to_csv(f, index=False, sep=delimiter, lineterminator="\n")
+            f.flush()
+            if profiler.active():
+                profiler.add_bytes(written=raw.tell())
+            f.detach()
+        io._write_schema(filename, {"header": io._read_header_line(filename), "delimiter": delimiter, "extra_columns": []})
+    io._cache.invalidate(path)
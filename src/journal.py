@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import os
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Optional
+
+import pandas as pd
+
+from src import io
+from src.io import append_rows_csv, load_csv
+
+# -------------------- SCHÉMA --------------------
+JOURNAL_FILE = "journal.csv"
+
+JOURNAL_COLS = [
+    "date", "titre", "style", "etat", "temps_min",
+    "objectif_du_jour", "blocage", "apprentissage", "next_step",
+    "lien_audio", "score_monstrable"
+]
+ETATS = ["idée", "démo", "presque fini", "sorti"]
+
+# Types appliqués une seule fois au chargement : plus de pd.to_datetime / safe_int à chaque rerun.
+# Représentation compacte (~1 octet/ligne pour etat/style, 2 et 1 pour les entiers) ; `titre`
+# en catégorie : chaque titre répété (plusieurs lignes par projet) n'est stocké qu'une fois.
+JOURNAL_DTYPES = {
+    "date": "datetime64[ns]",
+    "temps_min": "Int16",
+    "score_monstrable": "Int8",
+    "etat": "category",
+    "style": "category",
+    "titre": "category",
+    "objectif_du_jour": "string",
+    "blocage": "string",
+    "apprentissage": "string",
+    "next_step": "string",
+    "lien_audio": "string",
+}
+
+# "csv" (défaut, data/journal.csv) ou "sqlite" (data/journal.sqlite3, voir src.journal_sqlite)
+JOURNAL_BACKEND = os.environ.get("ARTIST_COMPASS_JOURNAL_BACKEND", "csv")
+
+_sqlite_journal = None
+
+
+def sqlite_journal():
+    global _sqlite_journal
+    if _sqlite_journal is None:
+        from src.journal_sqlite import SqliteJournal
+
+        _sqlite_journal = SqliteJournal()
+    return _sqlite_journal
+
+
+def use_sqlite() -> bool:
+    return JOURNAL_BACKEND == "sqlite"
+
+
+def _stats():
+    from src.aggregates import journal_stats
+
+    return journal_stats
+
+
+# -------------------- LECTURE / ÉCRITURE --------------------
+def load_journal_csv(filename: str = JOURNAL_FILE) -> pd.DataFrame:
+    """
+    Journal typé : `date` en datetime64 (NaT si illisible), entiers nullables,
+    `etat`/`style` en catégories. Toutes les colonnes de JOURNAL_COLS sont présentes.
+    Objet partagé (cache src.io) : ne pas le modifier en place.
+    """
+    return load_csv(filename, default_columns=JOURNAL_COLS, dtypes=JOURNAL_DTYPES)
+
+
+def load_journal() -> pd.DataFrame:
+    """Journal complet typé, quel que soit le moteur de stockage."""
+    if use_sqlite():
+        return sqlite_journal().to_dataframe()
+    return load_journal_csv()
+
+
+def append_entry(row: Dict[str, Any]) -> None:
+    append_entries([row])
+
+
+def append_entries(rows: Iterable[Dict[str, Any]]) -> int:
+    """Ajout d'un lot en une seule écriture (import en masse) ; renvoie le nombre d'entrées."""
+    rows = list(rows)
+    if not rows:
+        return 0
+    if use_sqlite():
+        return sqlite_journal().append_many(rows)
+    append_rows_csv(JOURNAL_FILE, rows, default_columns=JOURNAL_COLS)
+    if io.write_behind_enabled():
+        return len(rows)  # les index rattraperont à la prochaine lecture, sans bloquer l'envoi
+    # rattrape les lignes ajoutées (lecture de la fin du fichier seulement)
+    from src.journal_index import refresh_loaded_indexes
+
+    _stats().state()
+    refresh_loaded_indexes(JOURNAL_FILE)
+    return len(rows)
+
+
+def export_journal_csv(compress: bool = False) -> bytes:
+    """CSV du journal (gzip si `compress`), généré par morceaux et mis en cache par version."""
+    from src.export import journal_export_bytes
+
+    return journal_export_bytes(compress)
+
+
+# -------------------- REQUÊTES DU DASHBOARD --------------------
+# CSV : lectures dans les agrégats maintenus à chaque ajout (src.aggregates) ;
+# SQLite : requêtes indexées.
+def count_entries() -> int:
+    if use_sqlite():
+        return sqlite_journal().count()
+    return _stats().count()
+
+
+def minutes_since(since: datetime) -> int:
+    if use_sqlite():
+        return sqlite_journal().minutes_since(since)
+    return _stats().minutes_since(since)
+
+
+def count_by_etat() -> Dict[str, int]:
+    if use_sqlite():
+        return sqlite_journal().count_by_etat()
+    return _stats().count_by_etat()
+
+
+def latest_entries(n: int = 8) -> pd.DataFrame:
+    if use_sqlite():
+        return sqlite_journal().latest(n)
+    return _stats().latest(n)
+
+
+def count_by_style() -> Dict[str, int]:
+    if use_sqlite():
+        return sqlite_journal().count_by_style()
+    return _stats().count_by_style()
+
+
+def time_series(freq: str = "W") -> pd.DataFrame:
+    """Minutes et score_monstrable par semaine ("W") ou par mois ("M"), depuis les totaux par jour."""
+    from src.analytics import daily_totals, period_series
+
+    return period_series(*daily_totals(), freq)
+
+
+# -------------------- PROJETS (entrées regroupées par titre) --------------------
+# CSV : index src.projects maintenu à chaque ajout ; SQLite : idx_journal_titre.
+def project_state() -> Dict[str, Any]:
+    """État publié de l'index des projets ({"projects", "by_style", "done_by_style"}), quel que soit le moteur."""
+    if use_sqlite():
+        return sqlite_journal().project_state()
+    from src.projects import journal_projects
+
+    return journal_projects.state()
+
+
+def _projects() -> Dict[str, Dict[str, Any]]:
+    return project_state()["projects"]
+
+
+def list_projects() -> pd.DataFrame:
+    """Un projet par ligne : dates, état courant, minutes, scores (activité récente d'abord)."""
+    from src.projects import projects_frame
+
+    return projects_frame(_projects())
+
+
+def unfinished_projects() -> list[Dict[str, Any]]:
+    """Projets pas encore « sorti », sans relire le journal."""
+    from src.projects import unfinished
+
+    return unfinished(_projects())
+
+
+def project_timeline(titre: str) -> pd.DataFrame:
+    """Séances d'un projet dans l'ordre chronologique."""
+    if use_sqlite():
+        return sqlite_journal().project_timeline(titre)
+    from src.projects import journal_projects
+
+    return journal_projects.timeline(titre)
+
+
+# -------------------- VUE PAGINÉE --------------------
+# Filtres communs : bornes de dates incluses, listes d'états / de styles (None = tous).
+def count_filtered(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    etats: Optional[Iterable[str]] = None,
+    styles: Optional[Iterable[str]] = None,
+) -> int:
+    if use_sqlite():
+        return sqlite_journal().count_filtered(date_from, date_to, etats, styles)
+    return _stats().count_filtered(date_from, date_to, etats, styles)
+
+
+def filter_mask(
+    df: pd.DataFrame,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    etats: Optional[Iterable[str]] = None,
+    styles: Optional[Iterable[str]] = None,
+) -> pd.Series:
+    """Masque booléen des filtres communs sur un journal typé (ou un morceau de journal)."""
+    mask = pd.Series(True, index=df.index)
+    if date_from:
+        mask &= df["date"] >= pd.Timestamp(date_from)
+    if date_to:
+        mask &= df["date"] <= pd.Timestamp(date_to)
+    if etats:
+        mask &= df["etat"].isin(list(etats))
+    if styles:
+        mask &= df["style"].isin(list(styles))
+    return mask
+
+
+def query_page(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    etats: Optional[Iterable[str]] = None,
+    styles: Optional[Iterable[str]] = None,
+    sort_by: str = "date",
+    ascending: bool = False,
+    offset: int = 0,
+    limit: int = 50,
+) -> pd.DataFrame:
+    """Seule la tranche [offset, offset + limit) du résultat filtré et trié est renvoyée."""
+    if use_sqlite():
+        return sqlite_journal().query_page(date_from, date_to, etats, styles, sort_by, ascending, offset, limit)
+    df = load_journal_csv()
+    view = df[filter_mask(df, date_from, date_to, etats, styles)]
+    if sort_by in view.columns:
+        view = view.sort_values(sort_by, ascending=ascending, na_position="last", kind="stable")
+    return view.iloc[offset:offset + limit]
+
+
+def search_entries(query: str, limit: int = 50) -> pd.DataFrame:
+    """Recherche plein texte (sans accents, préfixes, tous les termes) ; récentes d'abord."""
+    if use_sqlite():
+        return sqlite_journal().search(query, limit)
+    from src.search import journal_search
+
+    return journal_search.search(query, limit)
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import atexit
+import copy
+import csv
+import hashlib
+import json
+import threading
+import weakref
+from io import StringIO
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src import io, profiler
+from src.journal import JOURNAL_FILE
+
+# Index dérivés du journal CSV (stats, recherche…), persistés dans data/.index/.
+# Le journal est append-only : chaque index mémorise jusqu'où il a lu (offset en octets)
+# et ne relit que la fin du fichier. Si le fichier a été réécrit (save_csv, édition à la
+# main), le filigrane ne correspond plus et l'index est reconstruit.
+INDEX_DIRNAME = ".index"
+_TAIL_CHECK_BYTES = 256
+# lectures tentées avec les lignes en file avant de se rabattre sur l'attente de l'écriture
+_OVERLAY_ATTEMPTS = 3
+
+
+def index_path(name: str) -> Path:
+    return io.DATA_DIR / INDEX_DIRNAME / name
+
+
+def iter_csv_records(
+    filename: str = JOURNAL_FILE, start: Optional[int] = None
+) -> Iterator[Tuple[int, int, Dict[str, str]]]:
+    """
+    Parcourt les lignes d'un CSV à partir de l'offset `start` (défaut : après l'en-tête).
+    Renvoie (offset début, offset fin, ligne) ; s'arrête avant une ligne incomplète.
+    N'attend pas les ajouts en écriture différée (à l'appelant de le faire, voir TailIndex.state).
+    """
+    if not io.storage().exists(filename):
+        return
+    delimiter, columns = io.csv_layout(filename)
+    with io.storage().open_read(filename) as f:
+        if start is None:
+            f.readline()
+            start = f.tell()
+        else:
+            f.seek(start)
+        pos = record_start = start
+        pending: list[bytes] = []
+        quotes = 0
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break  # écriture en cours (ou fichier sans saut de ligne final)
+            pending.append(raw)
+            pos += len(raw)
+            quotes += raw.count(b'"')
+            if quotes % 2:
+                continue  # champ entre guillemets sur plusieurs lignes
+            text = b"".join(pending).decode("utf-8")
+            pending, quotes = [], 0
+            if text.strip():
+                values = next(csv.reader(StringIO(text, newline=""), delimiter=delimiter), [])
+                if len(values) > len(columns):
+                    raise io.wider_than_header(filename, len(columns))
+                yield record_start, pos, dict(zip(columns, values))
+            record_start = pos
+    if profiler.active():
+        profiler.add_bytes(read=pos - start)
+
+
+def read_csv_records(offsets: Iterable[int], filename: str = JOURNAL_FILE) -> list[Dict[str, str]]:
+    """Relit des lignes précises par offset (un seek chacune, sans parcourir le fichier)."""
+    io.flush_pending(io.DATA_DIR / filename)
+    delimiter, columns = io.csv_layout(filename)
+    rows = []
+    with io.storage().open_read(filename) as f:
+        for offset in offsets:
+            f.seek(offset)
+            pending = [f.readline()]
+            while sum(line.count(b'"') for line in pending) % 2 and pending[-1].endswith(b"\n"):
+                pending.append(f.readline())
+            text = b"".join(pending).decode("utf-8")
+            values = next(csv.reader(StringIO(text, newline=""), delimiter=delimiter), [])
+            if len(values) > len(columns):
+                raise io.wider_than_header(filename, len(columns))
+            rows.append(dict(zip(columns, values)))
+    return rows
+
+
+def _tail_hash(filename: str, offset: int) -> str:
+    with io.storage().open_read(filename) as f:
+        f.seek(max(0, offset - _TAIL_CHECK_BYTES))
+        return hashlib.sha1(f.read(min(offset, _TAIL_CHECK_BYTES))).hexdigest()
+
+
+_instances: "weakref.WeakSet[TailIndex]" = weakref.WeakSet()
+
+
+def loaded_indexes() -> list["TailIndex"]:
+    return list(_instances)
+
+
+def flush_loaded_indexes() -> None:
+    """Écrit les points de reprise en attente de tous les index chargés (fin du process)."""
+    for index in list(_instances):
+        try:
+            index.flush()
+        except OSError:
+            pass  # dérivé : au pire, les dernières lignes seront relues du journal au démarrage
+
+
+atexit.register(flush_loaded_indexes)
+
+
+def refresh_loaded_indexes(filename: str = JOURNAL_FILE) -> None:
+    """Rattrape un ajout dans les index déjà chargés en mémoire (les autres rattraperont à la lecture)."""
+    for index in list(_instances):
+        if index.filename == filename and index._state is not None:
+            index.state()
+
+
+class TailIndex:
+    """
+    Base des index incrémentaux : sous-classes → `empty()`, `apply(state, start, row)` et
+    `fork(state, rows)`. `state()` rattrape les lignes ajoutées depuis la dernière lecture
+    (O(nouvelles lignes)) sur une copie, publiée ensuite : un état renvoyé n'est plus jamais
+    modifié, les lecteurs le parcourent sans verrou pendant que d'autres sessions ajoutent.
+    """
+
+    name = "index.json"
+    version = 1
+    # Sauvegarde sur disque toutes les N lignes appliquées : entre deux points de reprise,
+    # le journal lui-même sert de log (relu depuis le filigrane sauvegardé au démarrage).
+    checkpoint_rows = 1
+    # écriture différée : lignes en file appliquées à une copie (voir state()). Réservé aux
+    # index dont les lectures n'utilisent pas les offsets pour relire le fichier.
+    overlay_pending = False
+
+    def __init__(self, filename: str = JOURNAL_FILE) -> None:
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._state: Optional[Dict[str, Any]] = None
+        self._stamp: Any = None
+        self._unsaved = 0
+        self._rebuild = False
+        self._overlay: Optional[Tuple[Dict[str, Any], Tuple[int, int], Dict[str, Any]]] = None
+        _instances.add(self)
+
+    # ---------- à surcharger ----------
+    def empty(self) -> Dict[str, Any]:
+        return {}
+
+    def apply(self, state: Dict[str, Any], start: int, row: Dict[str, str]) -> None:
+        raise NotImplementedError
+
+    def fork(self, state: Dict[str, Any], rows: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Copie de `state` que apply() peut modifier pour ces lignes sans toucher l'original."""
+        return copy.deepcopy(state)
+
+    # ---------- persistance ----------
+    @property
+    def storage_name(self) -> str:
+        return f"{INDEX_DIRNAME}/{Path(self.filename).stem}.{self.name}"
+
+    @property
+    def path(self) -> Path:
+        return io.DATA_DIR / self.storage_name
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        try:
+            state = json.loads(io.storage().read_bytes(self.storage_name).decode("utf-8"))
+        except (OSError, ValueError):
+            return None
+        return state if state.get("_version") == self.version else None
+
+    def _save(self, state: Dict[str, Any]) -> None:
+        io.storage().write_bytes(self.storage_name, json.dumps(state, ensure_ascii=False).encode("utf-8"), durable=False)
+
+    def _valid(self, state: Dict[str, Any]) -> bool:
+        wm = state.get("_watermark") or {}
+        offset = wm.get("offset", 0)
+        storage = io.storage()
+        if not storage.exists(self.filename) or storage.size(self.filename) < offset:
+            return False
+        columns = io.csv_layout(self.filename)[1]
+        if columns[: len(wm.get("columns", []))] != wm.get("columns"):
+            return False
+        return _tail_hash(self.filename, offset) == wm.get("tail_hash")
+
+    # ---------- API ----------
+    def state(self, pending: bool = True) -> Dict[str, Any]:
+        """
+        État à jour. Avec l'écriture différée, si l'index le permet (`overlay_pending`), les
+        lignes encore en file sont appliquées à une copie au lieu d'attendre le disque : la
+        session qui vient d'ajouter relit son ajout sans bloquer. `pending=False` : état des
+        seules lignes écrites (offsets réels), après attente de l'écriture.
+        """
+        journal = io.DATA_DIR / self.filename
+        for _ in range(_OVERLAY_ATTEMPTS if pending and self.overlay_pending else 0):
+            generation = io.queued_rows(journal)[0]
+            state = self._catch_up(journal)
+            again, writing_at, rows = io.queued_rows(journal)
+            # aucune écriture terminée pendant la lecture, ni commencée avant l'endroit où elle s'est arrêtée
+            if again == generation and (writing_at is None or state["_watermark"]["offset"] <= writing_at):
+                return self._with_queued(state, generation, rows)
+        io.flush_pending(journal)  # lire ses propres ajouts (écriture différée)
+        return self._catch_up(journal)
+
+    def _with_queued(self, state: Dict[str, Any], generation: int, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if not rows:
+            return state
+        key = (generation, len(rows))
+        with self._lock:
+            cached = self._overlay
+            if cached is not None and cached[0] is state and cached[1] == key:
+                return cached[2]
+            # mêmes valeurs que relues du CSV ; offsets provisoires au-delà de la fin du fichier
+            rows = [{k: "" if v is None else str(v) for k, v in row.items()} for row in rows]
+            view = self.fork(state, rows)
+            end = state["_watermark"]["offset"]
+            for i, row in enumerate(rows):
+                self.apply(view, end + i, row)
+            self._overlay = (state, key, view)
+            return view
+
+    def _catch_up(self, journal: Path) -> Dict[str, Any]:
+        stamp = io.file_stamp(journal)
+        with self._lock:
+            if self._state is not None and stamp == self._stamp:
+                return self._state
+            # état publié : jamais modifié en place ; chargé / neuf : pas encore visible, modifié directement
+            state, owned = self._state, False
+            if state is None:
+                state, owned = (None if self._rebuild else self._load()), True
+            if state is None or not self._valid(state):
+                state, owned = self._fresh(), True
+            self._rebuild = False
+            fresh = not state["_watermark"]["tail_hash"]
+            offset = state["_watermark"]["offset"] or None
+            records: Iterable[Tuple[int, int, Dict[str, str]]] = iter_csv_records(self.filename, offset)
+            if not owned:
+                records = list(records)
+                if records:
+                    state = self.fork(state, [row for _, _, row in records])
+            end = offset
+            applied = 0
+            for start, end, row in records:
+                self.apply(state, start, row)
+                applied += 1
+            if end != offset and io.storage().exists(self.filename):
+                state["_watermark"] = {
+                    "offset": end or 0,
+                    "columns": io.csv_layout(self.filename)[1],
+                    "tail_hash": _tail_hash(self.filename, end or 0),
+                }
+            self._unsaved += applied
+            if fresh or self._unsaved >= self.checkpoint_rows:
+                self._save(state)
+                self._unsaved = 0
+            self._state, self._stamp = state, stamp
+            return state
+
+    def flush(self) -> None:
+        """Écrit le point de reprise en attente (fin de session, CLI)."""
+        with self._lock:
+            if self._state is not None and self._unsaved:
+                self._save(self._state)
+                self._unsaved = 0
+
+    def unload(self) -> None:
+        """Oublie l'état en mémoire (le prochain accès repart du point de reprise disque)."""
+        self.flush()
+        with self._lock:
+            self._state = None
+            self._stamp = None
+
+    def rebuild(self) -> Dict[str, Any]:
+        """À lancer après une édition manuelle du CSV (non détectable par le filigrane)."""
+        with self._lock:
+            self._state = None
+            self._stamp = None
+            self._rebuild = True
+        return self.state()
+
+    def _fresh(self) -> Dict[str, Any]:
+        state = self.empty()
+        state["_version"] = self.version
+        state["_watermark"] = {"offset": 0, "columns": [], "tail_hash": None}
+        return state
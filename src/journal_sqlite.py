@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import pandas as pd
+
+from src import io
+from src.analytics import first_day
+from src.journal import ETATS, JOURNAL_COLS, JOURNAL_DTYPES, JOURNAL_FILE
+
+# Moteur SQLite optionnel du journal (ARTIST_COMPASS_JOURNAL_BACKEND=sqlite).
+# Index sur date / etat / style : "8 dernières entrées" ou "minutes sur 7 jours"
+# deviennent des lectures indexées au lieu de scans pandas. La base est un fichier de la
+# copie locale du backend de stockage (stockage objet : envoyée par l'API de sauvegarde).
+DB_FILE = "journal.sqlite3"
+# Recherche : texte replié de chaque entrée (src.search.tokenize : sans accents ni casse) dans
+# une table FTS5 de même rowid que `journal`, interrogée en préfixes ("mel"* AND "refrain"*),
+# comme l'index du CSV. Sans FTS5 (SQLite compilé sans), table ordinaire + LIKE en début de mot.
+SEARCH_TABLE = "journal_fts"
+
+_INT_COLS = {c for c, t in JOURNAL_DTYPES.items() if t.lower().startswith("int")}
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _search_body(values: Iterable[Any]) -> str:
+    from src.search import tokenize
+
+    return " ".join(tok for v in values if v is not None for tok in tokenize(str(v)))
+
+
+def _sql_value(value: Any) -> Any:
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.strftime("%Y-%m-%d")
+    if hasattr(value, "item"):  # scalaires numpy
+        return value.item()
+    return value
+
+
+class SqliteJournal:
+    """Journal stocké dans une table SQLite indexée (colonnes = JOURNAL_COLS + ajouts)."""
+
+    def __init__(self, filename: str = DB_FILE) -> None:
+        # SQLite écrit lui-même son fichier : il faut un backend avec copie locale (pas la mémoire)
+        path = io.storage().local_path(filename)
+        if path is None:
+            raise ValueError(f"journal SQLite impossible avec le stockage {io.storage().kind!r} (aucun fichier local)")
+        self.path = path
+        self._lock = threading.Lock()
+        self._columns: Optional[list[str]] = None
+        self._ready = False
+        self._fts = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        con = sqlite3.connect(self.path)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def ensure_schema(self) -> None:
+        cols = ", ".join(
+            f"{_quote(c)} {'INTEGER' if c in _INT_COLS else 'TEXT'}" for c in JOURNAL_COLS
+        )
+        with self._connect() as con:
+            con.execute(f"CREATE TABLE IF NOT EXISTS journal (id INTEGER PRIMARY KEY, {cols})")
+            con.execute("CREATE INDEX IF NOT EXISTS idx_journal_date ON journal(date)")
+            con.execute("CREATE INDEX IF NOT EXISTS idx_journal_etat ON journal(etat)")
+            con.execute("CREATE INDEX IF NOT EXISTS idx_journal_style ON journal(style)")
+            con.execute("CREATE INDEX IF NOT EXISTS idx_journal_titre ON journal(titre)")
+            self._ensure_search(con)
+        self._columns = None
+        self._ready = True
+
+    def _ensure_search(self, con: sqlite3.Connection) -> None:
+        """Table de recherche ; remplie d'un coup si elle vient d'être créée (base existante)."""
+        from src.search import SEARCH_FIELDS
+
+        found = con.execute("SELECT sql FROM sqlite_master WHERE name = ?", (SEARCH_TABLE,)).fetchone()
+        if found:
+            self._fts = "fts5" in found[0].lower()
+            return
+        try:
+            con.execute(f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(body)")
+            self._fts = True
+        except sqlite3.OperationalError:  # pas de module FTS5
+            con.execute(f"CREATE TABLE {SEARCH_TABLE} (id INTEGER PRIMARY KEY, body TEXT)")
+            self._fts = False
+        fields = ", ".join(_quote(c) for c in SEARCH_FIELDS if c in self.columns(con))
+        if fields:
+            cur = con.execute(f"SELECT id, {fields} FROM journal")
+            con.executemany(
+                f"INSERT INTO {SEARCH_TABLE}(rowid, body) VALUES (?, ?)", ((r[0], _search_body(r[1:])) for r in cur)
+            )
+
+    def columns(self, con: Optional[sqlite3.Connection] = None) -> list[str]:
+        if self._columns is None:
+            if con is None:
+                with self._connect() as con:
+                    info = con.execute("PRAGMA table_info(journal)").fetchall()
+            else:
+                info = con.execute("PRAGMA table_info(journal)").fetchall()
+            self._columns = [r[1] for r in info if r[1] != "id"]
+        return self._columns
+
+    def _add_columns(self, con: sqlite3.Connection, names: list[str]) -> None:
+        # ALTER TABLE ADD COLUMN ne réécrit pas la table
+        for name in names:
+            con.execute(f"ALTER TABLE journal ADD COLUMN {_quote(name)} TEXT")
+        self._columns = None
+
+    # ---------- écriture ----------
+    def append(self, row: Dict[str, Any]) -> None:
+        self.append_many([row])
+
+    def append_many(self, rows: list[Dict[str, Any]]) -> int:
+        if not rows:
+            return 0
+        if not self._ready:
+            self.ensure_schema()
+        with self._lock, self._connect() as con:
+            self._insert(con, rows)
+        return len(rows)
+
+    def _insert(self, con: sqlite3.Connection, rows: list[Dict[str, Any]]) -> None:
+        from src.search import SEARCH_FIELDS
+
+        if not con.in_transaction:
+            con.execute("BEGIN IMMEDIATE")  # ids attribués ici : aucun autre process entre MAX(id) et l'insertion
+        known = self.columns(con)
+        new_cols: list[str] = []
+        for row in rows:
+            new_cols += [k for k in row if k not in known and k not in new_cols]
+        if new_cols:
+            self._add_columns(con, new_cols)
+        names = known + new_cols
+        first = con.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM journal").fetchone()[0]
+        ids = range(first, first + len(rows))
+        placeholders = ", ".join("?" for _ in names)
+        sql = f"INSERT INTO journal (id, {', '.join(_quote(c) for c in names)}) VALUES (?, {placeholders})"
+        con.executemany(sql, [[i] + [_sql_value(r.get(c)) for c in names] for i, r in zip(ids, rows)])
+        con.executemany(
+            f"INSERT INTO {SEARCH_TABLE}(rowid, body) VALUES (?, ?)",
+            [(i, _search_body(_sql_value(r.get(c)) for c in SEARCH_FIELDS)) for i, r in zip(ids, rows)],
+        )
+
+    def migrate_from_csv(self, filename: str = JOURNAL_FILE, replace: bool = False) -> int:
+        """Import unique de journal.csv (refuse d'écraser une base non vide sauf replace=True)."""
+        from src.journal import load_journal_csv
+
+        df = load_journal_csv(filename)
+        rows = df.astype(object).where(df.notna(), None).to_dict("records")
+        self.ensure_schema()
+        with self._lock, self._connect() as con:
+            existing = con.execute("SELECT COUNT(*) FROM journal").fetchone()[0]
+            if existing and not replace:
+                raise RuntimeError(f"{self.path.name} contient déjà {existing} entrées (replace=True pour écraser).")
+            con.execute("DELETE FROM journal")
+            con.execute(f"DELETE FROM {SEARCH_TABLE}")
+            self._insert(con, rows)
+        return len(rows)
+
+    # ---------- lecture ----------
+    def _frame(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        with self._connect() as con:
+            cur = con.execute(sql, params)
+            names = [d[0] for d in cur.description]
+            df = pd.DataFrame.from_records(cur.fetchall(), columns=names)
+        df = df.drop(columns=["id"], errors="ignore")
+        return io.apply_dtypes(df, JOURNAL_DTYPES)
+
+    def count(self) -> int:
+        if not self.path.exists():
+            return 0
+        with self._connect() as con:
+            return con.execute("SELECT COUNT(*) FROM journal").fetchone()[0]
+
+    def latest(self, n: int = 8) -> pd.DataFrame:
+        if not self.path.exists():
+            return io.apply_dtypes(pd.DataFrame(columns=JOURNAL_COLS), JOURNAL_DTYPES)
+        # deux lectures indexées : dates connues (idx_journal_date), puis dates vides en dernier
+        df = self._frame(
+            "SELECT * FROM journal WHERE date IS NOT NULL ORDER BY date DESC, id DESC LIMIT ?", (int(n),)
+        )
+        if len(df) < n:
+            rest = self._frame("SELECT * FROM journal WHERE date IS NULL ORDER BY id DESC LIMIT ?", (int(n) - len(df),))
+            df = pd.concat([df, rest], ignore_index=True) if len(df) else rest
+        return df
+
+    def minutes_since(self, since: datetime) -> int:
+        if not self.path.exists():
+            return 0
+        with self._connect() as con:
+            total = con.execute(
+                "SELECT COALESCE(SUM(temps_min), 0) FROM journal WHERE date >= ?", (first_day(since),)
+            ).fetchone()[0]
+        return int(total)
+
+    def count_by_etat(self) -> Dict[str, int]:
+        counts = {k: 0 for k in ETATS}
+        if not self.path.exists():
+            return counts
+        with self._connect() as con:
+            for etat, n in con.execute("SELECT etat, COUNT(*) FROM journal GROUP BY etat"):
+                counts[etat] = n
+        return counts
+
+    def count_by_style(self) -> Dict[str, int]:
+        if not self.path.exists():
+            return {}
+        with self._connect() as con:
+            return {style or "": n for style, n in con.execute("SELECT style, COUNT(*) FROM journal GROUP BY style")}
+
+    def daily_totals(self) -> tuple[Dict[str, int], Dict[str, list[int]]]:
+        """(minutes par jour, [somme, nombre] des scores par jour) en un GROUP BY sur idx_journal_date."""
+        minutes: Dict[str, int] = {}
+        scores: Dict[str, list[int]] = {}
+        if not self.path.exists():
+            return minutes, scores
+        with self._connect() as con:
+            cur = con.execute(
+                "SELECT date, COALESCE(SUM(temps_min), 0), COALESCE(SUM(score_monstrable), 0), COUNT(score_monstrable)"
+                " FROM journal WHERE date IS NOT NULL GROUP BY date"
+            )
+            for day, mins, score, score_n in cur:
+                if mins:
+                    minutes[day] = int(mins)
+                if score_n:
+                    scores[day] = [int(score), int(score_n)]
+        return minutes, scores
+
+    # ---------- projets (même état que src.projects.ProjectIndex, offsets = id) ----------
+    def project_state(self) -> Dict[str, Any]:
+        """État de l'index des projets, recalculé une fois par version de la base (mémoïsé ensuite)."""
+        from src.projects import journal_projects
+
+        def build() -> Dict[str, Any]:
+            state = journal_projects.empty()
+            with self._connect() as con:
+                cur = con.execute(
+                    "SELECT id, titre, date, etat, style, temps_min, score_monstrable FROM journal"
+                    " WHERE titre IS NOT NULL AND titre != '' ORDER BY id"
+                )
+                names = [d[0] for d in cur.description][1:]
+                for rowid, *values in cur:
+                    journal_projects.apply(state, rowid, dict(zip(names, values)))
+            return state
+
+        if not self.path.exists():
+            return journal_projects.empty()
+        return io.memoize_file("sqlite-projects", self.path, build)
+
+    def projects(self) -> Dict[str, Dict[str, Any]]:
+        """Projets par titre."""
+        return self.project_state()["projects"]
+
+    def project_timeline(self, titre: str) -> pd.DataFrame:
+        """Séances d'un projet par date, via idx_journal_titre."""
+        from src.projects import timeline_frame
+
+        if not self.path.exists():
+            return timeline_frame([])
+        with self._connect() as con:
+            cur = con.execute("SELECT * FROM journal WHERE titre = ? ORDER BY date IS NULL, date, id", (titre,))
+            names = [d[0] for d in cur.description]
+            rows = [dict(zip(names, r)) for r in cur.fetchall()]
+        return timeline_frame(rows)
+
+    def _where(self, date_from, date_to, etats, styles) -> tuple[str, list]:
+        clauses, params = [], []
+        if date_from:
+            clauses.append("date >= ?")
+            params.append(date_from.isoformat())
+        if date_to:
+            clauses.append("date <= ?")
+            params.append(date_to.isoformat())
+        for col, values in (("etat", etats), ("style", styles)):
+            values = list(values or [])
+            if values:
+                clauses.append(f"{col} IN ({', '.join('?' for _ in values)})")
+                params += values
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count_filtered(self, date_from=None, date_to=None, etats=None, styles=None) -> int:
+        if not self.path.exists():
+            return 0
+        where, params = self._where(date_from, date_to, etats, styles)
+        with self._connect() as con:
+            return con.execute(f"SELECT COUNT(*) FROM journal{where}", params).fetchone()[0]
+
+    def query_page(
+        self, date_from=None, date_to=None, etats=None, styles=None,
+        sort_by: str = "date", ascending: bool = False, offset: int = 0, limit: int = 50,
+    ) -> pd.DataFrame:
+        if not self.path.exists():
+            return io.apply_dtypes(pd.DataFrame(columns=JOURNAL_COLS), JOURNAL_DTYPES)
+        where, params = self._where(date_from, date_to, etats, styles)
+        order = "id"
+        if sort_by in self.columns():
+            col = _quote(sort_by)
+            order = f"{col} IS NULL, {col} {'ASC' if ascending else 'DESC'}, id"
+        return self._frame(f"SELECT * FROM journal{where} ORDER BY {order} LIMIT ? OFFSET ?", (*params, int(limit), int(offset)))
+
+    def search(self, query: str, limit: int = 50) -> pd.DataFrame:
+        """
+        Même sémantique que src.search : termes sans accents, chacun préfixe d'un mot, tous
+        requis ; récentes d'abord. Requête FTS5 (index), sans balayage de la table journal.
+        """
+        from src.search import RESULT_COLS, tokenize
+
+        terms = tokenize(query)
+        if not terms or not self.path.exists():
+            return io.apply_dtypes(pd.DataFrame(columns=RESULT_COLS), JOURNAL_DTYPES)[RESULT_COLS]
+        if not self._ready:
+            self.ensure_schema()  # crée et remplit la table de recherche d'une base existante
+        if self._fts:
+            # tokens [a-z0-9]+ : rien à échapper entre guillemets
+            match = f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH ?"
+            params: tuple = (" AND ".join(f'"{t}"*' for t in terms),)
+        else:
+            match = f"SELECT rowid FROM {SEARCH_TABLE} WHERE " + " AND ".join("(' ' || body) LIKE ?" for _ in terms)
+            params = tuple(f"% {t}%" for t in terms)
+        with self._connect() as con:
+            cur = con.execute(
+                f"SELECT * FROM journal WHERE id IN ({match}) ORDER BY id DESC LIMIT ?", params + (int(limit),)
+            )
+            names = [d[0] for d in cur.description]
+            df = pd.DataFrame.from_records(cur.fetchall(), columns=names)
+        return io.apply_dtypes(df, JOURNAL_DTYPES)[RESULT_COLS]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        if not self.path.exists():
+            return io.apply_dtypes(pd.DataFrame(columns=JOURNAL_COLS), JOURNAL_DTYPES)
+        return io.memoize_file("sqlite", self.path, lambda: self._frame("SELECT * FROM journal ORDER BY id"))
+
+    def iter_rows(self, chunk_rows: int = 5000) -> Iterator[tuple[list[str], list[tuple]]]:
+        """(colonnes, lot de lignes) par paquets de `chunk_rows`, sans tout charger en mémoire."""
+        if not self.path.exists():
+            return
+        with self._connect() as con:
+            cur = con.execute("SELECT * FROM journal ORDER BY id")
+            names = [d[0] for d in cur.description]
+            keep = [i for i, n in enumerate(names) if n != "id"]
+            columns = [names[i] for i in keep]
+            while True:
+                batch = cur.fetchmany(chunk_rows)
+                if not batch:
+                    break
+                yield columns, [tuple(r[i] for i in keep) for r in batch]
+
+
+if __name__ == "__main__":
+    n = SqliteJournal().migrate_from_csv()
+    print(f"{n} entrées migrées vers data/{DB_FILE}")
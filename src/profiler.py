@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional
+
+# Profilage par rerun (mode debug) : durée de chaque section de page et de chaque appel
+# src.io, octets lus / écrits. Activé par session (?debug=1) ou pour tout le monde
+# (ARTIST_COMPASS_DEBUG=1). Hors debug, section() renvoie un contexte vide partagé et
+# les hooks src.io se limitent à un test sur une variable locale au thread.
+DEBUG_ENV = "ARTIST_COMPASS_DEBUG"
+LOG_NAME = "profile.jsonl"
+HISTORY_MAX = 500
+
+_local = threading.local()
+_NULL = nullcontext()
+
+
+def _record() -> Optional[Dict[str, Any]]:
+    return getattr(_local, "record", None)
+
+
+def active() -> bool:
+    return getattr(_local, "record", None) is not None
+
+
+def debug_requested(query_params: Optional[Any] = None) -> bool:
+    if os.environ.get(DEBUG_ENV) == "1":
+        return True
+    return query_params is not None and str(query_params.get("debug", "")) == "1"
+
+
+# ---------- mesure ----------
+def begin_rerun(page: str) -> None:
+    _local.record = {
+        "page": page,
+        "ts": time.time(),
+        "sections": {},
+        "io": {},
+        "bytes_read": 0,
+        "bytes_written": 0,
+        "_t0": time.perf_counter(),
+    }
+
+
+def end_rerun(log_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Termine le rerun courant, l'ajoute au log JSON-lines `log_name` (nom relatif à data/,
+    écrit par le backend de stockage actif) et le renvoie (None hors debug).
+    """
+    record = _record()
+    if record is None:
+        return None
+    _local.record = None
+    record["total_s"] = time.perf_counter() - record.pop("_t0")
+    if log_name is not None:
+        from src.io import storage
+
+        storage().append_bytes(log_name, (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+    return record
+
+
+@contextmanager
+def _timed(bucket: str, name: str) -> Iterator[None]:
+    record = _record()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        if record is not None:
+            durations = record[bucket]
+            durations[name] = durations.get(name, 0.0) + time.perf_counter() - t0
+
+
+def section(name: str):
+    """`with section("stats"):` — chronomètre un bloc de page (no-op hors debug)."""
+    if getattr(_local, "record", None) is None:
+        return _NULL
+    return _timed("sections", name)
+
+
+def profiled_io(name: str):
+    """Décorateur des fonctions src.io : un appel direct hors debug."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "record", None) is None:
+                return fn(*args, **kwargs)
+            with _timed("io", name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def add_bytes(read: int = 0, written: int = 0) -> None:
+    record = getattr(_local, "record", None)
+    if record is not None:
+        record["bytes_read"] += read
+        record["bytes_written"] += written
+
+
+# ---------- rapport ----------
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def summarize(history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """p50 / p90 / max par section et par appel io sur l'historique de la session."""
+    series: Dict[str, List[float]] = {}
+    for record in history:
+        series.setdefault("total", []).append(record["total_s"])
+        for bucket in ("sections", "io"):
+            for name, seconds in record[bucket].items():
+                series.setdefault(f"{bucket}:{name}", []).append(seconds)
+    return [
+        {
+            "nom": name,
+            "n": len(values),
+            "p50_ms": round(_percentile(values, 0.5) * 1000, 2),
+            "p90_ms": round(_percentile(values, 0.9) * 1000, 2),
+            "max_ms": round(max(values) * 1000, 2),
+        }
+        for name, values in series.items()
+    ]
+
+
+def render_panel(record: Optional[Dict[str, Any]], history: List[Dict[str, Any]]) -> None:
+    """Panneau de la sidebar : dernier rerun + percentiles de la session."""
+    import streamlit as st
+
+    if record is not None:
+        history.append(record)
+        del history[:-HISTORY_MAX]
+    with st.sidebar.expander("⏱️ Perf (debug)", expanded=True):
+        if not history:
+            st.caption("Aucun rerun mesuré.")
+            return
+        last = history[-1]
+        st.write(f"**Dernier rerun :** {last['total_s'] * 1000:.1f} ms")
+        st.caption(f"Lu : {last['bytes_read']:,} o · écrit : {last['bytes_written']:,} o".replace(",", " "))
+        rows = [{"section": k, "ms": round(v * 1000, 2)} for k, v in last["sections"].items()]
+        rows += [{"section": f"io · {k}", "ms": round(v * 1000, 2)} for k, v in last["io"].items()]
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+        st.caption(f"Session : {len(history)} reruns")
+        st.dataframe(summarize(history), hide_index=True, use_container_width=True)
+
+        from src.io import write_behind_info
+
+        wb = write_behind_info()
+        if wb is not None:
+            st.caption(
+                f"Écriture différée : file {wb['queue_depth']} · en attente {wb['pending']} · "
+                f"écrit {wb['written']} · latence moy. {wb['flush_avg_ms']} ms (max {wb['flush_max_ms']} ms)"
+                + (f" · ⚠️ {wb['errors']} erreur(s)" if wb["errors"] else "")
+            )
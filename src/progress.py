@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from src import io
+
+# Progression des checklists (templates, contraintes des styles) dans data/progress.json :
+# une entrée par liste ("template/<nom>", "style/<nom>"), avec l'empreinte de la liste,
+# l'empreinte courte de chaque item (pour migrer) et, par projet, un bitset en hexadécimal
+# (bit i = item i coché). Tout le fichier se relit en une lecture (cache src.io) ; les
+# changements sont gardés en mémoire puis écrits en une fois par flush().
+PROGRESS_FILE = "progress.json"
+FORMAT_VERSION = 1
+# projet par défaut : progression du template hors projet
+NO_PROJECT = ""
+
+
+# empreinte courte d'un item (hex) ; celles d'une liste sont stockées bout à bout
+ITEM_HASH_LEN = 8
+
+
+@lru_cache(maxsize=4096)
+def _hash_tuple(items: Tuple[str, ...]) -> str:
+    return hashlib.sha1("\x1f".join(items).encode("utf-8")).hexdigest()[:12]
+
+
+def checklist_hash(items: Sequence[str]) -> str:
+    return _hash_tuple(tuple(items))
+
+
+def _item_hashes(items: Sequence[str]) -> str:
+    return "".join(hashlib.sha1(i.encode("utf-8")).hexdigest()[:ITEM_HASH_LEN] for i in items)
+
+
+def _split(hashes: str) -> List[str]:
+    return [hashes[k:k + ITEM_HASH_LEN] for k in range(0, len(hashes), ITEM_HASH_LEN)]
+
+
+def migrate_bits(bits: int, old_items: str, new_items: str) -> int:
+    """Suit chaque item (empreintes courtes) de son ancienne position à la nouvelle ; items retirés oubliés."""
+    positions: Dict[str, List[int]] = {}
+    for pos, h in enumerate(_split(old_items)):
+        positions.setdefault(h, []).append(pos)
+    out = 0
+    for j, h in enumerate(_split(new_items)):
+        if positions.get(h):
+            out |= ((bits >> positions[h].pop(0)) & 1) << j
+    return out
+
+
+def bits_of(states: Sequence[bool]) -> int:
+    return sum(1 << i for i, done in enumerate(states) if done)
+
+
+class _Pending:
+    """Liste modifiée en mémoire : état complet (pour les lectures) et projets touchés (pour la fusion)."""
+
+    __slots__ = ("h", "items", "progress", "changed")
+
+    def __init__(self, h: str, items: str, progress: Dict[str, str], changed: Set[str]) -> None:
+        self.h, self.items, self.progress, self.changed = h, items, progress, changed
+
+
+class ProgressStore:
+    def __init__(self, filename: str = PROGRESS_FILE) -> None:
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._dirty: Dict[str, _Pending] = {}
+        self.writes = 0
+
+    def _lists(self) -> Dict[str, Any]:
+        doc = io.load_json(self.filename, default={})
+        if not isinstance(doc, dict) or doc.get("version") != FORMAT_VERSION:
+            return {}
+        return doc.get("lists", {})
+
+    def _entry(self, key: str, items: Sequence[str]) -> Optional[_Pending]:
+        """État courant de la liste, migré en mémoire si ses items ont changé depuis l'écriture."""
+        pending = self._dirty.get(key)
+        if pending is None:
+            stored = self._lists().get(key)
+            if stored is None:
+                return None
+            pending = _Pending(stored["h"], stored["i"], stored["p"], set())
+        h = checklist_hash(items)
+        if pending.h != h:
+            new_items = _item_hashes(items)
+            migrated = {
+                p: format(migrate_bits(int(v, 16), pending.items, new_items), "x") for p, v in pending.progress.items()
+            }
+            pending = self._dirty[key] = _Pending(h, new_items, migrated, set(migrated))
+        return pending
+
+    # ---------- lecture ----------
+    def get(self, kind: str, name: str, items: Sequence[str], project: str = NO_PROJECT) -> int:
+        """Bitset des items cochés (bit i = item i)."""
+        with self._lock:
+            entry = self._entry(f"{kind}/{name}", items)
+            return int(entry.progress.get(project, "0"), 16) if entry else 0
+
+    def completion(self, kind: str, lists: Dict[str, Sequence[str]], project: str = NO_PROJECT) -> Dict[str, Tuple[int, int]]:
+        """(items cochés, items) pour chaque liste, depuis le même document en mémoire."""
+        return {name: (bin(self.get(kind, name, items, project)).count("1"), len(items)) for name, items in lists.items()}
+
+    # ---------- écriture (différée) ----------
+    def set(self, kind: str, name: str, items: Sequence[str], bits: int, project: str = NO_PROJECT) -> bool:
+        """Enregistre en mémoire jusqu'au prochain flush() ; False si rien n'a changé."""
+        key = f"{kind}/{name}"
+        with self._lock:
+            entry = self._entry(key, items)
+            if (int(entry.progress.get(project, "0"), 16) if entry else 0) == bits:
+                return False
+            if entry is None:
+                entry = _Pending(checklist_hash(items), _item_hashes(items), {}, set())
+            progress = dict(entry.progress)
+            progress[project] = format(bits, "x")
+            self._dirty[key] = _Pending(entry.h, entry.items, progress, entry.changed | {project})
+        return True
+
+    def flush(self) -> int:
+        """Écrit toutes les listes modifiées en une seule sauvegarde ; renvoie leur nombre."""
+        with self._lock:
+            if not self._dirty:
+                return 0
+            dirty, self._dirty = self._dirty, {}
+            with io.storage().lock(self.filename):
+                lists = dict(self._lists())
+                for key, pending in dirty.items():
+                    stored = lists.get(key)
+                    progress = dict(pending.progress)
+                    # même version de la liste sur disque : on garde les projets touchés ailleurs entre-temps
+                    if stored and stored["h"] == pending.h:
+                        progress.update({p: v for p, v in stored["p"].items() if p not in pending.changed})
+                    lists[key] = {"h": pending.h, "i": pending.items, "p": {p: v for p, v in progress.items() if v != "0"}}
+                io.save_json(self.filename, {"version": FORMAT_VERSION, "lists": lists})
+            self.writes += 1
+            return len(dirty)
+
+
+progress_store = ProgressStore()
+
+
+def checklist(kind: str, name: str, items: Sequence[str], project: str = NO_PROJECT, numbered: bool = True) -> Tuple[int, int]:
+    """Cases à cocher Streamlit restaurées depuis le store ; écrit les changements en une fois."""
+    import streamlit as st
+
+    # clé unique par checklist : deux templates aux mêmes items ne partagent pas leurs cases
+    owner = hashlib.sha1(f"{kind}/{name}".encode("utf-8")).hexdigest()[:ITEM_HASH_LEN]
+    h = checklist_hash(items)
+    bits = progress_store.get(kind, name, items, project)
+    states = [
+        st.checkbox(
+            f"{i}. {item}" if numbered else item, value=bool(bits >> (i - 1) & 1), key=f"ck_{owner}_{h}_{project}_{i}",
+        )
+        for i, item in enumerate(items, start=1)
+    ]
+    if progress_store.set(kind, name, items, bits_of(states), project):
+        progress_store.flush()
+    return sum(states), len(items)
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src import io
+from src.aggregates import to_day, to_int, to_score
+from src.journal import ETATS, JOURNAL_DTYPES, JOURNAL_FILE
+from src.journal_index import TailIndex, read_csv_records
+
+# Projets du journal (une ligne par séance, plusieurs par titre) maintenus à chaque ajout
+# (data/.index/journal.projects.json) : dates, état courant, minutes, scores et offsets
+# des lignes, plus le nombre de projets (et de terminés) par style courant. Vue
+# chronologique d'un projet = relecture de ses seules lignes par offset.
+DONE_ETAT = ETATS[-1]
+PROJECT_COLS = [
+    "titre", "style", "etat", "premiere", "derniere", "entrees", "minutes", "score_debut", "score_fin", "score_tendance",
+]
+TIMELINE_COLS = ["date", "etat", "temps_min", "score_monstrable", "objectif_du_jour", "next_step"]
+
+
+def summarize(titre: str, p: Dict[str, Any]) -> Dict[str, Any]:
+    scores = p["scores"]
+    first = scores[0][1] if scores else None
+    last = scores[-1][1] if scores else None
+    return {
+        "titre": titre,
+        "style": p["style"],
+        "etat": p["etat"],
+        "premiere": p["first"],
+        "derniere": p["last"],
+        "entrees": len(p["offsets"]),
+        "minutes": p["minutes"],
+        "score_debut": first,
+        "score_fin": last,
+        "score_tendance": None if first is None else last - first,
+    }
+
+
+def summaries_frame(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=PROJECT_COLS)
+    for col in ("premiere", "derniere"):
+        df[col] = pd.to_datetime(df[col], format="ISO8601", errors="coerce")
+    return df
+
+
+def add_entry(projects: Dict[str, Dict[str, Any]], start: int, row: Dict[str, Any]) -> None:
+    """Ajoute une ligne du journal (offset CSV ou id SQLite `start`) au projet de son titre."""
+    titre = (row.get("titre") or "").strip()
+    if not titre:
+        return
+    day = to_day(row.get("date"))
+    p = projects.get(titre)
+    if p is None:
+        p = projects[titre] = {
+            "first": day, "last": day, "etat": None, "etat_at": "", "style": None,
+            "minutes": 0, "scores": [], "offsets": [],
+        }
+    p["offsets"].append(start)
+    p["minutes"] += to_int(row.get("temps_min"))
+    if day and (p["first"] is None or day < p["first"]):
+        p["first"] = day
+    if day and (p["last"] is None or day > p["last"]):
+        p["last"] = day
+    # état / style courants = ceux de la séance la plus récente (à date égale, la dernière écrite)
+    if (day or "") >= p["etat_at"]:
+        p["etat_at"] = day or ""
+        p["etat"] = row.get("etat") or p["etat"]
+        p["style"] = row.get("style") or p["style"]
+    score = to_score(row.get("score_monstrable"))
+    if score is not None:
+        scores = p["scores"]
+        scores.append([day or "", score])
+        if len(scores) > 1 and scores[-2][0] > scores[-1][0]:
+            scores.sort(key=lambda s: s[0])  # séance saisie après coup
+
+
+def titles(projects: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Titres, activité la plus récente d'abord."""
+    return sorted(projects, key=lambda t: projects[t]["last"] or "", reverse=True)
+
+
+def projects_frame(projects: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+    return summaries_frame([summarize(t, projects[t]) for t in titles(projects)])
+
+
+def unfinished(projects: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Projets dont la dernière séance n'est pas « sorti », plus récents d'abord — O(projets)."""
+    rows = [summarize(t, p) for t, p in projects.items() if p["etat"] != DONE_ETAT]
+    return sorted(rows, key=lambda r: r["derniere"] or "", reverse=True)
+
+
+def timeline_frame(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    df = pd.DataFrame([{c: r.get(c) if r.get(c) != "" else None for c in TIMELINE_COLS} for r in rows], columns=TIMELINE_COLS)
+    df = io.apply_dtypes(df, {c: t for c, t in JOURNAL_DTYPES.items() if c in TIMELINE_COLS})
+    return df.sort_values("date", na_position="last", kind="stable").reset_index(drop=True)
+
+
+def _status(p: Optional[Dict[str, Any]]) -> Optional[Tuple[str, bool]]:
+    """(style courant, terminé) d'un projet, None s'il n'est compté dans aucun style."""
+    return (p["style"], p["etat"] == DONE_ETAT) if p is not None and p["style"] else None
+
+
+class ProjectIndex(TailIndex):
+    name = "projects.json"
+    version = 2
+    # offsets de toutes les lignes : > 10 Mo sur 200 000 séances, réécrit toutes les 200 lignes
+    # (et à l'arrêt) ; au démarrage, les lignes d'après le point de reprise sont relues du CSV
+    checkpoint_rows = 200
+    # résumés lisibles avec les ajouts en file ; la chronologie relit par offset (état écrit seulement)
+    overlay_pending = True
+
+    def empty(self) -> Dict[str, Any]:
+        return {"projects": {}, "by_style": {}, "done_by_style": {}}
+
+    def apply(self, state: Dict[str, Any], start: int, row: Dict[str, str]) -> None:
+        projects = state["projects"]
+        titre = (row.get("titre") or "").strip()
+        before = _status(projects.get(titre))
+        add_entry(projects, start, row)
+        after = _status(projects.get(titre))
+        if before == after:
+            return
+        # le projet change de style ou d'état : déplacé d'un compteur à l'autre
+        for status, step in ((before, -1), (after, 1)):
+            if status is None:
+                continue
+            style, done = status
+            for counts in (state["by_style"], state["done_by_style"]) if done else (state["by_style"],):
+                counts[style] = counts.get(style, 0) + step
+                if not counts[style]:
+                    del counts[style]
+
+    def fork(self, state: Dict[str, Any], rows: List[Dict[str, str]]) -> Dict[str, Any]:
+        # seuls les projets des nouvelles lignes sont dupliqués (listes comprises)
+        projects = dict(state["projects"])
+        for titre in {(r.get("titre") or "").strip() for r in rows}:
+            p = projects.get(titre)
+            if p is not None:
+                projects[titre] = {**p, "scores": list(p["scores"]), "offsets": list(p["offsets"])}
+        return {
+            **state, "projects": projects,
+            "by_style": dict(state["by_style"]), "done_by_style": dict(state["done_by_style"]),
+        }
+
+    def projects(self) -> Dict[str, Dict[str, Any]]:
+        return self.state()["projects"]
+
+    def timeline(self, titre: str) -> pd.DataFrame:
+        """Séances d'un projet dans l'ordre chronologique (relecture de ses seules lignes)."""
+        p = self.state(pending=False)["projects"].get(titre)
+        return timeline_frame(read_csv_records(p["offsets"], self.filename) if p else [])
+
+
+journal_projects = ProjectIndex(JOURNAL_FILE)
+
+
+if __name__ == "__main__":
+    s = journal_projects.rebuild()
+    print(f"Projets reconstruits : {len(s['projects'])} ({journal_projects.path})")
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src import io
+from src.aggregates import to_day, to_int, to_score
+from src.catalog import Catalog, bpm_range
+from src.journal import JOURNAL_FILE, project_state, sqlite_journal, use_sqlite
+from src.journal_index import TailIndex
+
+# Recommandation style / template pour les boutons « 🎲 Random » : tirage pondéré au lieu
+# d'uniforme. Historique par style maintenu à chaque ajout (data/.index/journal.styles.json,
+# O(1) par ligne), complétion lue dans l'index des projets (src.projects) ; côté catalogue,
+# une matrice de caractéristiques (une ligne par style) calculée une fois par catalogue,
+# dont seules les colonnes issues du journal sont recalculées (en vectoriel) quand
+# l'historique bouge. Score = matrice @ poids.
+FEATURES = ["focus", "completion", "score_moyen", "nouveaute", "en_cours"]
+WEIGHTS = np.array([1.0, 0.8, 0.6, 0.3, 0.5])
+# température du tirage : plus bas = plus proche du classement strict
+TEMPERATURE = 0.35
+# jours sans séance pour qu'un style redevienne « neuf » (nouveauté ≈ 0.63)
+NOVELTY_DAYS = 14.0
+# BPM max de la grille de rapprochement template ↔ style
+BPM_GRID = 300
+
+
+# (historique, projets, jour) d'un calcul : états publiés, comparés par identité
+_StateKey = Tuple[Dict[str, Any], Dict[str, Any], str]
+
+
+def _key(name: Any) -> str:
+    return str(name or "").strip().casefold()
+
+
+class StyleHistory(TailIndex):
+    name = "styles.json"
+    version = 2
+    overlay_pending = True
+    checkpoint_rows = 200
+
+    def empty(self) -> Dict[str, Any]:
+        return {"count": 0, "styles": {}}
+
+    def apply(self, state: Dict[str, Any], start: int, row: Dict[str, str]) -> None:
+        state["count"] += 1
+        style = _key(row.get("style"))
+        if not style:
+            return
+        s = state["styles"].get(style)
+        if s is None:
+            s = state["styles"][style] = {"entries": 0, "minutes": 0, "score_sum": 0, "score_n": 0, "last": None}
+        s["entries"] += 1
+        s["minutes"] += to_int(row.get("temps_min"))
+        score = to_score(row.get("score_monstrable"))
+        if score is not None:
+            s["score_sum"] += score
+            s["score_n"] += 1
+        day = to_day(row.get("date"))
+        if day and (s["last"] is None or day > s["last"]):
+            s["last"] = day
+
+    def fork(self, state: Dict[str, Any], rows: List[Dict[str, str]]) -> Dict[str, Any]:
+        styles = dict(state["styles"])
+        for style in {_key(r.get("style")) for r in rows}:
+            if style in styles:
+                styles[style] = dict(styles[style])
+        return {**state, "styles": styles}
+
+
+journal_style_history = StyleHistory(JOURNAL_FILE)
+
+
+def history_state() -> Dict[str, Any]:
+    """Historique par style, quel que soit le moteur (SQLite : rejoué une fois par version de la base)."""
+    if not use_sqlite():
+        return journal_style_history.state()
+    db = sqlite_journal()
+
+    def build() -> Dict[str, Any]:
+        state = journal_style_history.empty()
+        with db._connect() as con:
+            cur = con.execute("SELECT id, date, titre, style, etat, temps_min, score_monstrable FROM journal ORDER BY id")
+            names = [d[0] for d in cur.description][1:]
+            for rowid, *values in cur:
+                journal_style_history.apply(state, rowid, dict(zip(names, values)))
+        return state
+
+    if not db.path.exists():
+        return journal_style_history.empty()
+    return io.memoize_file("sqlite-styles", db.path, build)
+
+
+class Recommender:
+    """Classement des styles et templates d'un catalogue pour un profil donné."""
+
+    def __init__(self, catalog: Catalog, focus: Sequence[str], finish_first: bool = False) -> None:
+        self.catalog = catalog
+        self.focus = tuple(focus)
+        self.finish_first = finish_first
+        names = catalog.style_names
+        self._rows: Dict[str, int] = {}
+        for i, name in enumerate(names):
+            self._rows.setdefault(_key(name), i)
+        wanted = {_key(f) for f in self.focus}
+        self._focus = np.array([_key(n) in wanted for n in names], float)
+        # (clé, matrice, scores) publiés d'un bloc et jamais modifiés ensuite : un rerun
+        # concurrent lit l'ancien triplet ou le nouveau, jamais un mélange
+        self._computed: Optional[Tuple[_StateKey, np.ndarray, np.ndarray]] = None
+        self._template_links: Optional[Dict[str, np.ndarray]] = None
+        self._templates: Optional[Tuple[_StateKey, np.ndarray]] = None
+
+    # ---------- colonnes issues du journal ----------
+    def _refresh(self) -> Tuple[_StateKey, np.ndarray, np.ndarray]:
+        state, projects = history_state(), project_state()
+        today = date.today().isoformat()
+        computed = self._computed
+        if computed is not None and computed[0][0] is state and computed[0][1] is projects and computed[0][2] == today:
+            return computed
+        # projets / terminés par style courant, tenus à jour par l'index des projets
+        completion: Dict[str, List[int]] = {}
+        for style, n in projects["by_style"].items():
+            c = completion.setdefault(_key(style), [0, 0])
+            c[0] += n
+            c[1] += projects["done_by_style"].get(style, 0)
+        hist = [(self._rows[k], s, completion.get(k, (0, 0))) for k, s in state["styles"].items() if k in self._rows]
+        n = len(self.catalog.style_names)
+        cols = np.zeros((4, n))
+        last = np.full(n, np.nan)
+        if hist:
+            rows = np.array([i for i, _, _ in hist])
+            stats = np.array([[c[0], c[1], s["score_sum"], s["score_n"]] for _, s, c in hist], float)
+            np.add.at(cols.T, rows, stats)
+            days = np.array([s["last"] or "NaT" for _, s, _ in hist], dtype="datetime64[D]")
+            delta = np.datetime64(today, "D") - days
+            age = np.where(np.isnat(delta), np.nan, delta.astype(float))
+            np.fmin.at(last, rows, age)
+        n_projects, done, score_sum, score_n = cols
+        # lissage : sans historique, 50 % de complétion et un score moyen de 2,5 / 5
+        X = np.empty((n, len(FEATURES)))
+        X[:, 0] = self._focus
+        X[:, 1] = (done + 1) / (n_projects + 2)
+        X[:, 2] = (score_sum + 2.5) / (score_n + 1) / 5
+        X[:, 3] = np.where(np.isnan(last), 1.0, 1 - np.exp(-np.nan_to_num(last, nan=0).clip(0) / NOVELTY_DAYS))
+        X[:, 4] = (n_projects > done) if self.finish_first else 0.0
+        computed = self._computed = ((state, projects, today), X, X @ WEIGHTS)
+        return computed
+
+    def style_scores(self) -> np.ndarray:
+        return self._refresh()[2]
+
+    # ---------- templates : score du meilleur style associé ----------
+    def _links(self) -> Dict[str, np.ndarray]:
+        """
+        Lien template → styles, calculé une fois par catalogue : style nommé en préfixe
+        (« <style> — … »), sinon styles dont la plage BPM chevauche la sienne. Les plages
+        sont posées sur une grille d'un BPM, pour un max par case puis par template.
+        """
+        if self._template_links is None:
+            named = np.array(
+                [self._rows.get(_key(str(name).split("—")[0]), -1) for name in self.catalog.template_names], int
+            )
+
+            def cells(ranges: List[Optional[Tuple[float, float]]]) -> Tuple[np.ndarray, np.ndarray]:
+                # (ligne, case BPM) pour chaque case couverte par chaque plage
+                lo = np.array([r[0] if r else 1.0 for r in ranges], float)
+                hi = np.array([r[1] if r else 0.0 for r in ranges], float)
+                lo = np.clip(np.floor(lo), 0, BPM_GRID).astype(int)
+                hi = np.clip(np.ceil(hi), -1, BPM_GRID).astype(int)
+                width = np.maximum(hi - lo + 1, 0)
+                rows = np.repeat(np.arange(len(ranges)), width)
+                starts = np.repeat(np.cumsum(width) - width, width)
+                return rows, np.repeat(lo, width) + np.arange(width.sum()) - starts
+
+            s_rows, s_cells = cells([bpm_range(st.get("bpm")) for st in self.catalog.styles])
+            t_rows, t_cells = cells([
+                None if i >= 0 else bpm_range(t.get("bpm")) for i, t in zip(named, self.catalog.templates)
+            ])
+            self._template_links = {"named": named, "s_rows": s_rows, "s_cells": s_cells, "t_rows": t_rows, "t_cells": t_cells}
+        return self._template_links
+
+    def template_scores(self) -> np.ndarray:
+        key, _, scores = self._refresh()
+        cached = self._templates
+        if cached is not None and cached[0] is key:
+            return cached[1]
+        links = self._links()
+        best = np.full(BPM_GRID + 1, -np.inf)
+        np.maximum.at(best, links["s_cells"], scores[links["s_rows"]])
+        out = np.full(len(self.catalog.template_names), -np.inf)
+        np.maximum.at(out, links["t_rows"], best[links["t_cells"]])
+        named = links["named"]
+        out[named >= 0] = scores[named[named >= 0]]
+        # template sans style associé : score médian, ni favorisé ni écarté
+        out[np.isinf(out)] = float(np.median(scores)) if len(scores) else 0.0
+        self._templates = (key, out)
+        return out
+
+    # ---------- sorties ----------
+    def rank_styles(self, n: Optional[int] = None) -> pd.DataFrame:
+        _, X, scores = self._refresh()
+        order = np.argsort(-scores, kind="stable")[:n]
+        df = pd.DataFrame(X[order], columns=FEATURES)
+        df.insert(0, "style", [self.catalog.style_names[i] for i in order])
+        df["total"] = scores[order]
+        return df
+
+    def rank_templates(self, n: Optional[int] = None) -> List[str]:
+        order = np.argsort(-self.template_scores(), kind="stable")[:n]
+        return [self.catalog.template_names[i] for i in order]
+
+    def pick_style(self, rng: Optional[np.random.Generator] = None) -> Optional[str]:
+        return _sample(self.catalog.style_names, self.style_scores(), rng)
+
+    def pick_template(self, rng: Optional[np.random.Generator] = None) -> Optional[str]:
+        return _sample(self.catalog.template_names, self.template_scores(), rng)
+
+
+def _sample(names: List[str], scores: np.ndarray, rng: Optional[np.random.Generator]) -> Optional[str]:
+    """Tirage softmax(score / TEMPERATURE) : les mieux classés sortent plus souvent, les autres restent possibles."""
+    if not names:
+        return None
+    z = (scores - scores.max()) / TEMPERATURE
+    p = np.exp(z)
+    p /= p.sum()
+    return names[int((rng or np.random.default_rng()).choice(len(names), p=p))]
+
+
+_recommenders: Dict[Tuple[int, str, Tuple[str, ...], bool], Recommender] = {}
+
+
+def _catalog_key(catalog: Catalog) -> Tuple[int, str]:
+    """Catalogue de base + empreinte des templates ajoutés : une vue recréée à chaque rerun garde sa clé."""
+    extra = json.dumps(catalog.extra_templates, sort_keys=True, ensure_ascii=False, default=str)
+    return id(catalog.base), hashlib.sha1(extra.encode("utf-8")).hexdigest()
+
+
+def recommender(catalog: Catalog, profile: Dict[str, Any]) -> Recommender:
+    """
+    Recommender partagé par catalogue + profil : styles_cibles limités à
+    regles.focus_styles_max, projets en cours favorisés si regles.terminer_avant_nouveau.
+    """
+    regles = profile.get("regles", {}) or {}
+    focus = profile.get("styles_cibles", []) or []
+    focus = [focus] if not isinstance(focus, list) else focus
+    try:
+        focus = focus[:max(0, int(regles.get("focus_styles_max", len(focus))))]
+    except (TypeError, ValueError):
+        pass
+    key = (*_catalog_key(catalog), tuple(focus), bool(regles.get("terminer_avant_nouveau")))
+    rec = _recommenders.get(key)
+    if rec is None or rec.catalog.base is not catalog.base:
+        if len(_recommenders) > 16:
+            _recommenders.clear()
+        rec = _recommenders[key] = Recommender(catalog, key[2], key[3])
+    return rec
+
+
+if __name__ == "__main__":
+    import time
+
+    from src.catalog import load_catalog
+
+    rec = recommender(load_catalog(), io.load_yaml("profile.yaml", default={}))
+    t0 = time.perf_counter()
+    print(rec.rank_styles(10).to_string(index=False))
+    t1 = time.perf_counter()
+    rec.style_scores()
+    t2 = time.perf_counter()
+    print(f"classement : {(t1 - t0) * 1000:.1f} ms (à froid), {(t2 - t1) * 1000:.3f} ms (à chaud)")
+    print("templates :", rec.rank_templates(5))
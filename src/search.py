@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Set, Tuple
+
+import pandas as pd
+
+from src import io
+from src.journal import JOURNAL_DTYPES, JOURNAL_FILE
+from src.journal_index import TailIndex, read_csv_records
+
+# Recherche plein texte dans le journal : index inversé token → offsets des lignes,
+# tokens sans accents ni casse ("mélodie" = "melodie"), requêtes en ET avec préfixes.
+SEARCH_FIELDS = ["titre", "style", "objectif_du_jour", "blocage", "apprentissage", "next_step"]
+RESULT_COLS = ["date", "titre", "style", "etat", "objectif_du_jour", "blocage", "apprentissage", "next_step"]
+
+_LIGATURES = str.maketrans({"œ": "oe", "æ": "ae"})
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def fold(text: str) -> str:
+    """Minuscules sans accents : "Écriture" → "ecriture"."""
+    text = unicodedata.normalize("NFKD", text.casefold().translate(_LIGATURES))
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(fold(text or ""))
+
+
+class SearchIndex(TailIndex):
+    name = "search.json"
+    # index volumineux : point de reprise toutes les 200 lignes, le reste est relu du journal
+    checkpoint_rows = 200
+
+    def __init__(self, filename: str = JOURNAL_FILE) -> None:
+        super().__init__(filename)
+        # (postings, vocabulaire trié) : un seul attribut, remplacé d'un bloc entre threads
+        self._vocab: Tuple[Any, List[str]] = (None, [])
+
+    def empty(self) -> Dict[str, Any]:
+        return {"postings": {}}
+
+    @staticmethod
+    def _row_tokens(row: Dict[str, str]) -> Set[str]:
+        tokens: Set[str] = set()
+        for field in SEARCH_FIELDS:
+            tokens.update(tokenize(row.get(field) or ""))
+        return tokens
+
+    def apply(self, state: Dict[str, Any], start: int, row: Dict[str, str]) -> None:
+        postings = state["postings"]
+        for tok in self._row_tokens(row):
+            docs = postings.get(tok)
+            if docs is None:
+                postings[tok] = [start]
+                owner, vocab = self._vocab
+                if owner is postings:
+                    insort(vocab, tok)
+            else:
+                docs.append(start)
+
+    def fork(self, state: Dict[str, Any], rows: List[Dict[str, str]]) -> Dict[str, Any]:
+        # seules les listes des termes des nouvelles lignes sont dupliquées ; le vocabulaire
+        # trié suit la copie (apply() y insère les nouveaux termes)
+        postings = dict(state["postings"])
+        for tok in set().union(*map(self._row_tokens, rows)):
+            if tok in postings:
+                postings[tok] = list(postings[tok])
+        owner, vocab = self._vocab
+        if owner is state["postings"]:
+            self._vocab = (postings, list(vocab))
+        return {**state, "postings": postings}
+
+    def _sorted_vocab(self, postings: Dict[str, List[int]]) -> List[str]:
+        # vocabulaire trié pour les préfixes ; tenu à jour par apply() tant que c'est le même index
+        owner, vocab = self._vocab
+        if owner is not postings:
+            vocab = sorted(postings)
+            self._vocab = (postings, vocab)
+        return vocab
+
+    def _matching(self, postings: Dict[str, List[int]], prefix: str) -> Set[int]:
+        vocab = self._sorted_vocab(postings)
+        docs: Set[int] = set()
+        i = bisect_left(vocab, prefix)
+        while i < len(vocab) and vocab[i].startswith(prefix):
+            docs.update(postings[vocab[i]])
+            i += 1
+        return docs
+
+    def search_offsets(self, query: str, limit: int = 50) -> List[int]:
+        """Offsets des lignes contenant tous les termes (chaque terme = préfixe), récentes d'abord."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        postings = self.state()["postings"]
+        hits: Set[int] = set()
+        for n, term in enumerate(sorted(set(terms), key=len, reverse=True)):
+            docs = self._matching(postings, term)
+            hits = docs if n == 0 else hits & docs
+            if not hits:
+                return []
+        return sorted(hits, reverse=True)[:limit]
+
+    def search(self, query: str, limit: int = 50) -> pd.DataFrame:
+        rows = read_csv_records(self.search_offsets(query, limit), self.filename)
+        df = pd.DataFrame([{c: r.get(c) or None for c in RESULT_COLS} for r in rows], columns=RESULT_COLS)
+        return io.apply_dtypes(df, {c: t for c, t in JOURNAL_DTYPES.items() if c in RESULT_COLS})
+
+
+journal_search = SearchIndex(JOURNAL_FILE)
+
+
+if __name__ == "__main__":
+    s = journal_search.rebuild()
+    print(f"Index de recherche reconstruit : {len(s['postings'])} termes ({journal_search.path})")
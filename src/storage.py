@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import itertools
+import threading
+from contextlib import contextmanager
+from io import BytesIO
+from pathlib import Path
+from typing import IO, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+# Stockage des fichiers de données, par nom relatif à data/ ("profile.yaml", "journal.csv",
+# ".index/journal.stats.json"). src.io passe par le backend actif (src.io.storage()) pour
+# load_* / save_* / append_row(s)_csv / compact_csv et les index du journal :
+# - FileStorage : le dossier data/ (comportement historique : verrous, écritures atomiques) ;
+# - MemoryStorage : dictionnaire en mémoire, pour les tests et les benchmarks ;
+# - ObjectStoreStorage (src.storage_s3) : data/ comme copie de travail, synchronisée par
+#   lots compressés avec un stockage objet compatible S3.
+# ARTIST_COMPASS_STORAGE=file|memory|s3 choisit le backend au démarrage.
+STORAGE_ENV = "ARTIST_COMPASS_STORAGE"
+
+# (version, taille) ; taille -1 = absent. Fichiers : (mtime_ns, taille).
+Version = Tuple[int, int]
+MISSING: Version = (0, -1)
+
+
+class Storage:
+    """Interface commune ; les sous-classes implémentent stamp / open_read / writer / append_bytes / lock."""
+
+    kind = "abstract"
+
+    def stamp(self, name: str) -> Version:
+        raise NotImplementedError
+
+    def exists(self, name: str) -> bool:
+        return self.stamp(name)[1] >= 0
+
+    def size(self, name: str) -> int:
+        return max(self.stamp(name)[1], 0)
+
+    def open_read(self, name: str) -> IO[bytes]:
+        """Flux binaire positionnable (seek) ; FileNotFoundError si absent."""
+        raise NotImplementedError
+
+    def read_bytes(self, name: str) -> bytes:
+        with self.open_read(name) as f:
+            return f.read()
+
+    def writer(self, name: str, durable: bool = True) -> ContextManager[IO[bytes]]:
+        """Contexte d'écriture binaire : le contenu remplace `name` d'un coup à la sortie, ou rien si erreur."""
+        raise NotImplementedError
+
+    def write_bytes(self, name: str, data: bytes, durable: bool = True) -> None:
+        with self.writer(name, durable) as f:
+            f.write(data)
+
+    def append_bytes(self, name: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    def lock(self, name: str) -> ContextManager[None]:
+        """Verrou exclusif sur `name`, réentrant dans un même thread."""
+        raise NotImplementedError
+
+    def delete(self, name: str) -> None:
+        raise NotImplementedError
+
+    def names(self, prefix: str = "") -> List[str]:
+        raise NotImplementedError
+
+    def local_path(self, name: str) -> Optional[Path]:
+        """Chemin disque si le backend en a un (lectures pandas directes, instantanés)."""
+        return None
+
+
+class FileStorage(Storage):
+    kind = "file"
+
+    def __init__(self, root: Optional[Path] = None) -> None:
+        self._root = root
+
+    @property
+    def root(self) -> Path:
+        # suit src.io.DATA_DIR (les benchmarks le changent à chaud) si aucune racine fixée
+        from src import io
+
+        return self._root or io.DATA_DIR
+
+    def local_path(self, name: str) -> Path:
+        return self.root / name
+
+    def stamp(self, name: str) -> Version:
+        try:
+            st = (self.root / name).stat()
+        except FileNotFoundError:
+            return MISSING
+        return st.st_mtime_ns, st.st_size
+
+    def open_read(self, name: str) -> IO[bytes]:
+        return (self.root / name).open("rb")
+
+    @contextmanager
+    def writer(self, name: str, durable: bool = True) -> Iterator[IO[bytes]]:
+        from src.io import atomic_write
+
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(path, "wb", durable=durable) as f:
+            yield f
+
+    def append_bytes(self, name: str, data: bytes) -> None:
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("ab") as f:
+            f.write(data)
+
+    def lock(self, name: str) -> ContextManager[None]:
+        from src.io import file_lock
+
+        return file_lock(self.root / name)
+
+    def delete(self, name: str) -> None:
+        (self.root / name).unlink(missing_ok=True)
+
+    def names(self, prefix: str = "") -> List[str]:
+        root = self.root
+        if not root.exists():
+            return []
+        return sorted(
+            p.relative_to(root).as_posix() for p in root.rglob("*")
+            if p.is_file() and p.relative_to(root).as_posix().startswith(prefix)
+        )
+
+
+class MemoryStorage(Storage):
+    """Fichiers en mémoire (tests, benchmarks) : aucun accès disque, rien ne survit au process."""
+
+    kind = "memory"
+
+    def __init__(self, files: Optional[Dict[str, bytes]] = None) -> None:
+        self._files: Dict[str, bytearray] = {k: bytearray(v) for k, v in (files or {}).items()}
+        self._versions: Dict[str, int] = {k: 1 for k in self._files}
+        self._counter = itertools.count(2)
+        self._guard = threading.Lock()
+        self._locks: Dict[str, threading.RLock] = {}
+
+    def stamp(self, name: str) -> Version:
+        with self._guard:
+            data = self._files.get(name)
+            return MISSING if data is None else (self._versions[name], len(data))
+
+    def open_read(self, name: str) -> IO[bytes]:
+        with self._guard:
+            data = self._files.get(name)
+            if data is None:
+                raise FileNotFoundError(name)
+            return BytesIO(bytes(data))
+
+    @contextmanager
+    def writer(self, name: str, durable: bool = True) -> Iterator[IO[bytes]]:
+        buf = BytesIO()
+        yield buf
+        with self._guard:
+            self._files[name] = bytearray(buf.getvalue())
+            self._versions[name] = next(self._counter)
+
+    def append_bytes(self, name: str, data: bytes) -> None:
+        with self._guard:
+            self._files.setdefault(name, bytearray()).extend(data)
+            self._versions[name] = next(self._counter)
+
+    def lock(self, name: str) -> ContextManager[None]:
+        with self._guard:
+            return self._locks.setdefault(name, threading.RLock())
+
+    def delete(self, name: str) -> None:
+        with self._guard:
+            self._files.pop(name, None)
+            self._versions.pop(name, None)
+
+    def names(self, prefix: str = "") -> List[str]:
+        with self._guard:
+            return sorted(k for k in self._files if k.startswith(prefix))
+
+
+def from_env(value: Optional[str]) -> Storage:
+    """Backend nommé par ARTIST_COMPASS_STORAGE (défaut : file)."""
+    kind = (value or "file").strip().lower()
+    if kind == "file":
+        return FileStorage()
+    if kind == "memory":
+        return MemoryStorage()
+    if kind == "s3":
+        from src.storage_s3 import ObjectStoreStorage
+
+        return ObjectStoreStorage.from_env()
+    raise ValueError(f"{STORAGE_ENV} inconnu : {value!r} (attendu : file, memory ou s3)")
@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import atexit
+import gzip
+import hashlib
+import hmac
+import http.client
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, quote, urlsplit
+
+from src.storage import MISSING, FileStorage
+
+# Stockage objet compatible S3 (AWS, MinIO, R2…) : data/ reste la copie de travail (index,
+# verrous, SQLite et lectures pandas inchangés) et un thread pousse les changements par lots :
+# - un fichier réécrit (YAML, JSON, CSV compacté) → un objet compressé complet ;
+# - un CSV qui a seulement grandi (journal) → un objet « delta » avec les octets ajoutés ;
+# - une base SQLite → copie cohérente faite par l'API de sauvegarde (jamais le fichier vivant) ;
+# - manifest.json (écrit en dernier) liste base + deltas de chaque fichier.
+# Un fichier dont l'empreinte (mtime, taille) n'a pas bougé n'est même pas relu. Au démarrage,
+# pull() reconstruit les fichiers absents ou différents depuis le manifeste (le distant gagne :
+# sur Streamlit Cloud, le disque local repart de la version du dépôt). Stockage injoignable
+# au démarrage : mode dégradé sur la copie locale, pull() retenté avant chaque lot ; les
+# fichiers modifiés localement entre-temps sont gardés (et envoyés) plutôt que restaurés.
+#
+#   ARTIST_COMPASS_STORAGE=s3
+#   ARTIST_COMPASS_S3_ENDPOINT=https://s3.eu-west-3.amazonaws.com   (ou http://127.0.0.1:9000)
+#   ARTIST_COMPASS_S3_BUCKET=mon-bucket  ARTIST_COMPASS_S3_PREFIX=artist-compass
+#   AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY / AWS_REGION
+#   ARTIST_COMPASS_S3_SYNC_S=30   (intervalle entre deux lots)
+SYNC_INTERVAL_S = 30.0
+# au-delà, le fichier est renvoyé en entier et ses deltas supprimés
+MAX_DELTAS = 64
+# empreinte de contenu : fichier entier jusqu'à FULL_HASH_MAX, sinon ses TAIL_BYTES derniers octets
+FULL_HASH_MAX = 1 << 20
+TAIL_BYTES = 64 * 1024
+MANIFEST = "manifest.json"
+SQLITE_SUFFIX = ".sqlite3"
+# jamais synchronisés : dérivés reconstructibles, verrous, temporaires, fichiers annexes de SQLite
+_SQLITE_SIDECARS = ("-journal", "-wal", "-shm")
+_SKIP_SUFFIXES = (".lock", ".tmp", *(SQLITE_SUFFIX + side for side in _SQLITE_SIDECARS))
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _digest(data: bytes) -> str:
+    """Empreinte de contenu : tout le contenu, ou sa fin pour les gros fichiers."""
+    if len(data) > FULL_HASH_MAX:
+        return f"tail:{hashlib.sha1(data[-TAIL_BYTES:]).hexdigest()}"
+    return hashlib.sha1(data).hexdigest()
+
+
+def _hmac(key: bytes, msg: str) -> bytes:
+    return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
+
+
+def sign_v4(
+    method: str, url: str, headers: Dict[str, str], payload_hash: str,
+    access_key: str, secret_key: str, region: str, amz_date: str,
+) -> str:
+    """En-tête Authorization AWS Signature V4 (service s3) pour une requête déjà construite."""
+    parts = urlsplit(url)
+    query = "&".join(
+        f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}"
+        for k, v in sorted(parse_qsl(parts.query, keep_blank_values=True))
+    )
+    signed = {k.lower(): v.strip() for k, v in headers.items()}
+    signed_names = ";".join(sorted(signed))
+    canonical = "\n".join([
+        method, parts.path or "/", query,
+        "".join(f"{k}:{signed[k]}\n" for k in sorted(signed)), signed_names, payload_hash,
+    ])
+    day = amz_date[:8]
+    scope = f"{day}/{region}/s3/aws4_request"
+    to_sign = "\n".join(["AWS4-HMAC-SHA256", amz_date, scope, _sha256(canonical.encode("utf-8"))])
+    key = _hmac(_hmac(_hmac(_hmac(("AWS4" + secret_key).encode("utf-8"), day), region), "s3"), "aws4_request")
+    signature = hmac.new(key, to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+    return f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, SignedHeaders={signed_names}, Signature={signature}"
+
+
+class S3Client:
+    """
+    Client S3 minimal (bibliothèque standard) : adressage par chemin, PUT / GET / DELETE.
+    Erreur réseau ou HTTP → OSError.
+    """
+
+    def __init__(
+        self, endpoint: str, bucket: str, access_key: str, secret_key: str,
+        region: str = "us-east-1", timeout: float = 30.0,
+    ) -> None:
+        self.endpoint = endpoint.rstrip("/")
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.timeout = timeout
+
+    def _request(self, method: str, key: str, data: bytes = b"",
+                 extra: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+        url = f"{self.endpoint}/{quote(self.bucket)}/{quote(key, safe='/-_.~')}"
+        amz_date = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        payload_hash = _sha256(data)
+        headers = {"host": urlsplit(url).netloc, "x-amz-content-sha256": payload_hash, "x-amz-date": amz_date}
+        headers.update(extra or {})
+        headers["Authorization"] = sign_v4(
+            method, url, headers, payload_hash, self.access_key, self.secret_key, self.region, amz_date
+        )
+        req = urllib.request.Request(url, data=data if method == "PUT" else None, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return resp.status, resp.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+        except (OSError, http.client.HTTPException) as e:  # injoignable, délai dépassé, connexion coupée
+            raise OSError(f"S3 {method} {key} : {e}") from e
+
+    def put(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+        status, body = self._request("PUT", key, data=data, extra={"content-type": content_type})
+        if status >= 300:
+            raise OSError(f"S3 PUT {key} : HTTP {status} {body[:200]!r}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        status, body = self._request("GET", key)
+        if status == 404:
+            return None
+        if status >= 300:
+            raise OSError(f"S3 GET {key} : HTTP {status} {body[:200]!r}")
+        return body
+
+    def delete(self, key: str) -> None:
+        status, body = self._request("DELETE", key)
+        if status >= 300 and status != 404:
+            raise OSError(f"S3 DELETE {key} : HTTP {status} {body[:200]!r}")
+
+
+class ObjectStoreStorage(FileStorage):
+    kind = "s3"
+
+    def __init__(self, client: S3Client, prefix: str = "artist-compass", root: Optional[Path] = None,
+                 interval: float = SYNC_INTERVAL_S, background: bool = True) -> None:
+        super().__init__(root)
+        self.client = client
+        self.prefix = prefix.strip("/")
+        self.interval = interval
+        self._sync_lock = threading.Lock()
+        self._manifest: Dict[str, Dict[str, Any]] = {}
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        self._stop = threading.Event()
+        self.uploads = 0
+        self.bytes_raw = 0
+        self.bytes_sent = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.last_sync_ms = 0.0
+        # empreintes locales au démarrage : un fichier qui en diffère sans avoir été envoyé a été
+        # écrit pendant que le stockage était injoignable (mode dégradé)
+        self._pulled = False
+        self._startup: Dict[str, Tuple[int, int]] = {n: self.stamp(n) for n in self.names() if self._synced(n)}
+        try:
+            self.pull()
+        except OSError as e:
+            self._failed("stockage injoignable, copie locale seule", e)
+        self._thread: Optional[threading.Thread] = None
+        if background:
+            self._thread = threading.Thread(target=self._run, name="object-store-sync", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls) -> "ObjectStoreStorage":
+        env = os.environ
+        client = S3Client(
+            env["ARTIST_COMPASS_S3_ENDPOINT"], env["ARTIST_COMPASS_S3_BUCKET"],
+            env.get("AWS_ACCESS_KEY_ID", ""), env.get("AWS_SECRET_ACCESS_KEY", ""),
+            env.get("AWS_REGION", "us-east-1"),
+        )
+        return cls(client, env.get("ARTIST_COMPASS_S3_PREFIX", "artist-compass"),
+                   interval=float(env.get("ARTIST_COMPASS_S3_SYNC_S", SYNC_INTERVAL_S)))
+
+    def _key(self, *parts: str) -> str:
+        return "/".join([self.prefix, *parts]) if self.prefix else "/".join(parts)
+
+    # ---------- empreintes locales ----------
+    def _synced(self, name: str) -> bool:
+        return "/" not in name and not name.startswith(".") and not name.endswith(_SKIP_SUFFIXES)
+
+    def _fingerprint(self, name: str, size: int) -> str:
+        """Empreinte des `size` premiers octets (voir _digest), sans relire tout un gros fichier."""
+        with self.open_read(name) as f:
+            if size > FULL_HASH_MAX:
+                f.seek(size - TAIL_BYTES)
+                return f"tail:{hashlib.sha1(f.read(TAIL_BYTES)).hexdigest()}"
+            return hashlib.sha1(f.read(size)).hexdigest()
+
+    def _failed(self, what: str, error: Exception) -> None:
+        self.errors += 1
+        self.last_error = repr(error)
+        print(f"[object-store] {what} : {error!r}", file=sys.stderr)
+
+    # ---------- distant → local ----------
+    def pull(self) -> int:
+        """Rétablit depuis le manifeste les fichiers absents ou différents ; renvoie leur nombre."""
+        raw = self.client.get(self._key(MANIFEST))
+        self._manifest = json.loads(raw) if raw else {}
+        restored = 0
+        for name, entry in self._manifest.items():
+            stamp = self.stamp(name)
+            if stamp[1] == entry["size"] and self._fingerprint(name, stamp[1]) == entry["fingerprint"]:
+                self._stamps[name] = stamp
+                continue
+            if stamp != self._startup.get(name, MISSING) and stamp != self._stamps.get(name):
+                continue  # écrit localement et pas encore envoyé (mode dégradé) : gardé, le prochain lot l'envoie
+            payload = b"".join(gzip.decompress(self._fetch(key)) for key in [entry["base"], *entry["deltas"]])
+            if name.endswith(SQLITE_SUFFIX):
+                for side in _SQLITE_SIDECARS:  # journal d'une ancienne base : ne pas le rejouer sur celle-ci
+                    self.delete(name + side)
+            super().write_bytes(name, payload)
+            self._stamps[name] = self._startup[name] = self.stamp(name)
+            restored += 1
+        self._pulled = True
+        return restored
+
+    def _fetch(self, key: str) -> bytes:
+        """Objet cité par le manifeste ; absent, la copie locale est gardée (pull échoue, mode dégradé)."""
+        data = self.client.get(key)
+        if data is None:
+            raise OSError(f"objet {key} cité par le manifeste mais absent")
+        return data
+
+    # ---------- local → distant ----------
+    def _upload(self, key: str, data: bytes) -> None:
+        packed = gzip.compress(data, mtime=0)
+        self.client.put(key, packed, "application/gzip")
+        self.uploads += 1
+        self.bytes_raw += len(data)
+        self.bytes_sent += len(packed)
+
+    def _sqlite_copy(self, name: str) -> bytes:
+        """Copie cohérente d'une base SQLite en cours d'utilisation (API de sauvegarde)."""
+        tmp = self.local_path(name + ".sync.tmp")
+        tmp.unlink(missing_ok=True)
+        source, target = sqlite3.connect(self.local_path(name)), sqlite3.connect(tmp)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        try:
+            return tmp.read_bytes()
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def _sync_file(self, name: str, stamp: Tuple[int, int], stale: List[str]) -> bool:
+        entry = self._manifest.get(name)
+        size = stamp[1]
+        sqlite = name.endswith(SQLITE_SUFFIX)
+        if not sqlite and entry and size > entry["size"] and len(entry["deltas"]) < MAX_DELTAS \
+                and self._fingerprint(name, entry["size"]) == entry["fingerprint"]:
+            # seulement grandi (ajouts au journal) : on n'envoie que la fin
+            with self.open_read(name) as f:
+                f.seek(entry["size"])
+                delta = f.read(size - entry["size"])
+            key = self._key("deltas", name, f"{entry['generation']:06d}-{len(entry['deltas']) + 1:06d}.gz")
+            self._upload(key, delta)
+            entry["deltas"].append(key)
+            entry["size"] = entry["size"] + len(delta)
+            entry["fingerprint"] = self._fingerprint(name, entry["size"])
+            return True
+        data = self._sqlite_copy(name) if sqlite else self.read_bytes(name)
+        fingerprint = _digest(data)
+        if entry and entry["size"] == len(data) and entry["fingerprint"] == fingerprint:
+            return False  # réécrit à l'identique
+        generation = entry["generation"] + 1 if entry else 1
+        key = self._key("objects", f"{name}.{generation:06d}.gz")
+        self._upload(key, data)
+        if entry:
+            stale += [entry["base"], *entry["deltas"]]
+        self._manifest[name] = {
+            "base": key, "deltas": [], "size": len(data), "fingerprint": fingerprint, "generation": generation,
+        }
+        return True
+
+    def sync(self) -> int:
+        """Un lot : envoie ce qui a changé depuis le précédent puis le manifeste ; renvoie le nombre de fichiers."""
+        with self._sync_lock:
+            if not self._pulled:  # mode dégradé : rien n'est envoyé avant d'avoir lu le manifeste
+                self.pull()
+            t0 = time.perf_counter()
+            changed = 0
+            stale: List[str] = []
+            for name in [n for n in self.names() if self._synced(n)]:
+                stamp = self.stamp(name)
+                if stamp[1] < 0 or self._stamps.get(name) == stamp:
+                    continue
+                with self.lock(name):
+                    stamp = self.stamp(name)
+                    changed += self._sync_file(name, stamp, stale)
+                self._stamps[name] = stamp
+            if changed:
+                body = json.dumps(self._manifest, ensure_ascii=False, indent=1).encode("utf-8")
+                self.client.put(self._key(MANIFEST), body, "application/json")
+                for key in stale:  # après le manifeste : un lecteur ne voit jamais d'objet manquant
+                    self.client.delete(key)
+            self.last_sync_ms = round((time.perf_counter() - t0) * 1000, 2)
+            return changed
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sync()
+            except Exception as e:  # noqa: BLE001 — réessayé au lot suivant
+                self._failed("échec de synchronisation", e)
+
+    def close(self) -> None:
+        """Arrête le thread et envoie un dernier lot."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        try:
+            self.sync()
+        except OSError as e:  # les fichiers restent dans la copie locale
+            self._failed("dernier lot non envoyé", e)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "files": len(self._manifest), "uploads": self.uploads, "bytes_raw": self.bytes_raw,
+            "bytes_sent": self.bytes_sent, "last_sync_ms": self.last_sync_ms,
+            "errors": self.errors, "last_error": self.last_error, "degraded": not self._pulled,
+        }
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src import io
+
+# Écriture différée (ARTIST_COMPASS_WRITE_BEHIND=1, voir src.io.enable_write_behind) :
+# save_yaml / save_json / append_row(s)_csv déposent l'opération dans une file bornée et
+# rendent la main ; un thread unique l'écrit sur disque (mêmes verrous et écritures
+# atomiques que le mode synchrone). Lectures cohérentes :
+# - YAML / JSON : le document en attente est renvoyé tel quel, sans attendre le disque ;
+# - CSV : les index du dashboard appliquent les lignes encore en file à une copie de leur
+#   état (queued_rows) ; les autres lecteurs (load_csv, recherche…) attendent que les
+#   ajouts en attente pour CE fichier soient écrits.
+MAX_PENDING = 1000
+# opérations écrites par passage du thread (les ajouts d'un même fichier → une écriture)
+DRAIN_MAX = 256
+
+# (type, chemin, données, colonnes par défaut, instant de dépôt)
+_Op = Tuple[str, Path, Any, Optional[list], float]
+
+
+class WriteBehind:
+    def __init__(self, max_pending: int = MAX_PENDING) -> None:
+        self._queue: "queue.Queue[Optional[_Op]]" = queue.Queue(maxsize=max_pending)
+        self._cond = threading.Condition()
+        self._docs: Dict[Path, Any] = {}
+        self._pending: Dict[Path, int] = {}
+        # CSV : lots de lignes pas encore écrites (en file ou en cours), offset de début de
+        # l'écriture en cours, nombre d'écritures terminées, par fichier
+        self._rows: Dict[Path, List[list]] = {}
+        self._writing: Dict[Path, int] = {}
+        self._generation: Dict[Path, int] = {}
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self._latency_sum = 0.0
+        self._latency_last = 0.0
+        self._latency_max = 0.0
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    # ---------- côté appelant ----------
+    def submit(self, kind: str, path: Path, data: Any, default_columns: Optional[list] = None) -> None:
+        """Dépose une écriture ("yaml", "json" ou "csv") ; bloque seulement si la file est pleine."""
+        with self._cond:
+            self._pending[path] = self._pending.get(path, 0) + 1
+            if kind != "csv":
+                self._docs[path] = data
+            else:
+                self._rows.setdefault(path, []).append(data)
+        self._queue.put((kind, path, data, default_columns, time.perf_counter()))
+
+    def pending_doc(self, path: Path) -> Optional[Any]:
+        with self._cond:
+            return self._docs.get(path)
+
+    def queued_rows(self, path: Path) -> Tuple[int, Optional[int], List[Dict[str, Any]]]:
+        """
+        (écritures terminées, offset de début de l'écriture en cours ou None, lignes pas encore
+        écrites) d'un CSV. Une lecture du fichier encadrée par deux appels n'a vu aucune de ces
+        lignes si le premier élément n'a pas bougé et qu'elle s'est arrêtée avant cet offset.
+        """
+        with self._cond:
+            rows = [row for batch in self._rows.get(path, []) for row in batch]
+            return self._generation.get(path, 0), self._writing.get(path), rows
+
+    def wait(self, path: Optional[Path] = None, timeout: Optional[float] = None) -> bool:
+        """Attend que les écritures en attente (de `path`, ou toutes) soient sur disque."""
+        with self._cond:
+            if path is None:
+                return self._cond.wait_for(lambda: not any(self._pending.values()), timeout)
+            return self._cond.wait_for(lambda: not self._pending.get(path), timeout)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Vide la file puis arrête le thread."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def info(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "pending": sum(self._pending.values()),
+                "written": self.written,
+                "batches": self.batches,
+                "flush_last_ms": round(self._latency_last * 1000, 2),
+                "flush_avg_ms": round(self._latency_sum / self.written * 1000, 2) if self.written else 0.0,
+                "flush_max_ms": round(self._latency_max * 1000, 2),
+                "errors": self.errors,
+                "last_error": self.last_error,
+            }
+
+    # ---------- thread d'écriture ----------
+    def _run(self) -> None:
+        while True:
+            op = self._queue.get()
+            stop = op is None
+            batch: List[_Op] = [] if stop else [op]
+            while not stop and len(batch) < DRAIN_MAX:
+                try:
+                    op = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if op is None:
+                    stop = True
+                else:
+                    batch.append(op)
+            if batch:
+                self._apply(batch)
+            if stop:
+                return
+
+    def _apply(self, batch: List[_Op]) -> None:
+        # regroupé par fichier dans l'ordre d'arrivée : ajouts concaténés, dernier document gagnant
+        by_path: Dict[Path, List[_Op]] = {}
+        for op in batch:
+            by_path.setdefault(op[1], []).append(op)
+        for path, ops in by_path.items():
+            kind, _, data, default_columns, _ = ops[-1]
+            try:
+                if kind == "csv":
+                    rows = [row for op in ops for row in op[2]]
+                    storage = io.storage()
+                    with storage.lock(path.name):  # réentrant : _append_rows le reprend
+                        with self._cond:
+                            self._writing[path] = storage.size(path.name)
+                        io._append_rows(path.name, rows, ops[0][3])
+                else:
+                    io._write_doc(kind, path, data)
+            except Exception as e:  # noqa: BLE001 — le thread ne doit pas mourir
+                with self._cond:
+                    self.errors += 1
+                    self.last_error = f"{path.name} : {e!r}"
+                print(f"[write-behind] échec d'écriture {path.name} : {e!r}", file=sys.stderr)
+            done = time.perf_counter()
+            with self._cond:
+                if kind == "csv":
+                    written = {id(op[2]) for op in ops}
+                    self._rows[path] = [rows for rows in self._rows.get(path, []) if id(rows) not in written]
+                    if not self._rows[path]:
+                        del self._rows[path]
+                    self._writing.pop(path, None)
+                    self._generation[path] = self._generation.get(path, 0) + 1
+                self._pending[path] -= len(ops)
+                if not self._pending[path]:
+                    del self._pending[path]
+                if self._docs.get(path) is data:
+                    del self._docs[path]
+                for op in ops:
+                    latency = done - op[4]
+                    self._latency_sum += latency
+                    self._latency_max = max(self._latency_max, latency)
+                self._latency_last = done - ops[-1][4]
+                self.written += len(ops)
+                self.batches += 1
+                io.invalidate_file(path)
+                self._cond.notify_all()
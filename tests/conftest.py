@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src import io  # noqa: E402
+from src.journal_index import loaded_indexes  # noqa: E402
+
+
+def _reset() -> None:
+    io.flush_pending()
+    for index in loaded_indexes():
+        index.unload()
+    io.clear_cache()
+
+
+@pytest.fixture
+def data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Dossier data/ vide et isolé : cache des fichiers parsés et index en mémoire repartent de zéro."""
+    _reset()
+    monkeypatch.setattr(io, "DATA_DIR", tmp_path)
+    yield tmp_path
+    _reset()
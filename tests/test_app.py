@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def app(data_dir):
+    """app.py sur une copie des données livrées."""
+    for p in (ROOT / "data").iterdir():
+        if p.is_file():
+            shutil.copy(p, data_dir / p.name)
+    return AppTest.from_file(str(ROOT / "app.py"), default_timeout=60).run()
+
+
+def test_add_template_then_rerun(app):
+    assert not app.exception
+    next(t for t in app.text_input if t.label == "Nom du template").set_value("Test — Starter")
+    next(t for t in app.text_area if t.label.startswith("Checklist")).set_value("intro\ndrop")
+    next(b for b in app.button if b.label == "Ajouter").click()
+    app.run()
+    assert not app.exception, [e.value for e in app.exception]
+    assert "Template ajouté" in app.success[0].value
+    app.run()
+    assert not app.exception, [e.value for e in app.exception]
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _cli(data_dir: Path, *args: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "ARTIST_COMPASS_DATA_DIR": str(data_dir)}
+    return subprocess.run([sys.executable, "-m", "src", *args], cwd=ROOT, env=env, capture_output=True, text=True, timeout=60)
+
+
+def test_validate_then_compact_on_the_shipped_journal(tmp_path):
+    shutil.copy(ROOT / "data" / "journal.csv", tmp_path / "journal.csv")
+    validate = _cli(tmp_path, "validate")
+    assert validate.returncode == 0, validate.stdout + validate.stderr
+    assert "colonnes absentes" in validate.stderr
+    compact = _cli(tmp_path, "compact")
+    assert compact.returncode == 0, compact.stderr
+    assert _cli(tmp_path, "validate").returncode == 0
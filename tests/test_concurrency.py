@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from src import io, journal
+
+ROOT = Path(__file__).resolve().parents[1]
+
+THREADS, PER_THREAD = 32, 50
+PROCESSES, PER_PROCESS = 4, 200
+
+_CHILD = """
+import sys
+from src.io import append_rows_csv
+for i in range(int(sys.argv[2])):
+    append_rows_csv("journal.csv", [{"date": "2026-10-17", "titre": f"P{sys.argv[1]}-{i}"}])
+"""
+
+
+def test_concurrent_appends_threads_and_processes(data_dir):
+    """32 threads × 50 ajouts (group commit) puis 4 process × 200 (verrou de fichier) : rien de perdu ni d'entrelacé."""
+    barrier = threading.Barrier(THREADS)
+    errors: list = []
+
+    def worker(t: int) -> None:
+        barrier.wait()
+        try:
+            for i in range(PER_THREAD):
+                extra = {"humeur": "x"} if i == 7 else {}  # nouvelle colonne en pleine rafale
+                journal.append_entry({"date": "2026-10-17", "titre": f"T{t}-{i}", "etat": "idée", "temps_min": 5, **extra})
+        except Exception as e:  # noqa: BLE001
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(THREADS)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    assert not errors
+    assert io.group_commit_info()["batches"] > 0
+    df = journal.load_journal_csv()
+    assert len(df) == THREADS * PER_THREAD
+    assert df["titre"].nunique() == THREADS * PER_THREAD
+    assert (df["humeur"] == "x").sum() == THREADS
+    assert journal.count_entries() == THREADS * PER_THREAD
+
+    env = {**os.environ, "ARTIST_COMPASS_DATA_DIR": str(data_dir), "PYTHONPATH": str(ROOT)}
+    children = [
+        subprocess.Popen([sys.executable, "-c", _CHILD, str(k), str(PER_PROCESS)], env=env, cwd=ROOT)
+        for k in range(PROCESSES)
+    ]
+    assert all(p.wait(timeout=120) == 0 for p in children)
+    io.clear_cache()
+    df = journal.load_journal_csv()
+    assert len(df) == THREADS * PER_THREAD + PROCESSES * PER_PROCESS
+    assert df["titre"].nunique() == len(df)
+    assert journal.count_entries() == len(df)
+
+
+def test_failed_save_leaves_previous_file(data_dir):
+    io.save_json("doc.json", {"a": 1})
+    with pytest.raises(TypeError):
+        io.save_json("doc.json", {"a": object()})
+    assert io.load_json("doc.json") == {"a": 1}
+    assert not list(data_dir.glob(".*.tmp"))
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src import io, journal
+from src.journal_index import iter_csv_records
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_new_columns_land_in_the_header(data_dir):
+    shutil.copy(ROOT / "data" / journal.JOURNAL_FILE, data_dir / journal.JOURNAL_FILE)
+    journal.append_entry({"date": "2026-01-01", "titre": "a", "temps_min": 25, "humeur": "calme"})
+    (data_dir / io._schema_name(journal.JOURNAL_FILE)).unlink()  # le sidecar n'est qu'un cache
+    io.clear_cache()
+
+    header = (data_dir / journal.JOURNAL_FILE).read_text(encoding="utf-8").splitlines()[0].split(";")
+    assert header[-2:] == ["temps_min", "humeur"]
+    df = journal.load_journal()
+    last = df.iloc[-1]
+    assert (last["titre"], last["temps_min"], last["humeur"]) == ("a", 25, "calme")
+
+
+@pytest.mark.parametrize("body", ["2026-01-01,a\n2026-01-02,b,en trop\n", "2026-01-01,a,x\n2026-01-02,b,y\n"])
+def test_rows_wider_than_the_header_fail_loudly(data_dir, body):
+    (data_dir / journal.JOURNAL_FILE).write_text("date,titre\n" + body, encoding="utf-8")
+    with pytest.raises(ValueError, match="plus larges que l'en-tête"):
+        io.load_csv(journal.JOURNAL_FILE, ["date", "titre"])
+    with pytest.raises(ValueError, match="plus larges que l'en-tête"):
+        list(io.iter_csv_chunks(journal.JOURNAL_FILE, chunk_rows=1))
+    with pytest.raises(ValueError, match="plus larges que l'en-tête"):
+        list(iter_csv_records(journal.JOURNAL_FILE))
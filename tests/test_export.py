@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import gzip
+
+from src import io, journal
+from src.export import iter_journal_csv, journal_export_bytes
+
+
+def test_csv_export_is_the_journal_file(data_dir):
+    journal.append_entries([
+        {"date": "2026-01-01", "titre": "ok", "temps_min": 30, "score_monstrable": 4},
+        {"date": "pas une date", "titre": "illisible", "temps_min": "abc", "score_monstrable": 300},
+        {"date": "2026-01-02", "titre": 'guillemets "et"\nretour', "objectif_du_jour": "a;b"},
+    ])
+    raw = (data_dir / journal.JOURNAL_FILE).read_bytes()
+    assert journal_export_bytes() == raw
+    assert gzip.decompress(journal_export_bytes(compress=True)) == raw
+    assert b"pas une date" in raw and b"abc" in raw and b"300" in raw
+
+
+def test_csv_export_header_includes_appended_columns(data_dir):
+    journal.append_entry({"date": "2026-01-01", "titre": "a"})
+    journal.append_entry({"date": "2026-01-02", "titre": "b", "humeur": "calme"})
+    delimiter, columns = io.csv_layout(journal.JOURNAL_FILE)
+    assert "humeur" in columns
+    lines = b"".join(iter_journal_csv(chunk_bytes=7)).decode("utf-8").splitlines()
+    assert lines[0].split(delimiter) == columns
+    assert lines[2].endswith(f"{delimiter}calme")
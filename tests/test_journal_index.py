@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import sys
+import threading
+from datetime import date, datetime, timedelta
+
+from src import journal
+from src.aggregates import journal_stats
+from src.projects import ProjectIndex, journal_projects, projects_frame
+from src.search import journal_search
+
+WRITERS, READERS, PER_WRITER = 4, 4, 150
+
+
+def _row(t: int, i: int) -> dict:
+    # nouvelles clés (jour, style, projet) à chaque ligne : les dicts des index changent de taille
+    return {
+        "date": (date(2026, 1, 1) + timedelta(days=i)).isoformat(), "titre": f"projet {t}-{i}", "style": f"style {t}-{i}",
+        "etat": journal.ETATS[i % 4], "temps_min": 10, "objectif_du_jour": f"mot{i} refrain",
+        "score_monstrable": i % 6,
+    }
+
+
+def test_published_state_is_never_mutated(data_dir):
+    journal.append_entry(_row(0, 0))
+    before = journal_stats.state()
+    snapshot = (before["count"], dict(before["by_style"]), len(before["cube"]))
+    journal.append_entry(_row(0, 1))
+    after = journal_stats.state()
+    assert after is not before
+    assert (before["count"], dict(before["by_style"]), len(before["cube"])) == snapshot
+    assert after["count"] == 2
+
+
+def test_projects_checkpoint_is_lazy(data_dir):
+    journal.append_entry(_row(0, 0))
+    journal_projects.state()
+    saved = journal_projects.path.read_bytes()
+    for i in range(1, 5):
+        journal.append_entry({**_row(0, i), "titre": "projet 0-0"})
+        journal_projects.state()
+    assert journal_projects.path.read_bytes() == saved  # pas de réécriture à chaque ajout
+
+    # redémarrage sans flush : point de reprise + lignes suivantes relues du journal
+    restarted = ProjectIndex(journal.JOURNAL_FILE).projects()
+    assert restarted == journal_projects.projects()
+    assert len(restarted["projet 0-0"]["offsets"]) == 5
+
+
+def test_projects_counted_under_current_style(data_dir):
+    journal.append_entries([
+        {"date": "2026-01-01", "titre": "A", "style": "lofi", "etat": "idée"},
+        {"date": "2026-01-02", "titre": "B", "style": "lofi", "etat": "démo"},
+        {"date": "2026-01-03", "titre": "A", "style": "house", "etat": "démo"},
+        {"date": "2026-01-04", "titre": "B", "etat": journal.ETATS[-1]},
+        {"date": "2026-01-05", "titre": "B", "style": "house", "etat": journal.ETATS[-1]},
+    ])
+    state = journal_projects.state()
+    assert state["by_style"] == {"house": 2}
+    assert state["done_by_style"] == {"house": 1}
+
+
+def test_reads_during_appends(data_dir):
+    """Sessions qui lisent les index pendant que d'autres ajoutent (modèle de threads Streamlit)."""
+    errors: list = []
+    writing = threading.Event()
+
+    def writer(t: int) -> None:
+        try:
+            for i in range(PER_WRITER):
+                journal.append_entry(_row(t, i))
+        except Exception as e:  # noqa: BLE001
+            errors.append(e)
+
+    def reader() -> None:
+        try:
+            while writing.is_set():
+                journal_stats.count_filtered(date(2026, 1, 1), date(2026, 3, 31), ["idée"], None)
+                journal_stats.minutes_since(datetime(2026, 1, 1))
+                journal_stats.count_by_style()
+                journal_stats.daily_totals()
+                journal_stats.latest(8)
+                journal_search.search_offsets("refrain mot1", 20)
+                projects_frame(journal_projects.projects())
+        except Exception as e:  # noqa: BLE001
+            errors.append(e)
+
+    journal.append_entry(_row(-1, 0))
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)  # changements de thread fréquents : la course se reproduit à coup sûr
+    try:
+        writing.set()
+        readers = [threading.Thread(target=reader) for _ in range(READERS)]
+        writers = [threading.Thread(target=writer, args=(t,)) for t in range(WRITERS)]
+        for th in readers + writers:
+            th.start()
+        for th in writers:
+            th.join()
+        writing.clear()
+        for th in readers:
+            th.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert not errors, errors[:3]
+    total = WRITERS * PER_WRITER + 1
+    assert journal.count_entries() == total
+    assert sum(journal_stats.count_by_style().values()) == total
+    assert journal_stats.count_filtered() == total
+    assert len(journal_search.search_offsets("refrain", total)) == total
+    assert sum(p["entrees"] for p in journal.list_projects().to_dict("records")) == total
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from streamlit.testing.v1 import AppTest
+
+
+def _two_templates_same_steps() -> None:
+    from src.progress import checklist
+
+    checklist("template", "Starter A", ["intro", "drop"])
+    checklist("template", "Starter B", ["intro", "drop"])
+
+
+def test_same_items_in_two_checklists(data_dir):
+    at = AppTest.from_function(_two_templates_same_steps).run()
+    assert not at.exception
+    assert len(at.checkbox) == 4
+
+    at.checkbox[0].check().run()
+    assert [c.value for c in at.checkbox] == [True, False, False, False]
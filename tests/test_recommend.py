@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+
+from src import journal
+from src.catalog import Catalog
+from src.recommend import FEATURES, WEIGHTS, recommender
+
+STYLES = [{"style": "lofi", "bpm": [70, 90]}, {"style": "drill", "bpm": [140, 145]}, {"style": "house", "bpm": 124}]
+TEMPLATES = [{"name": "lofi — boucle", "bpm": 80}, {"name": "club", "bpm": [120, 128]}]
+
+
+def _entry(titre: str, style: str, etat: str, score: int = 3) -> dict:
+    return {"date": "2026-01-01", "titre": titre, "style": style, "etat": etat, "temps_min": 30, "score_monstrable": score}
+
+
+def test_focus_styles_and_their_templates_rank_first(data_dir):
+    rec = recommender(Catalog(STYLES, TEMPLATES), {"styles_cibles": ["drill"]})
+    assert list(rec.rank_styles()["style"]) == ["drill", "lofi", "house"]
+    # le template nommé d'après lofi suit lofi ; « club » (124 BPM) suit house
+    assert rec.rank_templates() == ["lofi — boucle", "club"]
+
+
+def test_finish_first_favours_styles_with_open_projects(data_dir):
+    journal.append_entries([_entry("a", "house", "démo"), _entry("b", "lofi", "sorti")])
+    catalog = Catalog(STYLES, TEMPLATES)
+    plain = recommender(catalog, {}).rank_styles().set_index("style")
+    finish = recommender(catalog, {"regles": {"terminer_avant_nouveau": True}}).rank_styles().set_index("style")
+    assert (plain["en_cours"] == 0).all()
+    assert finish.loc["house", "en_cours"] == 1 and finish.loc["lofi", "en_cours"] == 0
+    assert finish.index[0] == "house"
+
+
+def test_refresh_follows_appended_entries(data_dir):
+    rec = recommender(Catalog(STYLES, TEMPLATES), {})
+    before = rec.rank_styles().set_index("style")
+    links = rec._links()
+    journal.append_entries([_entry(f"p{i}", "drill", "sorti", score=5) for i in range(5)])
+    after = rec.rank_styles().set_index("style")
+    assert after.loc["drill", "completion"] == (5 + 1) / (5 + 2)
+    assert after.loc["drill", "score_moyen"] > before.loc["drill", "score_moyen"]
+    assert after.loc["lofi", "total"] == before.loc["lofi", "total"]
+    assert rec._links() is links  # lien template → styles : calculé une fois par catalogue
+    assert rec._refresh() is rec._refresh()  # sans nouvel ajout : rien de recalculé
+
+
+def test_session_views_share_one_recommender(data_dir):
+    base = Catalog(STYLES, TEMPLATES)
+    added = [{"name": "drill — intro", "bpm": 142}]
+    rec = recommender(base.with_templates(list(added)), {})
+    for _ in range(20):  # une vue neuve par rerun
+        assert recommender(base.with_templates(list(added)), {}) is rec
+    assert recommender(base.with_templates(added + [{"name": "autre"}]), {}) is not rec
+    assert len(rec.rank_templates()) == 3
+
+
+def test_concurrent_refresh_never_mixes_two_computations(data_dir):
+    rec = recommender(Catalog(STYLES, TEMPLATES), {"styles_cibles": ["lofi"]})
+    errors: list[str] = []
+
+    def read() -> None:
+        for _ in range(200):
+            df = rec.rank_styles()
+            if not np.allclose(df[FEATURES].to_numpy() @ WEIGHTS, df["total"]):
+                errors.append("matrice et scores de deux calculs différents")
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for t in readers:
+        t.start()
+    for i in range(30):
+        journal.append_entry({"date": "2026-01-01", "titre": f"p{i}", "style": STYLES[i % 3]["style"], "etat": "idée"})
+    for t in readers:
+        t.join()
+    assert errors == []
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import pytest
+
+from src import journal
+from src.journal_sqlite import SqliteJournal
+from src.search import journal_search
+
+ROWS = [
+    {"date": "2026-01-01", "titre": "Mix final", "style": "lofi", "objectif_du_jour": "équilibrer le mix"},
+    {"date": "2026-01-02", "titre": "Remix", "style": "house", "objectif_du_jour": "mélodie du refrain"},
+    {"date": "2026-01-03", "titre": "Cœur", "style": "pop", "apprentissage": "Écrire la mélodie d'abord"},
+    {"date": "2026-01-04", "titre": "Sixième", "style": "lofi", "next_step": "mixer le refrain"},
+]
+QUERIES = ["mix", "ix", "melodie", "MÉL refr", "coeur", "six", "lofi mix", "absent"]
+
+
+@pytest.fixture
+def both(data_dir):
+    journal.append_entries(ROWS)
+    db = SqliteJournal()
+    db.append_many(ROWS)
+    return db
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_sqlite_search_matches_csv_index(both, query):
+    csv_titles = list(journal_search.search(query)["titre"])
+    assert list(both.search(query)["titre"]) == csv_titles
+
+
+def test_terms_are_word_prefixes(both):
+    assert list(both.search("ix")["titre"]) == []
+    # « mixer » commence par « mix », « remix » non
+    assert list(both.search("mix")["titre"]) == ["Sixième", "Mix final"]
+
+
+def test_existing_database_gets_a_search_table(both):
+    with both._connect() as con:
+        con.execute("DROP TABLE journal_fts")
+    fresh = SqliteJournal()
+    assert set(fresh.search("refrain")["titre"]) == {"Remix", "Sixième"}
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from benchmarks.s3_standin import ACCESS_KEY, BUCKET, SECRET_KEY, serve
+from src import io, journal, profiler
+from src.journal_sqlite import DB_FILE, SqliteJournal
+from src.progress import progress_store
+from src.storage import MemoryStorage
+from src.storage_s3 import ObjectStoreStorage, S3Client
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _row(i: int) -> dict:
+    return {"date": "2026-01-01", "titre": f"projet {i}", "style": "lofi", "etat": "idée", "temps_min": 10}
+
+
+def _unused_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def backend():
+    """io.use_storage() le temps d'un test, ancien backend remis ensuite."""
+    previous = []
+
+    def use(store):
+        previous.append(io.use_storage(store))
+        return store
+
+    yield use
+    if previous:
+        io.use_storage(previous[0])
+
+
+@pytest.fixture
+def standin():
+    server = serve()
+    yield server
+    server.shutdown()
+
+
+def _client(endpoint: str) -> S3Client:
+    return S3Client(endpoint, BUCKET, ACCESS_KEY, SECRET_KEY, timeout=5)
+
+
+def test_memory_storage_keeps_everything_off_disk(data_dir, backend):
+    store = backend(MemoryStorage())
+    journal.append_entries([_row(i) for i in range(3)])
+    assert journal.count_entries() == 3
+    assert journal.search_entries("projet").shape[0] == 3
+    io.compact_csv(journal.JOURNAL_FILE)
+    io.save_yaml("profile.yaml", {"pseudo": "m"})
+    progress_store.set("template", "T", ["a"], 1)
+    progress_store.flush()
+    profiler.begin_rerun("test")
+    profiler.end_rerun(f".index/{profiler.LOG_NAME}")
+
+    assert f".index/{profiler.LOG_NAME}" in store.names()
+    assert list(data_dir.iterdir()) == []
+
+
+def test_sqlite_journal_needs_a_local_file(data_dir, backend):
+    backend(MemoryStorage())
+    with pytest.raises(ValueError):
+        SqliteJournal()
+
+
+def test_object_store_roundtrip_with_live_sqlite(data_dir, backend, standin, monkeypatch):
+    client = _client(standin.endpoint)
+    store = backend(ObjectStoreStorage(client, background=False))
+    journal.append_entries([_row(i) for i in range(5)])
+    db = SqliteJournal()
+    db.append_many([_row(i) for i in range(4)])
+
+    # écriture en cours sur la base pendant l'envoi : la copie ne contient que le validé
+    writer = sqlite3.connect(db.path)
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("INSERT INTO journal (titre) VALUES ('pas encore validé')")
+    try:
+        assert store.sync() >= 2
+    finally:
+        writer.rollback()
+        writer.close()
+    journal.append_entries([_row(5)])
+    store.sync()
+
+    restored_dir = data_dir / "restauré"
+    restored_dir.mkdir()
+    monkeypatch.setattr(io, "DATA_DIR", restored_dir)
+    restored = ObjectStoreStorage(client, background=False)
+    assert (restored_dir / journal.JOURNAL_FILE).read_bytes() == (data_dir / journal.JOURNAL_FILE).read_bytes()
+    with sqlite3.connect(restored_dir / DB_FILE) as con:
+        assert con.execute("PRAGMA integrity_check").fetchone() == ("ok",)
+        assert con.execute("SELECT COUNT(*) FROM journal").fetchone() == (4,)
+    assert restored.info()["degraded"] is False
+
+
+def test_object_store_starts_degraded_then_catches_up(data_dir, backend, standin, monkeypatch):
+    # contenu distant : profil et notes d'une session précédente
+    remote_dir = data_dir / "distant"
+    remote_dir.mkdir()
+    first = ObjectStoreStorage(_client(standin.endpoint), root=remote_dir, background=False)
+    first.write_bytes("profile.yaml", b"pseudo: distant\n")
+    first.write_bytes("notes.json", b'{"v": "distant"}')
+    first.sync()
+
+    local_dir = data_dir / "local"
+    local_dir.mkdir()
+    (local_dir / "profile.yaml").write_bytes(b"pseudo: depot\n")
+    (local_dir / "notes.json").write_bytes(b'{"v": "depot"}')
+    monkeypatch.setattr(io, "DATA_DIR", local_dir)
+    store = backend(ObjectStoreStorage(_client(f"http://127.0.0.1:{_unused_port()}"), background=False))
+    assert store.info()["degraded"] is True
+    assert store.errors == 1
+    with pytest.raises(OSError):
+        store.sync()  # rien d'envoyé tant que le manifeste n'a pas été lu
+
+    io.save_yaml("profile.yaml", {"pseudo": "hors ligne"})  # modifié pendant la panne
+    store.client = _client(standin.endpoint)
+    store.sync()
+    assert store.info()["degraded"] is False
+    assert io.load_yaml("profile.yaml") == {"pseudo": "hors ligne"}  # gardé et envoyé
+    assert (local_dir / "notes.json").read_bytes() == b'{"v": "distant"}'  # inchangé localement : restauré
+    first.pull()
+    assert (remote_dir / "profile.yaml").read_bytes() == (local_dir / "profile.yaml").read_bytes()
+
+
+def test_missing_remote_object_keeps_the_local_copy(data_dir, backend, standin, monkeypatch):
+    client = _client(standin.endpoint)
+    store = backend(ObjectStoreStorage(client, background=False))
+    journal.append_entries([_row(i) for i in range(5)])
+    store.sync()
+    older = (data_dir / journal.JOURNAL_FILE).read_bytes()
+    journal.append_entries([_row(5)])
+    store.sync()
+    (delta,) = store._manifest[journal.JOURNAL_FILE]["deltas"]
+    with standin.lock:
+        del standin.objects[(BUCKET, delta)]
+
+    local_dir = data_dir / "local"
+    local_dir.mkdir()
+    (local_dir / journal.JOURNAL_FILE).write_bytes(older)
+    monkeypatch.setattr(io, "DATA_DIR", local_dir)
+    restored = ObjectStoreStorage(client, background=False)
+    assert restored.info()["degraded"] is True
+    assert delta in restored.last_error
+    assert (local_dir / journal.JOURNAL_FILE).read_bytes() == older
+    with pytest.raises(OSError):
+        restored.sync()
+
+
+def test_import_with_unreachable_object_store(tmp_path):
+    env = {
+        **os.environ,
+        "ARTIST_COMPASS_DATA_DIR": str(tmp_path),
+        "ARTIST_COMPASS_STORAGE": "s3",
+        "ARTIST_COMPASS_S3_ENDPOINT": f"http://127.0.0.1:{_unused_port()}",
+        "ARTIST_COMPASS_S3_BUCKET": BUCKET,
+    }
+    out = subprocess.run(
+        [sys.executable, "-c", "import src.io as io; print(io.storage().info()['degraded'])"],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip() == "True"
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from src import io, journal
+from src.aggregates import journal_stats
+from src.projects import journal_projects
+
+SLOW_WRITE_S = 0.5
+
+
+@pytest.fixture
+def write_behind(data_dir):
+    """Journal d'une séance, écriture différée activée."""
+    journal.append_entry({"date": "2026-01-01", "titre": "déjà là", "etat": "démo", "temps_min": 10})
+    io.enable_write_behind()
+    yield
+    io.disable_write_behind()
+
+
+@pytest.fixture
+def slow_write_behind(write_behind, monkeypatch):
+    """Chaque ajout au CSV met SLOW_WRITE_S à atteindre le disque."""
+    append = io._append_rows
+
+    def slow(*args, **kwargs):
+        time.sleep(SLOW_WRITE_S)
+        return append(*args, **kwargs)
+
+    monkeypatch.setattr(io, "_append_rows", slow)
+
+
+def test_dashboard_reads_own_append_without_waiting(slow_write_behind):
+    journal_stats.state()  # index chargés avant l'ajout, comme dans une session ouverte
+    journal_projects.state()
+    journal.append_entry({"date": "2026-01-02", "titre": "nouveau", "style": "lofi", "etat": "idée", "temps_min": 25})
+
+    t0 = time.perf_counter()
+    assert journal.count_entries() == 2
+    assert journal.minutes_since(journal.datetime(2026, 1, 1)) == 35
+    assert journal.count_by_etat()["idée"] == 1
+    assert journal.latest_entries(1)["titre"].tolist() == ["nouveau"]
+    assert {p["titre"] for p in journal.unfinished_projects()} == {"déjà là", "nouveau"}
+    assert time.perf_counter() - t0 < SLOW_WRITE_S / 2
+
+    # une fois écrites, les lignes ne sont pas comptées deux fois
+    assert io.flush_pending(timeout=5)
+    assert journal.count_entries() == 2
+    assert journal.minutes_since(journal.datetime(2026, 1, 1)) == 35
+    assert journal.project_timeline("nouveau")["temps_min"].tolist() == [25]
+
+
+def test_overlay_under_concurrent_writes(write_behind):
+    counts: list[int] = []
+
+    def writer(t: int) -> None:
+        for i in range(20):
+            journal.append_entry({"date": "2026-01-03", "titre": f"T{t}-{i}"})
+            counts.append(journal.count_entries())
+
+    threads = [threading.Thread(target=writer, args=(t,)) for t in range(4)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    assert io.flush_pending(timeout=60)
+    assert max(counts) <= 81
+    assert journal.count_entries() == 81